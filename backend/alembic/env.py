@@ -24,9 +24,11 @@ if config.config_file_name is not None:
 # Alternatively, force reading from environment here:
 from dotenv import load_dotenv
 load_dotenv() # Load .env file if present (useful for local runs)
+from app.db.urls import to_sync_url
 db_url = os.getenv('DATABASE_URL')
 if db_url:
-     config.set_main_option('sqlalchemy.url', db_url)
+     # Migrations run on a blocking driver even if the app uses asyncpg
+     config.set_main_option('sqlalchemy.url', to_sync_url(db_url))
 else:
      # Only print warning if we are not in a test environment or similar
      # where DATABASE_URL might not be set intentionally
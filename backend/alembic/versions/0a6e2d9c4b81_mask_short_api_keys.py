@@ -0,0 +1,25 @@
+"""replace stored short api keys with a fixed mask
+
+Revision ID: 0a6e2d9c4b81
+Revises: f9d3b7a1c5e2
+Create Date: 2026-10-20 12:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0a6e2d9c4b81'
+down_revision = 'f9d3b7a1c5e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Masks of longer keys keep 8 characters plus at least one bullet, so any
+    # stored value of 8 characters or fewer is a short key in plain text
+    op.execute("UPDATE api_keys SET masked_key = '••••••••' WHERE length(masked_key) <= 8")
+
+
+def downgrade():
+    # The plain text of short keys is not restored
+    pass
@@ -0,0 +1,39 @@
+"""add keyset pagination indexes
+
+Revision ID: 3c5e8a1f7b42
+Revises: 9a72d81f3e4c
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '3c5e8a1f7b42'
+down_revision = '9a72d81f3e4c'
+branch_labels = None
+depends_on = None
+
+# (index name, table) for the (user_id, created_at, id) indexes backing
+# cursor pagination of the per-user list endpoints
+INDEXES = [
+    ('ix_agents_user_created', 'agents'),
+    ('ix_user_connectors_user_created', 'user_connectors'),
+    ('ix_llm_configs_user_created', 'llm_configs'),
+    ('ix_api_keys_user_created', 'api_keys'),
+]
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table in INDEXES:
+            op.create_index(
+                name, table, ['user_id', 'created_at', 'id'],
+                unique=False, postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,65 @@
+"""add index audit indexes
+
+Revision ID: 7d1f4b9e2a60
+Revises: 3c5e8a1f7b42
+Create Date: 2026-10-19 11:00:00.000000
+
+The per-user filters on agents, llm_configs, user_connectors and api_keys are
+served by the (user_id, created_at, id) indexes from 3c5e8a1f7b42. This
+revision covers the remaining lookups found in the audit.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '7d1f4b9e2a60'
+down_revision = '3c5e8a1f7b42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        # is_setup_complete(): count of superusers
+        op.create_index(
+            'ix_users_superuser', 'users', ['id'],
+            postgresql_where=sa.text('is_superuser'),
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        # Default LLM config lookups for a user
+        op.create_index(
+            'ix_llm_configs_user_default', 'llm_configs', ['user_id'],
+            postgresql_where=sa.text('is_default'),
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        # Reverse lookup from a connector to its agent links (the primary key leads with agent_id)
+        op.create_index(
+            op.f('ix_agent_connector_links_user_connector_id'), 'agent_connector_links', ['user_connector_id'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        # Agents using an LLM config, when its API key is deleted
+        op.create_index(
+            op.f('ix_agents_llm_config_id'), 'agents', ['llm_config_id'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        # Conversation history for an agent in timestamp order
+        op.create_index(
+            'ix_conversation_turns_agent_timestamp', 'conversation_turns', ['agent_id', 'timestamp'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_conversation_turns_agent_timestamp', table_name='conversation_turns',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index(op.f('ix_agents_llm_config_id'), table_name='agents',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index(op.f('ix_agent_connector_links_user_connector_id'), table_name='agent_connector_links',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_llm_configs_user_default', table_name='llm_configs',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_users_superuser', table_name='users',
+                      postgresql_concurrently=True, if_exists=True)
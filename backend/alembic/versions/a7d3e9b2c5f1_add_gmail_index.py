@@ -0,0 +1,47 @@
+"""add connector sync states and gmail message index
+
+Revision ID: a7d3e9b2c5f1
+Revises: f2c7a9d4e1b3
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e9b2c5f1'
+down_revision = 'f2c7a9d4e1b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'connector_sync_states',
+        sa.Column('user_connector_id', sa.UUID(), nullable=False),
+        sa.Column('cursor', sa.String(), nullable=False),
+        sa.Column('synced_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['user_connector_id'], ['user_connectors.id']),
+        sa.PrimaryKeyConstraint('user_connector_id')
+    )
+    op.create_table(
+        'gmail_messages',
+        sa.Column('user_connector_id', sa.UUID(), nullable=False),
+        sa.Column('message_id', sa.String(), nullable=False),
+        sa.Column('thread_id', sa.String(), nullable=True),
+        sa.Column('received_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column('sender', sa.Text(), nullable=True),
+        sa.Column('recipients', sa.Text(), nullable=True),
+        sa.Column('subject', sa.Text(), nullable=True),
+        sa.Column('snippet', sa.Text(), nullable=True),
+        sa.Column('label_ids', sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(['user_connector_id'], ['user_connectors.id']),
+        sa.PrimaryKeyConstraint('user_connector_id', 'message_id')
+    )
+    op.create_index('ix_gmail_messages_connector_received', 'gmail_messages', ['user_connector_id', 'received_at'])
+
+
+def downgrade():
+    op.drop_index('ix_gmail_messages_connector_received', table_name='gmail_messages')
+    op.drop_table('gmail_messages')
+    op.drop_table('connector_sync_states')
@@ -0,0 +1,37 @@
+"""add calendar event store
+
+Revision ID: b4e8c1f6d2a9
+Revises: a7d3e9b2c5f1
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b4e8c1f6d2a9'
+down_revision = 'a7d3e9b2c5f1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'calendar_events',
+        sa.Column('user_connector_id', sa.UUID(), nullable=False),
+        sa.Column('event_id', sa.String(), nullable=False),
+        sa.Column('summary', sa.Text(), nullable=True),
+        sa.Column('location', sa.Text(), nullable=True),
+        sa.Column('start_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column('end_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column('all_day', sa.Boolean(), nullable=False),
+        sa.Column('busy', sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(['user_connector_id'], ['user_connectors.id']),
+        sa.PrimaryKeyConstraint('user_connector_id', 'event_id')
+    )
+    op.create_index('ix_calendar_events_connector_start', 'calendar_events', ['user_connector_id', 'start_at'])
+
+
+def downgrade():
+    op.drop_index('ix_calendar_events_connector_start', table_name='calendar_events')
+    op.drop_table('calendar_events')
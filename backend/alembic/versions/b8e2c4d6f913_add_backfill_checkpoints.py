@@ -0,0 +1,32 @@
+"""add backfill checkpoints
+
+Revision ID: b8e2c4d6f913
+Revises: 7d1f4b9e2a60
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b8e2c4d6f913'
+down_revision = '7d1f4b9e2a60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'backfill_checkpoints',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('last_key', sa.String(), nullable=True),
+        sa.Column('rows_scanned', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('rows_written', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('completed_at', sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('backfill_checkpoints')
@@ -0,0 +1,29 @@
+"""add registry checksums
+
+Revision ID: c4a9e7f25d18
+Revises: b8e2c4d6f913
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c4a9e7f25d18'
+down_revision = 'b8e2c4d6f913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'registry_checksums',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('checksum', sa.String(), nullable=False),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('registry_checksums')
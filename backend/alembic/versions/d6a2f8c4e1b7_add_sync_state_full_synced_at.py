@@ -0,0 +1,23 @@
+"""add full sync time to connector sync state
+
+Revision ID: d6a2f8c4e1b7
+Revises: b4e8c1f6d2a9
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd6a2f8c4e1b7'
+down_revision = 'b4e8c1f6d2a9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('connector_sync_states', sa.Column('full_synced_at', sa.TIMESTAMP(timezone=True), nullable=True))
+
+
+def downgrade():
+    op.drop_column('connector_sync_states', 'full_synced_at')
@@ -0,0 +1,25 @@
+"""add api key masked_key
+
+Revision ID: e5b3d8a1c276
+Revises: c4a9e7f25d18
+Create Date: 2026-10-19 15:00:00.000000
+
+Existing keys keep a NULL masked_key until `python -m app.mask_api_keys` has
+filled it in; the API decrypts those keys to mask them in the meantime.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e5b3d8a1c276'
+down_revision = 'c4a9e7f25d18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('api_keys', sa.Column('masked_key', sa.String(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('api_keys', 'masked_key')
@@ -0,0 +1,41 @@
+"""add gmail message labels
+
+Revision ID: e8b4c2a6f3d1
+Revises: d6a2f8c4e1b7
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e8b4c2a6f3d1'
+down_revision = 'd6a2f8c4e1b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'gmail_message_labels',
+        sa.Column('user_connector_id', sa.UUID(), nullable=False),
+        sa.Column('message_id', sa.String(), nullable=False),
+        sa.Column('label_id', sa.String(), nullable=False),
+        sa.Column('received_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['user_connector_id'], ['user_connectors.id']),
+        sa.PrimaryKeyConstraint('user_connector_id', 'message_id', 'label_id')
+    )
+    op.create_index(
+        'ix_gmail_message_labels_connector_label_received', 'gmail_message_labels',
+        ['user_connector_id', 'label_id', 'received_at']
+    )
+    # Existing Gmail indexes have no label rows; drop their cursors so the next sync rebuilds them in full
+    op.execute(
+        "DELETE FROM connector_sync_states "
+        "WHERE user_connector_id IN (SELECT DISTINCT user_connector_id FROM gmail_messages)"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_gmail_message_labels_connector_label_received', table_name='gmail_message_labels')
+    op.drop_table('gmail_message_labels')
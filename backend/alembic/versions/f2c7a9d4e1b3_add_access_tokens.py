@@ -0,0 +1,38 @@
+"""add access tokens
+
+Revision ID: f2c7a9d4e1b3
+Revises: e5b3d8a1c276
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f2c7a9d4e1b3'
+down_revision = 'e5b3d8a1c276'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'access_tokens',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('prefix', sa.String(), nullable=False),
+        sa.Column('secret_hash', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('prefix')
+    )
+    op.create_index('ix_access_tokens_user_created', 'access_tokens', ['user_id', 'created_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_access_tokens_user_created', table_name='access_tokens')
+    op.drop_table('access_tokens')
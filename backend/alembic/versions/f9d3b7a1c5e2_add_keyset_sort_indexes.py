@@ -0,0 +1,41 @@
+"""add keyset indexes for name sorts
+
+Revision ID: f9d3b7a1c5e2
+Revises: e8b4c2a6f3d1
+Create Date: 2026-10-20 11:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'f9d3b7a1c5e2'
+down_revision = 'e8b4c2a6f3d1'
+branch_labels = None
+depends_on = None
+
+# (index name, table, sort column) for the (user_id, <sort column>, id) indexes
+# backing cursor pagination of the per-user list endpoints sorted by other
+# fields than created_at
+INDEXES = [
+    ('ix_agents_user_name', 'agents', 'name'),
+    ('ix_user_connectors_user_name', 'user_connectors', 'name'),
+    ('ix_llm_configs_user_model_name', 'llm_configs', 'model_name'),
+    ('ix_api_keys_user_provider_name', 'api_keys', 'provider_name'),
+    ('ix_access_tokens_user_name', 'access_tokens', 'name'),
+]
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, column in INDEXES:
+            op.create_index(
+                name, table, ['user_id', column, 'id'],
+                unique=False, postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -1,11 +1,15 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError
+from uuid import UUID
 
-from ..db.session import get_db
-from ..models import User
+from ..db.session import get_db, get_read_session
+from ..security.access_tokens import is_access_token
+from ..security.principals import Principal, cache_principal, get_cached_principal
+from ..security.revocation import revocation_list
 from ..security.tokens import decode_access_token
+from ..services.access_token_service import authenticate_access_token
 from ..services.user_service import get_user_by_id
 
 # OAuth2 scheme for token extraction from requests
@@ -20,22 +24,19 @@ credentials_exception = HTTPException(
 )
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), 
-    db: Session = Depends(get_db)
-) -> User:
+async def _user_id_from_jwt(token: str) -> UUID:
     """
-    Dependency to get the current authenticated user from a JWT token.
+    Get the user ID from a JWT access token.
     
     Args:
-        token: JWT token extracted from the Authorization header
-        db: Database session
+        token: JWT token
         
     Returns:
-        User: The authenticated user
+        UUID: The ID in the token's subject claim
         
     Raises:
-        HTTPException: If token is invalid or user doesn't exist
+        HTTPException: If the token is invalid, is not an access token or
+            has been revoked
     """
     try:
         # Decode the JWT token
@@ -45,22 +46,89 @@ async def get_current_user(
         user_id = payload.get("sub")
         if user_id is None:
             raise credentials_exception
+        user_id = UUID(user_id)
             
-    except JWTError:
+    except (JWTError, ValueError):
         # This is caught by decode_access_token, but we include it here for clarity
         raise credentials_exception
-        
-    # Get user from database
-    user = get_user_by_id(db, user_id=user_id)
-    if user is None:
+    
+    # Refresh tokens are only accepted by /auth/refresh
+    if payload.get("type") != "access":
+        raise credentials_exception
+    
+    # Usually answered by the worker's bloom filter without a network call
+    jti = payload.get("jti")
+    if jti and await revocation_list.is_revoked(jti):
         raise credentials_exception
+    
+    return user_id
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), 
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """
+    Dependency to get the current authenticated user from a JWT or an
+    AgentBase access token.
+    
+    The user's status is served from the principal cache when possible, so
+    most requests do not query the users table.
+    
+    Args:
+        token: JWT or access token extracted from the Authorization header
+        db: Database session
+        
+    Returns:
+        Principal: The authenticated user's ID and status flags
+        
+    Raises:
+        HTTPException: If token is invalid or user doesn't exist
+    """
+    if is_access_token(token):
+        # Long-lived access token for programmatic clients
+        user_id = await authenticate_access_token(db, token)
+        if user_id is None:
+            raise credentials_exception
+    else:
+        user_id = await _user_id_from_jwt(token)
+        
+    principal = await get_cached_principal(user_id)
+    if principal is None:
+        # Cache miss: get user from database
+        user = await get_user_by_id(db, user_id=user_id)
+        if user is None:
+            raise credentials_exception
+        principal = Principal.from_user(user)
+        await cache_principal(principal)
+    
+    # Tag the request's primary session so commits keep this user's reads
+    # on the primary for a short read-your-writes window
+    db.info["user_id"] = principal.id
+        
+    return principal
+
+
+async def get_read_db(current_user: Principal = Depends(get_current_user)):
+    """
+    Dependency to get a session for read-only endpoints.
+    
+    Uses the read replica when one is configured and healthy, unless the
+    current user has written recently.
+    
+    Args:
+        current_user: User from get_current_user dependency
         
-    return user
+    Yields:
+        AsyncSession: A session bound to the replica or the primary
+    """
+    async with get_read_session(current_user.id) as db:
+        yield db
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """
     Dependency to get the current authenticated user and verify they are active.
     
@@ -68,7 +136,7 @@ async def get_current_active_user(
         current_user: User from get_current_user dependency
         
     Returns:
-        User: The active authenticated user
+        Principal: The active authenticated user
         
     Raises:
         HTTPException: If user is inactive
@@ -82,9 +150,36 @@ async def get_current_active_user(
     return current_user
 
 
+async def get_current_session_user(
+    token: str = Depends(oauth2_scheme),
+    current_user: Principal = Depends(get_current_active_user)
+) -> Principal:
+    """
+    Dependency for actions that need an interactive login rather than an
+    access token, such as creating access tokens.
+    
+    Args:
+        token: Bearer token extracted from the Authorization header
+        current_user: User from get_current_active_user dependency
+        
+    Returns:
+        Principal: The active user, authenticated with a JWT
+        
+    Raises:
+        HTTPException: If the request was authenticated with an access token
+    """
+    if is_access_token(token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="This action requires logging in with a password, not an access token"
+        )
+    
+    return current_user
+
+
 async def get_current_superuser(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
+    current_user: Principal = Depends(get_current_active_user)
+) -> Principal:
     """
     Dependency to get the current authenticated user and verify they are a superuser.
     
@@ -92,7 +187,7 @@ async def get_current_superuser(
         current_user: User from get_current_active_user dependency
         
     Returns:
-        User: The active authenticated superuser
+        Principal: The active authenticated superuser
         
     Raises:
         HTTPException: If user is not a superuser
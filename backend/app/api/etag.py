@@ -0,0 +1,122 @@
+"""
+ETag helpers for conditional GET requests.
+
+Static responses use strong ETags computed from their bytes. Per-user
+resources use weak ETags derived from a cheap version query (such as row
+count and latest updated_at), so a request whose If-None-Match matches can
+get a 304 without loading or serializing the resource.
+"""
+
+import hashlib
+import os
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+# Clients may keep responses but must revalidate them (cheaply, via ETag) before reuse
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+# Identifier of the deployed build (e.g. the git commit), folded into weak ETags
+# so responses cached against one deploy are not revalidated against the next
+BUILD_ID = os.getenv("BUILD_ID", "")
+
+
+def strong_etag(body: bytes) -> str:
+    """
+    Compute a strong ETag for a response body.
+
+    Args:
+        body: Exact bytes of the response body
+
+    Returns:
+        Quoted ETag value
+    """
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def versioned_etag(request: Request, *version: Any) -> str:
+    """
+    Compute a weak ETag for a resource from its version.
+
+    The ETag also covers the app version, BUILD_ID, the path and the query
+    parameters, so different pages and filters of the same resource never
+    share one. Deploys only change the ETag when BUILD_ID is set per build;
+    data a response embeds from outside the resource's own rows must be
+    passed in version.
+
+    Args:
+        request: Incoming request
+        version: Values that change whenever the resource does, including
+            the ID of the user it is scoped to
+
+    Returns:
+        Quoted weak ETag value
+    """
+    source = "|".join([
+        request.app.version,
+        BUILD_ID,
+        request.url.path,
+        repr(sorted(request.query_params.multi_items())),
+        *(str(part) for part in version)
+    ])
+    return f'W/"{hashlib.sha256(source.encode()).hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Check a request's If-None-Match header against an ETag.
+
+    Args:
+        request: Incoming request
+        etag: Current ETag of the resource
+
+    Returns:
+        True if the client's copy is current and a 304 can be sent
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def not_modified(etag: str) -> Response:
+    """Build a 304 response for an ETag."""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL})
+
+
+def set_etag(response: Response, etag: str) -> None:
+    """Add an ETag, and the matching Cache-Control, to a response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+
+
+def conditional_response(
+    request: Request,
+    body: bytes,
+    etag: Optional[str] = None,
+    media_type: str = "application/json"
+) -> Response:
+    """
+    Serve a pre-serialized body, or a 304 if the client already has it.
+
+    Args:
+        request: Incoming request
+        body: Serialized response body
+        etag: ETag of the body, computed from it if not given
+        media_type: Content type of the body
+
+    Returns:
+        A 200 response with the body, or a 304 without it
+    """
+    etag = etag or strong_etag(body)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return Response(
+        content=body,
+        media_type=media_type,
+        headers={"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+    )
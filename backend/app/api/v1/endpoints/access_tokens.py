@@ -0,0 +1,94 @@
+from fastapi import APIRouter, Depends, Path, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from uuid import UUID
+
+from ....db.session import get_db
+from ....schemas.access_token_schemas import (
+    AccessTokenCreate,
+    AccessTokenCreateResponse,
+    AccessTokenListResponse,
+    AccessTokenResponse,
+)
+from ....security.principals import Principal
+from ....services.access_token_service import (
+    get_access_tokens_by_user,
+    issue_access_token,
+    revoke_access_token,
+)
+from ....services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ...dependencies import get_current_active_user, get_current_session_user, get_read_db
+
+router = APIRouter()
+
+
+@router.post("/users/me/access-tokens", response_model=AccessTokenCreateResponse, status_code=201)
+async def create_access_token_endpoint(
+    token_data: AccessTokenCreate,
+    current_user: Principal = Depends(get_current_session_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create an access token for programmatic clients.
+
+    The token is sent as a bearer token in place of a JWT. It is returned
+    only in this response; AgentBase stores just a hash of it. Requires a
+    password login: an access token cannot mint further access tokens.
+
+    Args:
+        token_data: Label and optional lifetime of the token
+        current_user: Current authenticated user
+        db: Database session
+
+    Returns:
+        The created token, including the token itself
+    """
+    access_token, token = await issue_access_token(
+        db, current_user.id, token_data.name, token_data.expires_in_days
+    )
+    return AccessTokenCreateResponse(
+        **AccessTokenResponse.model_validate(access_token).model_dump(),
+        token=token
+    )
+
+
+@router.get("/users/me/access-tokens", response_model=AccessTokenListResponse)
+async def list_access_tokens(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of tokens to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    sort: str = Query("created_at", description="Sort field (created_at, name); prefix with '-' for descending"),
+    include_revoked: bool = Query(False, description="Include revoked tokens"),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    List the current user's access tokens.
+
+    Returns:
+        A page of access tokens (without their secrets)
+    """
+    tokens, next_cursor = await get_access_tokens_by_user(
+        db, current_user.id, limit=limit, cursor=cursor, sort=sort, include_revoked=include_revoked
+    )
+    return AccessTokenListResponse(tokens=tokens, count=len(tokens), next_cursor=next_cursor)
+
+
+@router.delete("/users/me/access-tokens/{token_id}", status_code=204)
+async def revoke_access_token_endpoint(
+    token_id: UUID = Path(..., description="ID of the access token to revoke"),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Revoke an access token.
+
+    Other API workers may keep accepting the token for up to
+    ACCESS_TOKEN_CACHE_TTL seconds.
+
+    Args:
+        token_id: ID of the access token to revoke
+        current_user: Current authenticated user
+        db: Database session
+    """
+    await revoke_access_token(db, current_user.id, token_id)
+    return None
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from uuid import UUID
 
 from ....db.session import get_db
-from ....models import User
+from ....models import Agent
+from ....security.principals import Principal
 from ....schemas.agent_schemas import AgentCreate, AgentUpdate, AgentResponse, AgentListResponse
 from ....services.agent_service import (
     get_agent_by_id, 
@@ -13,7 +14,10 @@ from ....services.agent_service import (
     update_agent, 
     delete_agent
 )
-from ...dependencies import get_current_active_user
+from ....services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ....services.resource_versions import get_collection_version, get_row_version
+from ...dependencies import get_current_active_user, get_read_db
+from ...etag import etag_matches, not_modified, set_etag, versioned_etag
 
 router = APIRouter()
 
@@ -21,8 +25,8 @@ router = APIRouter()
 @router.post("/agents", response_model=AgentResponse, status_code=status.HTTP_201_CREATED)
 async def create_new_agent(
     agent_data: AgentCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new agent.
@@ -35,37 +39,65 @@ async def create_new_agent(
     Returns:
         Newly created agent
     """
-    return create_agent(db, agent_data, current_user.id)
+    return await create_agent(db, agent_data, current_user.id)
 
 
 @router.get("/agents", response_model=AgentListResponse)
 async def list_agents(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of agents to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    sort: str = Query("created_at", description="Sort field (created_at, name); prefix with '-' for descending"),
+    name: Optional[str] = Query(None, description="Filter by name (case-insensitive substring)"),
+    llm_config_id: Optional[UUID] = Query(None, description="Filter by LLM configuration"),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
-    List all agents belonging to the current user.
+    List agents belonging to the current user, one page at a time.
+    
+    Responses carry an ETag; send it back in If-None-Match to get a 304
+    while none of the user's agents have changed.
     
     Args:
+        limit: Maximum number of agents to return
+        cursor: Cursor from the previous page
+        sort: Sort field
+        name: Name filter
+        llm_config_id: LLM configuration filter
         current_user: Current authenticated user
         db: Database session
         
     Returns:
-        List of agents owned by the user
+        Page of agents owned by the user and the cursor for the next page
     """
-    agents = get_agents_by_user(db, current_user.id)
-    return AgentListResponse(agents=agents, count=len(agents))
+    etag = versioned_etag(request, current_user.id, *await get_collection_version(db, Agent, current_user.id))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
+    agents, next_cursor = await get_agents_by_user(
+        db, current_user.id, limit=limit, cursor=cursor, sort=sort,
+        name=name, llm_config_id=llm_config_id
+    )
+    return AgentListResponse(agents=agents, count=len(agents), next_cursor=next_cursor)
 
 
 @router.get("/agents/{agent_id}", response_model=AgentResponse)
 async def get_agent_details(
     agent_id: UUID,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get details of a specific agent.
     
+    Responses carry an ETag; send it back in If-None-Match to get a 304
+    while the agent is unchanged.
+    
     Args:
         agent_id: ID of the agent to retrieve
         current_user: Current authenticated user
@@ -77,7 +109,14 @@ async def get_agent_details(
     Raises:
         HTTPException: If agent not found or not owned by user
     """
-    agent = get_agent_by_id(db, agent_id, current_user.id)
+    updated_at = await get_row_version(db, Agent, agent_id, current_user.id)
+    if updated_at is not None:
+        etag = versioned_etag(request, current_user.id, updated_at)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+    
+    agent = await get_agent_by_id(db, agent_id, current_user.id)
     if not agent:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -90,8 +129,8 @@ async def get_agent_details(
 async def update_agent_details(
     agent_id: UUID,
     agent_data: AgentUpdate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update an existing agent.
@@ -108,14 +147,14 @@ async def update_agent_details(
     Raises:
         HTTPException: If agent not found or update fails
     """
-    return update_agent(db, agent_id, current_user.id, agent_data)
+    return await update_agent(db, agent_id, current_user.id, agent_data)
 
 
 @router.delete("/agents/{agent_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_agent_by_id(
     agent_id: UUID,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete an agent.
@@ -128,5 +167,5 @@ async def delete_agent_by_id(
     Raises:
         HTTPException: If agent not found or delete fails
     """
-    delete_agent(db, agent_id, current_user.id)
+    await delete_agent(db, agent_id, current_user.id)
     return None 
\ No newline at end of file
@@ -1,11 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ....db.session import get_db
-from ....schemas.auth_schemas import Token
-from ....services.user_service import get_user_by_email
-from ....security import verify_password, create_access_token
+from ....schemas.auth_schemas import RefreshRequest, Token
+from ....services.auth_service import issue_tokens, refresh_tokens, revoke_token
+from ....services.user_service import authenticate_user
+from ....security.access_tokens import is_access_token
+from ....security.principals import Principal
+from ....security.tokens import get_token_data
+from ...dependencies import get_current_user, oauth2_scheme
 
 router = APIRouter()
 
@@ -13,7 +17,7 @@ router = APIRouter()
 @router.post("/auth/token", response_model=Token)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     OAuth2 compatible token login, get an access token for future requests.
@@ -23,16 +27,14 @@ async def login_for_access_token(
         db: Database session
         
     Returns:
-        JWT access token
+        JWT access token and refresh token
         
     Raises:
         HTTPException 401: If authentication fails
     """
-    # Get user by email (username field contains email)
-    user = get_user_by_email(db, email=form_data.username)
-    
-    # Check if user exists and password is correct
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # Check if user exists and password is correct (username field contains email)
+    user = await authenticate_user(db, email=form_data.username, password=form_data.password)
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -47,10 +49,60 @@ async def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    # Create access token with user ID as subject
-    access_token = create_access_token(
-        data={"sub": str(user.id), "type": "access"}
-    )
+    # Create access and refresh tokens with user ID as subject
+    return issue_tokens(user.id)
+
+
+@router.post("/auth/refresh", response_model=Token)
+async def refresh_access_token(
+    refresh_data: RefreshRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Exchange a refresh token for a new access token and refresh token.
+    
+    Each refresh token can be used once; the response carries its replacement.
+    
+    Args:
+        refresh_data: The refresh token
+        db: Database session
+        
+    Returns:
+        New JWT access token and refresh token
+        
+    Raises:
+        HTTPException 401: If the refresh token is invalid, expired or already used
+    """
+    return await refresh_tokens(db, refresh_data.refresh_token)
+
+
+@router.post("/auth/logout", status_code=204)
+async def logout(
+    refresh_data: RefreshRequest,
+    token: str = Depends(oauth2_scheme),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Revoke the current access token and the given refresh token.
+    
+    Args:
+        refresh_data: The refresh token to revoke
+        token: Access token of the current request
+        current_user: Current authenticated user
+        
+    Raises:
+        HTTPException 400: If the refresh token is invalid or belongs to another user
+    """
+    try:
+        refresh_payload = get_token_data(refresh_data.refresh_token, token_type="refresh")
+    except HTTPException:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid refresh token")
+    if refresh_payload["sub"] != str(current_user.id):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid refresh token")
+    
+    await revoke_token(refresh_payload)
+    # Access tokens for programmatic clients are revoked through their own endpoint
+    if not is_access_token(token):
+        await revoke_token(get_token_data(token, token_type="access"))
     
-    # Return token in the expected format
-    return Token(access_token=access_token, token_type="bearer") 
\ No newline at end of file
+    return None 
\ No newline at end of file
@@ -0,0 +1,126 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from ....db.session import get_db, get_read_session
+from ....security.principals import Principal
+from ....schemas.bulk_schemas import BulkConflictMode, BulkFormat, BulkImportResponse, BulkKind
+from ....services.bulk_service import BULK_MAX_BYTES, export_records, import_records
+from ...dependencies import get_current_active_user
+
+router = APIRouter(prefix="/bulk")
+
+MEDIA_TYPES = {
+    BulkFormat.NDJSON: "application/x-ndjson",
+    BulkFormat.CSV: "text/csv",
+}
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Import document too large; at most {BULK_MAX_BYTES} bytes are accepted"
+    )
+
+
+async def _read_body(request: Request) -> bytes:
+    """
+    Read a request body, refusing it as soon as it exceeds BULK_MAX_BYTES.
+    
+    Raises:
+        HTTPException 413: If the declared or received body is too large
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > BULK_MAX_BYTES:
+        raise _too_large()
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > BULK_MAX_BYTES:
+            raise _too_large()
+    return bytes(body)
+
+
+@router.post("/import", response_model=BulkImportResponse)
+async def bulk_import(
+    request: Request,
+    format: BulkFormat = Query(BulkFormat.NDJSON, description="Format of the request body"),
+    kind: Optional[BulkKind] = Query(None, description="Record kind (required for CSV)"),
+    on_conflict: BulkConflictMode = Query(BulkConflictMode.SKIP, description="Skip or reject agents/connectors whose name exists"),
+    dry_run: bool = Query(False, description="Validate and count without writing"),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Import agents, connector instances and agent-connector links.
+    
+    The request body is the raw NDJSON or CSV document, as produced by the
+    export endpoint. The import is all-or-nothing.
+    
+    Args:
+        request: Incoming request carrying the document
+        format: Document format
+        kind: Record kind for CSV documents
+        on_conflict: Conflict handling for existing names
+        dry_run: Only validate and count
+        current_user: Current authenticated user
+        db: Database session
+        
+    Returns:
+        Counts of received, inserted and skipped records per kind
+        
+    Raises:
+        HTTPException: If the document is larger than BULK_MAX_BYTES, is not
+            UTF-8 or contains invalid records
+    """
+    try:
+        data = (await _read_body(request)).decode("utf-8")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Request body must be UTF-8 encoded"
+        )
+    return await import_records(db, current_user.id, data, format, kind, on_conflict, dry_run)
+
+
+@router.get("/export")
+async def bulk_export(
+    format: BulkFormat = Query(BulkFormat.NDJSON, description="Output format"),
+    kind: Optional[BulkKind] = Query(None, description="Only export this kind (required for CSV)"),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Stream the current user's agents, connector instances and links.
+    
+    Args:
+        format: Output format
+        kind: Record kind to export
+        current_user: Current authenticated user
+        
+    Returns:
+        Streaming NDJSON or CSV download
+        
+    Raises:
+        HTTPException: If CSV is requested without a kind
+    """
+    if format == BulkFormat.CSV and kind is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV exports hold one kind of record; specify kind (agents, connectors or links)"
+        )
+
+    user_id = current_user.id
+
+    # The stream outlives the request's dependencies, so it opens its own session
+    async def content():
+        async with get_read_session(user_id) as db:
+            async for chunk in export_records(db, user_id, format, kind):
+                yield chunk
+
+    filename = f"agentbase-{kind.value if kind else 'export'}.{format.value}"
+    return StreamingResponse(
+        content(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
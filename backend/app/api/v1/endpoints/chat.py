@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Path, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Query, Request, Response
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from uuid import UUID
 
 from ....db.session import get_db
-from ....models import User, ConversationTurn
+from ....models import ConversationTurn
+from ....security.principals import Principal
 from ....schemas.chat_schemas import (
     ChatMessageRequest, ChatMessageResponse, ChatHistoryResponse
 )
 from ....services.chat_service import get_chat_service
-from ...dependencies import get_current_active_user
+from ....services.resource_versions import get_chat_history_version
+from ...dependencies import get_current_active_user, get_read_db
+from ...etag import etag_matches, not_modified, set_etag, versioned_etag
 
 router = APIRouter()
 
@@ -18,8 +22,8 @@ router = APIRouter()
 async def send_chat_message(
     agent_id: UUID = Path(..., description="ID of the agent to chat with"),
     message: ChatMessageRequest = ...,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Send a message to an agent and get a response.
@@ -42,14 +46,19 @@ async def send_chat_message(
 
 @router.get("/agents/{agent_id}/chat", response_model=ChatHistoryResponse)
 async def get_chat_history(
+    request: Request,
+    response: Response,
     agent_id: UUID = Path(..., description="ID of the agent"),
     limit: int = Query(50, ge=1, le=100, description="Maximum number of messages to return"),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get chat history for an agent.
     
+    Responses carry an ETag; send it back in If-None-Match to get a 304
+    until a message is added or the history is cleared.
+    
     Args:
         agent_id: ID of the agent
         limit: Maximum number of messages to return
@@ -62,13 +71,20 @@ async def get_chat_history(
     Raises:
         HTTPException: If agent not found
     """
+    version = await get_chat_history_version(db, agent_id, current_user.id)
+    if version is not None:
+        etag = versioned_etag(request, current_user.id, *version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+    
     chat_service = get_chat_service(db)
     
     # Verify agent belongs to user
-    chat_service.get_agent_with_config(agent_id, current_user.id)
+    await chat_service.get_agent_with_config(agent_id, current_user.id)
     
     # Get history
-    messages = chat_service.get_conversation_history(agent_id, limit)
+    messages = await chat_service.get_conversation_history(agent_id, limit)
     
     return ChatHistoryResponse(
         messages=messages,
@@ -79,8 +95,8 @@ async def get_chat_history(
 @router.delete("/agents/{agent_id}/chat", status_code=status.HTTP_204_NO_CONTENT)
 async def clear_chat_history(
     agent_id: UUID = Path(..., description="ID of the agent"),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Clear chat history for an agent.
@@ -96,11 +112,11 @@ async def clear_chat_history(
     chat_service = get_chat_service(db)
     
     # Verify agent belongs to user
-    chat_service.get_agent_with_config(agent_id, current_user.id)
+    await chat_service.get_agent_with_config(agent_id, current_user.id)
     
     # Delete all conversation turns for this agent
-    db.query(ConversationTurn).filter(
-        ConversationTurn.agent_id == agent_id
-    ).delete()
+    await db.execute(
+        delete(ConversationTurn).where(ConversationTurn.agent_id == agent_id)
+    )
     
-    db.commit() 
\ No newline at end of file
+    await db.commit() 
\ No newline at end of file
@@ -5,11 +5,12 @@ API endpoints for connector setup walkthroughs.
 """
 
 from typing import Dict, Any, Optional
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Request
 from pydantic import BaseModel
 
 from ....api.dependencies import get_current_user
-from ....models import User
+from ....api.etag import conditional_response, strong_etag
+from ....security.principals import Principal
 from ....connector_walkthroughs import get_walkthrough, list_available_walkthroughs
 
 router = APIRouter(prefix="/connector-setup")
@@ -28,25 +29,37 @@ class ConnectorWalkthrough(BaseModel):
     troubleshooting: list
 
 
+# Walkthroughs are static, so their responses are serialized once at import
+_LIST_BODY = WalkthroughList(walkthroughs=list_available_walkthroughs()).model_dump_json().encode()
+_LIST_ETAG = strong_etag(_LIST_BODY)
+_WALKTHROUGH_BODIES = {
+    name: ConnectorWalkthrough.model_validate(get_walkthrough(name)).model_dump_json().encode()
+    for name in list_available_walkthroughs()
+}
+_WALKTHROUGH_ETAGS = {name: strong_etag(body) for name, body in _WALKTHROUGH_BODIES.items()}
+
+
 @router.get("/", response_model=WalkthroughList)
 async def list_walkthroughs(
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     List all available connector setup walkthroughs.
     
+    Responses carry an ETag; send it back in If-None-Match to get a 304.
+    
     Returns:
         Dictionary of connector names to authentication types
     """
-    return {
-        "walkthroughs": list_available_walkthroughs()
-    }
+    return conditional_response(request, _LIST_BODY, _LIST_ETAG)
 
 
 @router.get("/{connector_name}", response_model=ConnectorWalkthrough)
 async def get_connector_walkthrough(
+    request: Request,
     connector_name: str = Path(..., description="Name of the connector"),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get the setup walkthrough for a specific connector.
@@ -60,8 +73,8 @@ async def get_connector_walkthrough(
     Raises:
         HTTPException 404: If walkthrough not found
     """
-    walkthrough = get_walkthrough(connector_name)
-    if not walkthrough:
+    body = _WALKTHROUGH_BODIES.get(connector_name)
+    if body is None:
         raise HTTPException(status_code=404, detail=f"No walkthrough found for connector: {connector_name}")
     
-    return walkthrough 
\ No newline at end of file
+    return conditional_response(request, body, _WALKTHROUGH_ETAGS[connector_name]) 
\ No newline at end of file
@@ -1,10 +1,12 @@
 from typing import Dict, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, Path
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
 
-from ....api.dependencies import get_db, get_current_user
-from ....services.connector_catalog import get_connector_registry
+from ....api.dependencies import get_db, get_read_db, get_current_user
+from ....api.etag import conditional_response, etag_matches, not_modified, set_etag, versioned_etag
+from ....models import UserConnector
+from ....services.connector_catalog import CONNECTOR_CATALOG_VERSION, get_catalog_body, get_connector_registry
 from ....services.user_connector_service import (
     create_user_connector,
     get_user_connectors,
@@ -15,11 +17,15 @@ from ....services.user_connector_service import (
     unlink_connector_from_agent,
     get_agent_connectors
 )
-from ....models import User
+from ....security.principals import Principal
+from ....services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ....services.resource_versions import get_collection_version, get_row_version
 from ....schemas.connector_schemas import (
     ConnectorList, 
     ConnectorRead, 
     ConnectorStatus,
+    ConnectorType,
+    SetupStatus,
     UserConnectorCreate,
     UserConnectorUpdate,
     UserConnectorRead,
@@ -31,9 +37,14 @@ router = APIRouter(prefix="/connectors")
 
 @router.get("/catalog", response_model=ConnectorList)
 async def list_connectors(
+    request: Request,
     status: Optional[ConnectorStatus] = Query(None, description="Filter by status (available, coming_soon, planned)"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    tool_type: Optional[ConnectorType] = Query(None, description="Filter by connector type (builtin, api_key, oauth2, custom)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of connectors to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    sort: str = Query("name", description="Sort field (name, created_at); prefix with '-' for descending"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get a list of all available connector types.
@@ -46,21 +57,40 @@ async def list_connectors(
     - coming_soon: Will be available in an upcoming release
     - planned: On the roadmap but not yet implemented
     
+    The first page in name order is served from a pre-serialized snapshot
+    with a strong ETag; send it back in If-None-Match to get a 304 while
+    the catalog is unchanged.
+    
     Returns:
         List of connector objects with their metadata
     """
-    connectors = get_connector_registry(db, status.value if status else None)
+    status_filter = status.value if status else None
+    type_filter = tool_type.value if tool_type else None
+    if sort == "name" and cursor is None:
+        catalog = await get_catalog_body(db, status_filter, type_filter)
+        if catalog.count <= limit:
+            return conditional_response(request, catalog.body, catalog.etag)
+    
+    connectors, next_cursor = await get_connector_registry(
+        db,
+        status_filter,
+        type_filter,
+        limit=limit,
+        cursor=cursor,
+        sort=sort
+    )
     return {
         "connectors": connectors,
-        "count": len(connectors)
+        "count": len(connectors),
+        "next_cursor": next_cursor
     }
 
 
 @router.post("/user", response_model=UserConnectorRead)
 async def create_connector(
     connector: UserConnectorCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Create a new user-specific connector instance.
@@ -72,52 +102,92 @@ async def create_connector(
     Returns:
         Created connector instance details
     """
-    user_connector = create_user_connector(db, current_user.id, connector)
-    return get_user_connector(db, current_user.id, user_connector.id)
+    user_connector = await create_user_connector(db, current_user.id, connector)
+    return await get_user_connector(db, current_user.id, user_connector.id)
 
 
 @router.get("/user", response_model=UserConnectorList)
 async def list_user_connectors(
+    request: Request,
+    response: Response,
     include_details: bool = Query(False, description="Include connector type details"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    setup_status: Optional[SetupStatus] = Query(None, description="Filter by setup status"),
+    tool_id: Optional[uuid.UUID] = Query(None, description="Filter by connector type ID"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of connectors to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    sort: str = Query("created_at", description="Sort field (created_at, name); prefix with '-' for descending"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get a list of all connectors configured by the current user.
     
     This endpoint returns all connector instances that the user has created.
+    Responses carry an ETag; send it back in If-None-Match to get a 304
+    while none of the user's connectors, nor the connector registry, have
+    changed.
     
     Returns:
         List of user's connector instances
     """
-    connectors = get_user_connectors(db, current_user.id, include_details)
+    etag = versioned_etag(
+        request, current_user.id, CONNECTOR_CATALOG_VERSION,
+        *await get_collection_version(db, UserConnector, current_user.id)
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
+    connectors, next_cursor = await get_user_connectors(
+        db,
+        current_user.id,
+        include_details,
+        limit=limit,
+        cursor=cursor,
+        sort=sort,
+        setup_status=setup_status,
+        tool_id=tool_id
+    )
     return {
         "connectors": connectors,
-        "count": len(connectors)
+        "count": len(connectors),
+        "next_cursor": next_cursor
     }
 
 
 @router.get("/user/{connector_id}", response_model=UserConnectorRead)
 async def get_connector(
+    request: Request,
+    response: Response,
     connector_id: uuid.UUID = Path(..., description="ID of the connector to retrieve"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get details of a specific user connector instance.
     
+    Responses carry an ETag; send it back in If-None-Match to get a 304
+    while the connector and the connector registry are unchanged.
+    
     Returns:
         Connector instance details
     """
-    return get_user_connector(db, current_user.id, connector_id)
+    updated_at = await get_row_version(db, UserConnector, connector_id, current_user.id)
+    if updated_at is not None:
+        etag = versioned_etag(request, current_user.id, CONNECTOR_CATALOG_VERSION, updated_at)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+    
+    return await get_user_connector(db, current_user.id, connector_id)
 
 
 @router.patch("/user/{connector_id}", response_model=UserConnectorRead)
 async def update_connector(
     connector_id: uuid.UUID = Path(..., description="ID of the connector to update"),
     updates: UserConnectorUpdate = ...,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Update a user connector instance.
@@ -127,14 +197,14 @@ async def update_connector(
     Returns:
         Updated connector instance details
     """
-    return update_user_connector(db, current_user.id, connector_id, updates)
+    return await update_user_connector(db, current_user.id, connector_id, updates)
 
 
 @router.delete("/user/{connector_id}")
 async def delete_connector(
     connector_id: uuid.UUID = Path(..., description="ID of the connector to delete"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Delete a user connector instance.
@@ -144,7 +214,7 @@ async def delete_connector(
     Returns:
         Deletion confirmation
     """
-    delete_user_connector(db, current_user.id, connector_id)
+    await delete_user_connector(db, current_user.id, connector_id)
     return {"message": "Connector deleted successfully"}
 
 
@@ -152,8 +222,8 @@ async def delete_connector(
 async def link_to_agent(
     connector_id: uuid.UUID = Path(..., description="ID of the connector to link"),
     agent_id: uuid.UUID = Path(..., description="ID of the agent to link to"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Link a connector to an agent.
@@ -163,15 +233,15 @@ async def link_to_agent(
     Returns:
         Link confirmation
     """
-    return link_connector_to_agent(db, current_user.id, agent_id, connector_id)
+    return await link_connector_to_agent(db, current_user.id, agent_id, connector_id)
 
 
 @router.delete("/user/{connector_id}/link/{agent_id}")
 async def unlink_from_agent(
     connector_id: uuid.UUID = Path(..., description="ID of the connector to unlink"),
     agent_id: uuid.UUID = Path(..., description="ID of the agent to unlink from"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Unlink a connector from an agent.
@@ -181,14 +251,14 @@ async def unlink_from_agent(
     Returns:
         Unlink confirmation
     """
-    return unlink_connector_from_agent(db, current_user.id, agent_id, connector_id)
+    return await unlink_connector_from_agent(db, current_user.id, agent_id, connector_id)
 
 
 @router.get("/agent/{agent_id}", response_model=UserConnectorList)
 async def get_connectors_for_agent(
     agent_id: uuid.UUID = Path(..., description="ID of the agent"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get all connectors linked to a specific agent.
@@ -196,7 +266,7 @@ async def get_connectors_for_agent(
     Returns:
         List of connectors linked to the agent
     """
-    connectors = get_agent_connectors(db, current_user.id, agent_id)
+    connectors = await get_agent_connectors(db, current_user.id, agent_id)
     return {
         "connectors": connectors,
         "count": len(connectors)
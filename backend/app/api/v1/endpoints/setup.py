@@ -1,17 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ....db.session import get_db
 from ....models import User, APIKey, LLMConfig
 from ....schemas.setup_schemas import SetupRequest, SetupResponse
 from ....services.setup_service import is_setup_complete
-from ....security import hash_password, encrypt_data
+from ....security import hash_password_async, encrypt_data, mask_secret
 
 router = APIRouter()
 
 
 @router.post("/setup", response_model=SetupResponse, status_code=201)
-async def perform_setup(setup_data: SetupRequest, db: Session = Depends(get_db)):
+async def perform_setup(setup_data: SetupRequest, db: AsyncSession = Depends(get_db)):
     """
     Perform initial system setup.
     
@@ -29,14 +29,14 @@ async def perform_setup(setup_data: SetupRequest, db: Session = Depends(get_db))
         HTTPException 403: If setup has already been completed
     """
     # Check if setup has already been completed
-    if is_setup_complete(db):
+    if await is_setup_complete(db):
         raise HTTPException(
             status_code=403,
             detail="Setup already completed. Cannot create another superuser account."
         )
     
     # Hash the password
-    hashed_password = hash_password(setup_data.password)
+    hashed_password = await hash_password_async(setup_data.password)
     
     # Encrypt the API key
     encrypted_api_key = encrypt_data(setup_data.api_key_value)
@@ -51,20 +51,21 @@ async def perform_setup(setup_data: SetupRequest, db: Session = Depends(get_db))
     
     # Add user to database
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     # Create API key entry
     new_api_key = APIKey(
         user_id=new_user.id,
         provider_name=setup_data.api_key_provider,
-        encrypted_key=encrypted_api_key
+        encrypted_key=encrypted_api_key,
+        masked_key=mask_secret(setup_data.api_key_value)
     )
     
     # Add API key to database
     db.add(new_api_key)
-    db.commit()
-    db.refresh(new_api_key)
+    await db.commit()
+    await db.refresh(new_api_key)
     
     # Create default LLM configurations based on the provider
     if setup_data.api_key_provider.lower() == "openai":
@@ -119,7 +120,7 @@ async def perform_setup(setup_data: SetupRequest, db: Session = Depends(get_db))
         )
         db.add(claude_haiku_config)
     
-    db.commit()
+    await db.commit()
     
     # Return success response
     return SetupResponse(
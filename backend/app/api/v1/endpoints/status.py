@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ....db.session import get_db
 from ....services.setup_service import is_setup_complete
@@ -14,7 +14,7 @@ class StatusResponse(BaseModel):
 
 
 @router.get("/status", response_model=StatusResponse)
-async def check_status(db: Session = Depends(get_db)):
+async def check_status(db: AsyncSession = Depends(get_db)):
     """
     Check the current status of the application.
     
@@ -27,7 +27,7 @@ async def check_status(db: Session = Depends(get_db)):
         Status information including whether setup is required
     """
     # Check if setup is completed (at least one superuser exists)
-    setup_completed = is_setup_complete(db)
+    setup_completed = await is_setup_complete(db)
     
     # Return the status response
     return StatusResponse(
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
@@ -6,14 +6,26 @@ from uuid import UUID
 
 from ....models import User, APIKey, LLMConfig, Agent
 from ....db.session import get_db
-from sqlalchemy.orm import Session
-from ...dependencies import get_current_active_user, get_current_superuser
-from ....security import decrypt_data, encrypt_data
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ...dependencies import get_current_active_user, get_current_superuser, get_read_db
+from ...etag import etag_matches, not_modified, set_etag, versioned_etag
+from ....security import SECRET_MASK, decrypt_data, encrypt_data, invalidate_credentials, mask_secret
+from ....security.principals import Principal
 from ....schemas import LLMConfigListResponse, LLMConfigResponse
 from ....services.llm_config_service import get_llm_configs_by_user
+from ....services.user_service import get_user_by_id, update_user_status
+from ....services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate
+from ....services.resource_versions import get_collection_version
 
 router = APIRouter()
 
+# Allowed sort fields for listing API keys
+API_KEY_SORT_COLUMNS = {
+    "created_at": APIKey.created_at,
+    "provider_name": APIKey.provider_name,
+}
+
 
 class UserResponse(BaseModel):
     """Schema for user information returned to clients."""
@@ -46,44 +58,112 @@ class ApiKeyCreate(BaseModel):
     api_key: str = Field(..., description="The API key to store")
 
 
+class UserStatusUpdate(BaseModel):
+    """Schema for changing a user's status flags."""
+    is_active: Optional[bool] = None
+    is_superuser: Optional[bool] = None
+
+
+async def _load_user(db: AsyncSession, user_id: UUID) -> User:
+    """Load the full user row behind a principal."""
+    user = await get_user_by_id(db, user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+
 @router.get("/users/me", response_model=UserResponse)
-async def read_users_me(current_user: User = Depends(get_current_active_user)):
+async def read_users_me(
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
     """
     Get information about the currently authenticated user.
     
     Args:
         current_user: Current authenticated user from the token dependency
+        db: Database session
         
     Returns:
         The user's information
     """
-    return current_user
+    return await _load_user(db, current_user.id)
 
 
 @router.get("/users/me/admin", response_model=UserResponse)
-async def read_users_me_admin(current_user: User = Depends(get_current_superuser)):
+async def read_users_me_admin(
+    current_user: Principal = Depends(get_current_superuser),
+    db: AsyncSession = Depends(get_read_db)
+):
     """
     Get information about the currently authenticated superuser.
     Endpoint is only accessible to superusers.
     
     Args:
         current_user: Current authenticated superuser from the token dependency
+        db: Database session
         
     Returns:
         The superuser's information
     """
-    return current_user
+    return await _load_user(db, current_user.id)
+
+
+@router.patch("/users/{user_id}/status", response_model=UserResponse)
+async def update_user_status_endpoint(
+    status_update: UserStatusUpdate,
+    user_id: UUID = Path(..., description="ID of the user to update"),
+    current_user: Principal = Depends(get_current_superuser),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Activate or deactivate a user, or grant or revoke superuser rights.
+    Endpoint is only accessible to superusers.
+    
+    Args:
+        status_update: Flags to change; omitted flags are left as they are
+        user_id: ID of the user to update
+        current_user: Current authenticated superuser from the token dependency
+        db: Database session
+        
+    Returns:
+        The updated user's information
+        
+    Raises:
+        HTTPException: If the user doesn't exist or a superuser tries to
+            demote or deactivate themselves
+    """
+    if user_id == current_user.id and (status_update.is_active is False or status_update.is_superuser is False):
+        raise HTTPException(status_code=400, detail="Superusers cannot deactivate or demote themselves")
+    return await update_user_status(
+        db,
+        user_id,
+        is_active=status_update.is_active,
+        is_superuser=status_update.is_superuser
+    )
 
 
 @router.get("/users/me/api-keys", response_model=List[APIKeyResponse])
 async def get_api_keys(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of API keys to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    sort: str = Query("created_at", description="Sort field (created_at, provider_name); prefix with '-' for descending"),
+    provider_name: Optional[str] = Query(None, description="Filter by provider"),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get the API keys for the currently authenticated user.
     
+    The cursor for the next page, if any, is returned in the X-Next-Cursor header.
+    
     Args:
+        response: Response object used to set the pagination header
+        limit: Maximum number of API keys to return
+        cursor: Cursor from the previous page
+        sort: Sort field
+        provider_name: Provider filter
         current_user: Current authenticated user from the token dependency
         db: Database session
         
@@ -91,21 +171,24 @@ async def get_api_keys(
         List of the user's API keys with masked values
     """
     # Query API keys for the current user
-    api_keys = db.query(APIKey).filter(APIKey.user_id == current_user.id).all()
+    query = select(APIKey).where(APIKey.user_id == current_user.id)
+    if provider_name:
+        query = query.where(APIKey.provider_name == provider_name)
+    api_keys, next_cursor = await paginate(
+        db, query, APIKey, sort, API_KEY_SORT_COLUMNS, limit, cursor
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     # Prepare the response with masked keys
     result = []
     for key in api_keys:
-        # Decrypt the key
-        decrypted_key = decrypt_data(key.encrypted_key)
-        
-        # Create a masked version (show first 4 and last 4 characters)
-        masked_key = "••••••••"
-        if decrypted_key:
-            if len(decrypted_key) > 8:
-                masked_key = f"{decrypted_key[:4]}{'•' * (len(decrypted_key) - 8)}{decrypted_key[-4:]}"
-            else:
-                masked_key = decrypted_key  # For very short keys, just show them
+        # The masked form is stored with the key; only keys stored before
+        # that was introduced (and not yet backfilled) need decrypting
+        masked_key = key.masked_key
+        if masked_key is None:
+            decrypted_key = decrypt_data(key.encrypted_key)
+            masked_key = mask_secret(decrypted_key) if decrypted_key else SECRET_MASK
         
         # Create response object with all fields from the model plus the masked key
         response_key = APIKeyResponse(
@@ -121,24 +204,45 @@ async def get_api_keys(
 
 @router.get("/users/me/llm-configs", response_model=List[LLMConfigResponse])
 async def get_user_llm_configs(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of configurations to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    sort: str = Query("created_at", description="Sort field (created_at, model_name); prefix with '-' for descending"),
+    provider: Optional[str] = Query(None, description="Filter by provider"),
+    is_default: Optional[bool] = Query(None, description="Filter by default flag"),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get a list of LLM configurations for the current user.
     
+    The cursor for the next page, if any, is returned in the X-Next-Cursor header.
+    Responses carry an ETag; send it back in If-None-Match to get a 304 while
+    none of the user's configurations have changed.
+    
     Returns:
         List of LLM configurations
     """
-    configs = get_llm_configs_by_user(db, current_user.id)
+    etag = versioned_etag(request, current_user.id, *await get_collection_version(db, LLMConfig, current_user.id))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
+    configs, next_cursor = await get_llm_configs_by_user(
+        db, current_user.id, limit=limit, cursor=cursor, sort=sort,
+        provider=provider, is_default=is_default
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return configs 
 
 
 @router.post("/users/me/api-keys", response_model=APIKeyResponse, status_code=201)
 async def create_api_key(
     api_key_data: ApiKeyCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new API key for the current user and set up default LLM configurations.
@@ -158,13 +262,14 @@ async def create_api_key(
     new_api_key = APIKey(
         user_id=current_user.id,
         provider_name=api_key_data.provider_name,
-        encrypted_key=encrypted_key
+        encrypted_key=encrypted_key,
+        masked_key=mask_secret(api_key_data.api_key)
     )
     
     # Add to database
     db.add(new_api_key)
-    db.commit()
-    db.refresh(new_api_key)
+    await db.commit()
+    await db.refresh(new_api_key)
     
     # Create default LLM configurations based on the provider
     if api_key_data.provider_name.lower() == "openai":
@@ -219,20 +324,13 @@ async def create_api_key(
         )
         db.add(claude_haiku_config)
     
-    db.commit()
+    await db.commit()
     
     # Return masked version for security
-    decrypted_key = api_key_data.api_key
-    masked_key = "••••••••"
-    if len(decrypted_key) > 8:
-        masked_key = f"{decrypted_key[:4]}{'•' * (len(decrypted_key) - 8)}{decrypted_key[-4:]}"
-    else:
-        masked_key = decrypted_key
-    
     return APIKeyResponse(
         id=new_api_key.id,
         provider_name=new_api_key.provider_name,
-        masked_key=masked_key,
+        masked_key=new_api_key.masked_key,
         created_at=new_api_key.created_at
     ) 
 
@@ -240,8 +338,8 @@ async def create_api_key(
 @router.delete("/users/me/api-keys/{api_key_id}", status_code=204)
 async def delete_api_key(
     api_key_id: UUID = Path(...),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete an API key and its associated LLM configurations.
@@ -258,10 +356,13 @@ async def delete_api_key(
         HTTPException: If the API key doesn't exist or isn't owned by the user
     """
     # Find the API key
-    api_key = db.query(APIKey).filter(
-        APIKey.id == api_key_id,
-        APIKey.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(APIKey).where(
+            APIKey.id == api_key_id,
+            APIKey.user_id == current_user.id
+        )
+    )
+    api_key = result.scalars().first()
     
     if not api_key:
         raise HTTPException(
@@ -270,18 +371,22 @@ async def delete_api_key(
         )
     
     # Find LLM configurations using this API key
-    llm_configs = db.query(LLMConfig).filter(
-        LLMConfig.user_id == current_user.id,
-        LLMConfig.encrypted_credentials == api_key.encrypted_key
-    ).all()
+    result = await db.execute(
+        select(LLMConfig).where(
+            LLMConfig.user_id == current_user.id,
+            LLMConfig.encrypted_credentials == api_key.encrypted_key
+        )
+    )
+    llm_configs = result.scalars().all()
     
     # Check if any of these LLM configs are used by agents
     affected_agents = []
     for llm_config in llm_configs:
         # Find agents using this LLM config
-        agents = db.query(Agent).filter(
-            Agent.llm_config_id == llm_config.id
-        ).all()
+        result = await db.execute(
+            select(Agent).where(Agent.llm_config_id == llm_config.id)
+        )
+        agents = result.scalars().all()
         
         # Update these agents to have no LLM config
         for agent in agents:
@@ -290,12 +395,15 @@ async def delete_api_key(
     
     # Delete LLM configurations
     for llm_config in llm_configs:
-        db.delete(llm_config)
+        await db.delete(llm_config)
     
     # Delete the API key
-    db.delete(api_key)
+    await db.delete(api_key)
     
     # Commit changes
-    db.commit()
+    await db.commit()
+    
+    # Forget the plaintext cached for chat (shared by the key and its configurations)
+    invalidate_credentials(api_key.encrypted_key)
     
     return None 
\ No newline at end of file
@@ -0,0 +1,195 @@
+"""
+Resumable, batched data backfills.
+
+A backfill walks a table in key order one keyset batch at a time and applies
+a set-based statement to each batch in its own transaction. The last key of
+the batch is written to backfill_checkpoints in the same transaction, so an
+interrupted run resumes after the last committed batch and never applies a
+batch twice. Statements should still be idempotent (e.g. INSERT ... SELECT
+... WHERE NOT EXISTS) so that a --restart from the beginning is safe.
+
+Backfills run on the synchronous engine, outside the API's event loop.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import and_, delete, insert, select, true, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import func
+
+from .models import BackfillCheckpoint
+
+logger = logging.getLogger(__name__)
+
+# Seconds between progress log lines
+PROGRESS_INTERVAL = 5.0
+
+
+class Backfill:
+    """
+    Base class for backfills.
+
+    Subclasses set ``name`` and ``key_column`` (a unique, ordered Core column
+    of the table being walked, e.g. ``Model.__table__.c.id``; ORM attributes
+    cannot be class attributes here) and implement ``apply`` and ``pending``
+    for a half-open key range (lower, upper].
+    """
+
+    name: str = ""
+    key_column: Any = None
+    batch_size: int = 1000
+
+    def parse_key(self, value: str) -> Any:
+        """Convert a checkpointed key back from text."""
+        return value
+
+    def key_range(self, lower: Any, upper: Any):
+        """Condition selecting keys in (lower, upper]; lower is None for the first batch."""
+        return and_(
+            self.key_column > lower if lower is not None else true(),
+            self.key_column <= upper
+        )
+
+    def apply(self, conn: Connection, lower: Any, upper: Any) -> int:
+        """
+        Apply the backfill to one batch.
+
+        Args:
+            conn: Connection with the batch's transaction open
+            lower: Exclusive lower key bound, or None for the first batch
+            upper: Inclusive upper key bound
+
+        Returns:
+            Number of rows written
+        """
+        raise NotImplementedError
+
+    def pending(self, conn: Connection, lower: Any, upper: Any) -> int:
+        """Count the rows ``apply`` would write for a batch (used by dry runs)."""
+        raise NotImplementedError
+
+
+@dataclass
+class BackfillResult:
+    """Totals for one backfill run."""
+    batches: int = 0
+    rows_scanned: int = 0
+    rows_written: int = 0
+    seconds: float = 0.0
+    dry_run: bool = False
+
+
+def _load_checkpoint(conn: Connection, name: str) -> Optional[Any]:
+    """Get the checkpoint row for a backfill, if any."""
+    return conn.execute(
+        select(BackfillCheckpoint).where(BackfillCheckpoint.name == name)
+    ).first()
+
+
+def _save_checkpoint(conn: Connection, name: str, last_key: Any, scanned: int, written: int) -> None:
+    """Record a finished batch in the checkpoint row."""
+    values = {
+        "last_key": str(last_key),
+        "rows_scanned": BackfillCheckpoint.rows_scanned + scanned,
+        "rows_written": BackfillCheckpoint.rows_written + written,
+        "updated_at": func.now(),
+    }
+    result = conn.execute(
+        update(BackfillCheckpoint).where(BackfillCheckpoint.name == name).values(**values)
+    )
+    if result.rowcount == 0:
+        conn.execute(insert(BackfillCheckpoint).values(
+            name=name, last_key=str(last_key), rows_scanned=scanned, rows_written=written
+        ))
+
+
+def run_backfill(
+    backfill: Backfill,
+    engine: Engine,
+    dry_run: bool = False,
+    restart: bool = False,
+    batch_size: Optional[int] = None
+) -> BackfillResult:
+    """
+    Run a backfill to completion, resuming from its checkpoint.
+
+    Args:
+        backfill: Backfill to run
+        engine: Synchronous engine
+        dry_run: Count what each batch would write without writing or checkpointing
+        restart: Ignore (and, unless dry_run, clear) the existing checkpoint
+        batch_size: Keys per batch, overriding the backfill's default
+
+    Returns:
+        Totals for this run
+    """
+    batch_size = batch_size or backfill.batch_size
+    result = BackfillResult(dry_run=dry_run)
+    key = backfill.key_column
+
+    with engine.begin() as conn:
+        if restart and not dry_run:
+            conn.execute(delete(BackfillCheckpoint).where(BackfillCheckpoint.name == backfill.name))
+        checkpoint = None if restart else _load_checkpoint(conn, backfill.name)
+
+    if checkpoint is not None and checkpoint.completed_at is not None:
+        logger.info(f"Backfill {backfill.name} already completed at {checkpoint.completed_at}; use --restart to run it again")
+        return result
+
+    lower = backfill.parse_key(checkpoint.last_key) if checkpoint and checkpoint.last_key else None
+    if lower is not None:
+        logger.info(f"Resuming backfill {backfill.name} after key {lower}")
+
+    start = time.monotonic()
+    last_report = start
+    while True:
+        # One transaction per batch; the checkpoint commits together with the batch
+        with engine.connect() as conn:
+            query = select(key).order_by(key).limit(batch_size)
+            if lower is not None:
+                query = query.where(key > lower)
+            keys = conn.execute(query).scalars().all()
+            if not keys:
+                if not dry_run:
+                    conn.execute(
+                        update(BackfillCheckpoint)
+                        .where(BackfillCheckpoint.name == backfill.name)
+                        .values(completed_at=func.now())
+                    )
+                    conn.commit()
+                break
+
+            upper = keys[-1]
+            if dry_run:
+                written = backfill.pending(conn, lower, upper)
+                conn.rollback()
+            else:
+                written = backfill.apply(conn, lower, upper)
+                _save_checkpoint(conn, backfill.name, upper, len(keys), written)
+                conn.commit()
+
+        result.batches += 1
+        result.rows_scanned += len(keys)
+        result.rows_written += written
+        lower = upper
+
+        now = time.monotonic()
+        if now - last_report >= PROGRESS_INTERVAL:
+            rate = result.rows_scanned / (now - start)
+            logger.info(
+                f"{backfill.name}: {result.batches} batches, {result.rows_scanned} rows scanned, "
+                f"{result.rows_written} {'would be ' if dry_run else ''}written ({rate:.0f} rows/s)"
+            )
+            last_report = now
+
+    result.seconds = time.monotonic() - start
+    rate = result.rows_scanned / result.seconds if result.seconds else 0.0
+    logger.info(
+        f"{backfill.name} {'dry run ' if dry_run else ''}finished: {result.batches} batches, "
+        f"{result.rows_scanned} rows scanned, {result.rows_written} {'would be ' if dry_run else ''}written "
+        f"in {result.seconds:.1f}s ({rate:.0f} rows/s)"
+    )
+    return result
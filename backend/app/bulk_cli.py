@@ -0,0 +1,83 @@
+"""
+Command-line bulk import/export of a user's agents, connectors and links.
+
+    python -m app.bulk_cli export --email user@example.com [--format csv --kind agents] [--output FILE]
+    python -m app.bulk_cli import --email user@example.com --file FILE [--format csv --kind agents]
+                                  [--on-conflict skip|error] [--dry-run]
+
+Uses the same service code and file formats as the /api/v1/bulk endpoints.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from fastapi import HTTPException
+
+from app.db.session import AsyncSessionLocal, async_engine
+from app.schemas.bulk_schemas import BulkConflictMode, BulkFormat, BulkKind
+from app.services.bulk_service import export_records, import_records
+from app.services.user_service import get_user_by_email
+
+
+async def run(args: argparse.Namespace) -> int:
+    fmt = BulkFormat(args.format)
+    kind = BulkKind(args.kind) if args.kind else None
+
+    try:
+        async with AsyncSessionLocal() as db:
+            user = await get_user_by_email(db, args.email)
+            if not user:
+                print(f"No user with email {args.email}", file=sys.stderr)
+                return 1
+
+            if args.command == "export":
+                out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+                try:
+                    async for chunk in export_records(db, user.id, fmt, kind):
+                        out.write(chunk)
+                finally:
+                    if out is not sys.stdout:
+                        out.close()
+                return 0
+
+            with open(args.file, encoding="utf-8") as f:
+                data = f.read()
+            result = await import_records(
+                db, user.id, data, fmt, kind, BulkConflictMode(args.on_conflict), args.dry_run
+            )
+            print(json.dumps(result.model_dump(), indent=2))
+            return 0
+    except HTTPException as e:
+        detail = e.detail
+        if isinstance(detail, dict) and "errors" in detail:
+            detail = "\n".join(detail["errors"])
+        print(f"Error: {detail}", file=sys.stderr)
+        return 1
+    finally:
+        await async_engine.dispose()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk import/export of agents, connectors and links")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("export", "import"):
+        sub = subparsers.add_parser(name)
+        sub.add_argument("--email", required=True, help="Email of the user to export from / import into")
+        sub.add_argument("--format", choices=[f.value for f in BulkFormat], default=BulkFormat.NDJSON.value)
+        sub.add_argument("--kind", choices=[k.value for k in BulkKind], help="Record kind (required for CSV)")
+
+    subparsers.choices["export"].add_argument("--output", help="Output file (default: stdout)")
+    import_parser = subparsers.choices["import"]
+    import_parser.add_argument("--file", required=True, help="NDJSON or CSV file to import")
+    import_parser.add_argument("--on-conflict", choices=[m.value for m in BulkConflictMode],
+                               default=BulkConflictMode.SKIP.value)
+    import_parser.add_argument("--dry-run", action="store_true", help="Validate and count without writing")
+
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Connector implementations for AgentBase.
+
+Each connector type in the catalog points here through its ``execution_ref``
+(e.g. "connectors.gmail"). This package also holds the machinery shared by
+connectors, such as background health checks.
+"""
+
+from .calendar import CalendarApi, CalendarConnector, EventIndex, HttpCalendarApi, LocalCalendarApi
+from .health import (
+    HealthCheckScheduler,
+    HealthProbe,
+    ProbeOutcome,
+    ProbeResult,
+    ProbeTarget,
+    StubProbe,
+    get_probe,
+    register_probe,
+)
+from .gmail import GmailApi, GmailConnector, HttpGmailApi, LocalGmailApi
+from .oauth import (
+    LocalTokenEndpoint,
+    OAuthCredentials,
+    OAuthError,
+    TokenManager,
+    token_manager,
+)
+from .sync import ConnectorError, CursorExpired, IncrementalSync
+from .web_search import (
+    LocalSearchProvider,
+    SearchProvider,
+    SearchResult,
+    WebSearchConnector,
+    normalize_query,
+    normalize_url,
+    register_provider,
+)
+
+__all__ = [
+    "CalendarApi",
+    "CalendarConnector",
+    "ConnectorError",
+    "CursorExpired",
+    "EventIndex",
+    "GmailApi",
+    "GmailConnector",
+    "HealthCheckScheduler",
+    "HealthProbe",
+    "HttpCalendarApi",
+    "HttpGmailApi",
+    "IncrementalSync",
+    "LocalCalendarApi",
+    "LocalGmailApi",
+    "LocalSearchProvider",
+    "LocalTokenEndpoint",
+    "OAuthCredentials",
+    "OAuthError",
+    "ProbeOutcome",
+    "ProbeResult",
+    "ProbeTarget",
+    "SearchProvider",
+    "SearchResult",
+    "StubProbe",
+    "TokenManager",
+    "WebSearchConnector",
+    "get_probe",
+    "normalize_query",
+    "normalize_url",
+    "register_probe",
+    "register_provider",
+    "token_manager",
+]
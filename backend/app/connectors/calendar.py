@@ -0,0 +1,494 @@
+"""
+Google Calendar connector.
+
+Each Calendar connector keeps a local store of its calendar's events
+(calendar_events), from CALENDAR_PAST_DAYS ago onwards, with recurring events
+expanded into occurrences. The first sync lists those events; later syncs ask
+Google for the changes since the stored sync token. As the window slides
+forward, occurrences entering it are not changes, so the store is also rebuilt
+in full every CALENDAR_FULL_SYNC_INTERVAL seconds. Questions such as "am I
+free at 3pm", "when is my next meeting" or "what is on Tuesday" are answered
+from an in-memory index of the store, rebuilt after each sync, so they cost a
+binary search or two rather than an API call.
+
+The Calendar API is pluggable: HttpCalendarApi calls Google, LocalCalendarApi
+is an in-memory calendar with the same responses, for tests and local runs.
+"""
+
+import logging
+import os
+import uuid
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import delete, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db.session import AsyncSessionLocal
+from ..models import CalendarEvent
+from ..ttl_cache import TTLCache
+from .oauth import OAUTH_HTTP_TIMEOUT, TokenManager, token_manager
+from .sync import ConnectorError, CursorExpired, IncrementalSync, _as_utc, batched, dialect_insert
+
+logger = logging.getLogger(__name__)
+
+# Google Calendar API base URL
+CALENDAR_API_URL = os.getenv("CALENDAR_API_URL", "https://www.googleapis.com/calendar/v3")
+
+# Days of past events kept in each connector's store
+CALENDAR_PAST_DAYS = int(os.getenv("CALENDAR_PAST_DAYS", "30"))
+
+# Days ahead beyond which event occurrences are not stored
+CALENDAR_FUTURE_DAYS = int(os.getenv("CALENDAR_FUTURE_DAYS", "365"))
+
+# Seconds a store may go unsynced before a query syncs it first
+CALENDAR_SYNC_MAX_AGE = float(os.getenv("CALENDAR_SYNC_MAX_AGE", "60"))
+
+# Seconds between full resyncs, which pick up occurrences the sliding window reaches
+CALENDAR_FULL_SYNC_INTERVAL = float(os.getenv("CALENDAR_FULL_SYNC_INTERVAL", "86400"))
+
+# Connectors whose event index is kept in memory per worker
+CALENDAR_INDEX_CACHE_SIZE = int(os.getenv("CALENDAR_INDEX_CACHE_SIZE", "1000"))
+
+
+class CalendarApi(ABC):
+    """The subset of the Google Calendar API the connector uses; methods return Google's JSON."""
+
+    @abstractmethod
+    async def list_events(
+        self,
+        access_token: str,
+        calendar_id: str,
+        sync_token: Optional[str] = None,
+        time_min: Optional[datetime] = None,
+        page_token: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        events.list with recurring events expanded (singleEvents).
+
+        A sync_token request returns the events changed since the token,
+        including cancelled ones. The last page carries nextSyncToken.
+
+        Raises:
+            CursorExpired: If the sync token is no longer valid
+            ConnectorError: If the call fails
+        """
+
+
+class HttpCalendarApi(CalendarApi):
+    """Google Calendar API over HTTPS."""
+
+    def __init__(self, base_url: str = CALENDAR_API_URL, timeout: float = OAUTH_HTTP_TIMEOUT):
+        self.base_url = base_url
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def list_events(
+        self,
+        access_token: str,
+        calendar_id: str,
+        sync_token: Optional[str] = None,
+        time_min: Optional[datetime] = None,
+        page_token: Optional[str] = None
+    ) -> Dict[str, Any]:
+        if self._client is None:
+            self._client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout)
+        params: Dict[str, Any] = {"singleEvents": "true", "maxResults": 2500}
+        if sync_token:
+            params["syncToken"] = sync_token
+        elif time_min:
+            params["timeMin"] = time_min.isoformat()
+        if page_token:
+            params["pageToken"] = page_token
+        try:
+            response = await self._client.get(
+                f"/calendars/{calendar_id}/events", params=params,
+                headers={"Authorization": f"Bearer {access_token}"}
+            )
+        except httpx.HTTPError as e:
+            raise ConnectorError(f"Calendar API unreachable: {e}")
+        if response.status_code == 200:
+            return response.json()
+        if response.status_code == 410:
+            raise CursorExpired("Calendar sync token expired")
+        raise ConnectorError(
+            f"Calendar API returned HTTP {response.status_code}",
+            permanent=response.status_code in (403, 404)
+        )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class LocalCalendarApi(CalendarApi):
+    """
+    In-memory calendar answering like the Calendar API, for tests and local runs.
+
+    Events are added with add_event and changed with update_event and
+    cancel_event. Sync tokens are change counters; expire_sync_tokens makes
+    every token issued so far invalid.
+    """
+
+    def __init__(self, page_size: int = 250):
+        self.page_size = page_size
+        self.events: Dict[str, Dict[str, Any]] = {}
+        self._changed: Dict[str, int] = {}
+        self.sequence = 0
+        self.oldest_sync_token = 0
+        self.calls = 0
+
+    def _touch(self, event_id: str) -> None:
+        self.sequence += 1
+        self._changed[event_id] = self.sequence
+
+    def add_event(self, summary: str, start: Any, end: Any, transparent: bool = False,
+                  location: Optional[str] = None) -> str:
+        """Add an event; dates make an all-day event, datetimes a timed one."""
+        event_id = uuid.uuid4().hex
+        self.events[event_id] = {"id": event_id, "status": "confirmed"}
+        self.update_event(event_id, summary=summary, start=start, end=end,
+                          transparent=transparent, location=location)
+        return event_id
+
+    def update_event(self, event_id: str, **fields: Any) -> None:
+        event = self.events[event_id]
+        for name, value in fields.items():
+            if name in ("start", "end"):
+                event[name] = {"dateTime": value.isoformat()} if isinstance(value, datetime) else {"date": value.isoformat()}
+            elif name == "transparent":
+                event["transparency"] = "transparent" if value else "opaque"
+            else:
+                event[name] = value
+        self._touch(event_id)
+
+    def cancel_event(self, event_id: str) -> None:
+        self.events[event_id] = {"id": event_id, "status": "cancelled"}
+        self._touch(event_id)
+
+    def expire_sync_tokens(self) -> None:
+        self.oldest_sync_token = self.sequence + 1
+
+    async def list_events(
+        self,
+        access_token: str,
+        calendar_id: str,
+        sync_token: Optional[str] = None,
+        time_min: Optional[datetime] = None,
+        page_token: Optional[str] = None
+    ) -> Dict[str, Any]:
+        self.calls += 1
+        if sync_token is not None:
+            if int(sync_token) < self.oldest_sync_token:
+                raise CursorExpired("Calendar sync token expired")
+            items = [self.events[i] for i, seq in self._changed.items() if seq > int(sync_token)]
+        else:
+            # A full listing leaves out cancelled events and, like Google, filters on end time
+            items = [
+                e for e in self.events.values()
+                if e["status"] != "cancelled" and (time_min is None or _event_bounds(e)[1] > time_min)
+            ]
+        offset = int(page_token or 0)
+        page = {"items": items[offset:offset + self.page_size]}
+        if offset + self.page_size < len(items):
+            page["nextPageToken"] = str(offset + self.page_size)
+        else:
+            page["nextSyncToken"] = str(self.sequence)
+        return page
+
+
+def _parse_time(value: Dict[str, str]) -> Tuple[datetime, bool]:
+    """Parse an event start or end into (UTC datetime, all-day)."""
+    if "dateTime" in value:
+        return _as_utc(datetime.fromisoformat(value["dateTime"].replace("Z", "+00:00"))).astimezone(timezone.utc), False
+    # All-day events have no time zone; they are placed at UTC midnight
+    day = date.fromisoformat(value["date"])
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc), True
+
+
+def _event_bounds(event: Dict[str, Any]) -> Tuple[datetime, datetime]:
+    return _parse_time(event["start"])[0], _parse_time(event["end"])[0]
+
+
+def _event_row(connector_id: uuid.UUID, event: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a Calendar event into a calendar_events row."""
+    start_at, all_day = _parse_time(event["start"])
+    end_at, _ = _parse_time(event["end"])
+    declined = any(
+        attendee.get("self") and attendee.get("responseStatus") == "declined"
+        for attendee in event.get("attendees", [])
+    )
+    return {
+        "user_connector_id": connector_id,
+        "event_id": event["id"],
+        "summary": event.get("summary"),
+        "location": event.get("location"),
+        "start_at": start_at,
+        "end_at": max(end_at, start_at),
+        "all_day": all_day,
+        "busy": event.get("transparency") != "transparent" and not declined,
+    }
+
+
+@dataclass(frozen=True)
+class IndexedEvent:
+    """An event as held by EventIndex; start and end are UNIX timestamps."""
+    event_id: str
+    summary: Optional[str]
+    location: Optional[str]
+    start: float
+    end: float
+    all_day: bool
+    busy: bool
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.event_id,
+            "summary": self.summary,
+            "location": self.location,
+            "start": datetime.fromtimestamp(self.start, timezone.utc).isoformat(),
+            "end": datetime.fromtimestamp(self.end, timezone.utc).isoformat(),
+            "all_day": self.all_day,
+            "busy": self.busy,
+        }
+
+
+class EventIndex:
+    """
+    Static interval index over events.
+
+    Events are kept in an array sorted by start time, with an implicit
+    binary tree over it whose nodes hold the latest end time beneath them.
+    Events starting before a time are a prefix of the array (one binary
+    search); the tree then finds those in the prefix that end after a
+    time without visiting subtrees that all end earlier. Overlap queries
+    take O(log n) plus O(log n) per event returned.
+    """
+
+    def __init__(self, events: Iterable[IndexedEvent]):
+        self.events = sorted(events, key=lambda e: (e.start, e.end))
+        self.starts = [e.start for e in self.events]
+        self._size = 1
+        while self._size < len(self.events):
+            self._size *= 2
+        self._max_end = [float("-inf")] * (2 * self._size)
+        for i, event in enumerate(self.events):
+            self._max_end[self._size + i] = event.end
+        for node in range(self._size - 1, 0, -1):
+            self._max_end[node] = max(self._max_end[2 * node], self._max_end[2 * node + 1])
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def _ending_after(self, count: int, after: float, node: int, lo: int, hi: int, out: List[IndexedEvent]) -> None:
+        # Collect events among the first `count` that end after `after`, in start order
+        if lo >= count or self._max_end[node] <= after:
+            return
+        if hi - lo == 1:
+            out.append(self.events[lo])
+            return
+        mid = (lo + hi) // 2
+        self._ending_after(count, after, 2 * node, lo, mid, out)
+        self._ending_after(count, after, 2 * node + 1, mid, hi, out)
+
+    def at(self, moment: float) -> List[IndexedEvent]:
+        """Events in progress at a moment."""
+        out: List[IndexedEvent] = []
+        self._ending_after(bisect_right(self.starts, moment), moment, 1, 0, self._size, out)
+        return out
+
+    def overlapping(self, start: float, end: float) -> List[IndexedEvent]:
+        """Events overlapping [start, end), in start order."""
+        if end <= start:
+            return self.at(start)
+        out: List[IndexedEvent] = []
+        self._ending_after(bisect_left(self.starts, end), start, 1, 0, self._size, out)
+        return out
+
+    def next_after(self, moment: float) -> Optional[IndexedEvent]:
+        """The first event starting after a moment."""
+        i = bisect_right(self.starts, moment)
+        return self.events[i] if i < len(self.events) else None
+
+
+class CalendarIndex:
+    """
+    A connector's events, indexed for agent questions.
+
+    Args:
+        events: The connector's stored events
+    """
+
+    def __init__(self, events: Iterable[IndexedEvent]):
+        events = list(events)
+        self.all = EventIndex(events)
+        # Free/busy and "next meeting" only consider timed events the user is busy for
+        self.meetings = EventIndex(e for e in events if e.busy and not e.all_day)
+
+
+def _timestamp(value: datetime) -> float:
+    return _as_utc(value).timestamp()
+
+
+class CalendarConnector(IncrementalSync):
+    """
+    Answers calendar questions from a connector's synced event store.
+
+    Args:
+        api: Calendar API implementation
+        session_factory: Callable returning an AsyncSession on the primary
+        tokens: Token manager supplying access tokens
+        max_age: Seconds a store may go unsynced before a query syncs it
+        calendar_id: Calendar to sync
+        full_sync_interval: Seconds between full resyncs of a store
+    """
+
+    def __init__(
+        self,
+        api: Optional[CalendarApi] = None,
+        session_factory=AsyncSessionLocal,
+        tokens: TokenManager = token_manager,
+        max_age: float = CALENDAR_SYNC_MAX_AGE,
+        calendar_id: str = "primary",
+        full_sync_interval: float = CALENDAR_FULL_SYNC_INTERVAL
+    ):
+        super().__init__(session_factory, tokens, max_age, full_sync_interval)
+        self.api = api or HttpCalendarApi()
+        self.calendar_id = calendar_id
+        # Dropped after every sync; the TTL only releases indexes of idle connectors
+        self._indexes: TTLCache[uuid.UUID, CalendarIndex] = TTLCache(CALENDAR_INDEX_CACHE_SIZE, 24 * 3600)
+
+    async def _list(self, access_token: str, sync_token: Optional[str], time_min: Optional[datetime]) -> Tuple[Any, str]:
+        items: List[Dict[str, Any]] = []
+        page_token = None
+        while True:
+            page = await self.api.list_events(access_token, self.calendar_id, sync_token, time_min, page_token)
+            items += page.get("items", [])
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                return items, page["nextSyncToken"]
+
+    async def fetch_full(self, access_token: str) -> Tuple[Any, str]:
+        return await self._list(access_token, None, datetime.now(timezone.utc) - timedelta(days=CALENDAR_PAST_DAYS))
+
+    async def fetch_changes(self, access_token: str, cursor: str) -> Tuple[Any, str]:
+        return await self._list(access_token, cursor, None)
+
+    async def apply(self, db: AsyncSession, connector_id: uuid.UUID, data: Any, full: bool) -> None:
+        now = datetime.now(timezone.utc)
+        window_start = now - timedelta(days=CALENDAR_PAST_DAYS)
+        window_end = now + timedelta(days=CALENDAR_FUTURE_DAYS)
+        rows: Dict[str, Dict[str, Any]] = {}
+        removed = set()
+        for event in data:
+            if event.get("status") == "cancelled" or "start" not in event:
+                removed.add(event["id"])
+                rows.pop(event["id"], None)
+                continue
+            row = _event_row(connector_id, event)
+            if row["end_at"] < window_start or row["start_at"] > window_end:
+                removed.add(event["id"])
+                rows.pop(event["id"], None)
+            else:
+                rows[event["id"]] = row
+                removed.discard(event["id"])
+        insert = dialect_insert(db)
+        for batch in batched(list(rows.values()), len(CalendarEvent.__table__.columns)):
+            statement = insert(CalendarEvent).values(batch)
+            await db.execute(statement.on_conflict_do_update(
+                index_elements=[CalendarEvent.user_connector_id, CalendarEvent.event_id],
+                set_={column: statement.excluded[column] for column in
+                      ("summary", "location", "start_at", "end_at", "all_day", "busy")}
+            ))
+        if not full:
+            for batch in batched(sorted(removed), 1):
+                await db.execute(delete(CalendarEvent).where(
+                    CalendarEvent.user_connector_id == connector_id,
+                    CalendarEvent.event_id.in_(batch)
+                ))
+        # Keep the store to the configured window
+        await db.execute(delete(CalendarEvent).where(
+            CalendarEvent.user_connector_id == connector_id,
+            or_(CalendarEvent.end_at < window_start, CalendarEvent.start_at > window_end)
+        ))
+
+    async def clear(self, db: AsyncSession, connector_id: uuid.UUID) -> None:
+        await db.execute(delete(CalendarEvent).where(CalendarEvent.user_connector_id == connector_id))
+
+    def synced(self, connector_id: uuid.UUID) -> None:
+        self._indexes.delete(connector_id)
+
+    async def get_index(self, connector_id: uuid.UUID) -> CalendarIndex:
+        """
+        Get a connector's event index, syncing the store first if it is stale.
+
+        Raises:
+            ConnectorError: If the store has never been synced and syncing failed
+            OAuthError: Likewise, if no access token could be obtained
+        """
+        await self.ensure_fresh(connector_id)
+        index = self._indexes.get(connector_id)
+        if index is None:
+            async with self.session_factory() as db:
+                result = await db.execute(
+                    select(CalendarEvent).where(CalendarEvent.user_connector_id == connector_id)
+                )
+                index = CalendarIndex(
+                    IndexedEvent(e.event_id, e.summary, e.location, _timestamp(e.start_at),
+                                 _timestamp(e.end_at), e.all_day, e.busy)
+                    for e in result.scalars()
+                )
+            self._indexes.set(connector_id, index)
+        return index
+
+    async def is_free(self, connector_id: uuid.UUID, start: datetime,
+                      end: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Check whether the user is free at a moment or for a period.
+
+        Args:
+            connector_id: ID of the Calendar user connector
+            start: Moment to check, or start of the period
+            end: End of the period (exclusive); omit to check a moment
+
+        Returns:
+            {"free": bool, "conflicts": [events the user is busy with]}
+        """
+        index = await self.get_index(connector_id)
+        conflicts = index.meetings.overlapping(_timestamp(start), _timestamp(end or start))
+        return {"free": not conflicts, "conflicts": [e.to_dict() for e in conflicts]}
+
+    async def next_meeting(self, connector_id: uuid.UUID, after: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the next meeting starting after a moment (default now).
+
+        Returns:
+            The event, or None if there is none in the store
+        """
+        index = await self.get_index(connector_id)
+        event = index.meetings.next_after(_timestamp(after or datetime.now(timezone.utc)))
+        return event.to_dict() if event else None
+
+    async def list_events(self, connector_id: uuid.UUID, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """
+        List the events overlapping a period, including all-day and free ones.
+
+        Args:
+            connector_id: ID of the Calendar user connector
+            start: Start of the period
+            end: End of the period (exclusive)
+
+        Returns:
+            Events in start order
+        """
+        index = await self.get_index(connector_id)
+        return [e.to_dict() for e in index.all.overlapping(_timestamp(start), _timestamp(end))]
+
+
+# Calendar connector used by agents (execution_ref "connectors.calendar")
+calendar = CalendarConnector()
@@ -0,0 +1,508 @@
+"""
+Gmail connector.
+
+Agents mostly ask about recent mail, so each Gmail connector keeps a local
+index of message metadata and snippets (gmail_messages) covering the last
+GMAIL_INDEX_DAYS days. The first sync lists and fetches those messages; later
+syncs replay the mailbox history since the stored history ID, fetching only
+messages that were added or relabelled and dropping deleted ones. Searches
+are answered from the index after an incremental sync if it is older than
+GMAIL_SYNC_MAX_AGE seconds. A message's full body is fetched from Gmail only
+when asked for, and kept briefly in memory.
+
+The Gmail API is pluggable: HttpGmailApi calls Google, LocalGmailApi is an
+in-memory mailbox with the same responses, for tests and local runs.
+"""
+
+import asyncio
+import base64
+import logging
+import os
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import and_, delete, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db.session import AsyncSessionLocal
+from ..models import GmailMessage, GmailMessageLabel
+from ..ttl_cache import TTLCache
+from .oauth import OAUTH_HTTP_TIMEOUT, TokenManager, token_manager
+from .sync import ConnectorError, CursorExpired, IncrementalSync, batched, dialect_insert
+
+logger = logging.getLogger(__name__)
+
+# Gmail API base URL
+GMAIL_API_URL = os.getenv("GMAIL_API_URL", "https://gmail.googleapis.com/gmail/v1/users/me")
+
+# Days of mail kept in each connector's index
+GMAIL_INDEX_DAYS = int(os.getenv("GMAIL_INDEX_DAYS", "30"))
+
+# Maximum messages fetched by a full sync
+GMAIL_BACKFILL_LIMIT = int(os.getenv("GMAIL_BACKFILL_LIMIT", "2000"))
+
+# Seconds an index may go unsynced before a search syncs it first
+GMAIL_SYNC_MAX_AGE = float(os.getenv("GMAIL_SYNC_MAX_AGE", "60"))
+
+# Maximum concurrent message fetches per sync
+GMAIL_FETCH_CONCURRENCY = int(os.getenv("GMAIL_FETCH_CONCURRENCY", "10"))
+
+# Full messages kept in memory per worker, and for how many seconds
+GMAIL_MESSAGE_CACHE_SIZE = int(os.getenv("GMAIL_MESSAGE_CACHE_SIZE", "500"))
+GMAIL_MESSAGE_CACHE_TTL = float(os.getenv("GMAIL_MESSAGE_CACHE_TTL", "300"))
+
+# Headers stored in the index
+_METADATA_HEADERS = ("From", "To", "Cc", "Subject")
+
+
+class GmailApi(ABC):
+    """The subset of the Gmail API the connector uses; methods return Gmail's JSON."""
+
+    @abstractmethod
+    async def get_profile(self, access_token: str) -> Dict[str, Any]:
+        """users.getProfile: includes the mailbox's current historyId."""
+
+    @abstractmethod
+    async def list_messages(self, access_token: str, query: str,
+                            page_token: Optional[str] = None) -> Dict[str, Any]:
+        """users.messages.list: message IDs matching a search, newest first."""
+
+    @abstractmethod
+    async def get_message(self, access_token: str, message_id: str, format: str = "metadata") -> Dict[str, Any]:
+        """
+        users.messages.get in "metadata" or "full" format.
+
+        Raises:
+            ConnectorError: If the message no longer exists (permanent) or
+                the call fails
+        """
+
+    @abstractmethod
+    async def list_history(self, access_token: str, start_history_id: str,
+                           page_token: Optional[str] = None) -> Dict[str, Any]:
+        """
+        users.history.list: mailbox changes after a history ID.
+
+        Raises:
+            CursorExpired: If the history ID is too old
+        """
+
+
+class HttpGmailApi(GmailApi):
+    """Gmail API over HTTPS."""
+
+    def __init__(self, base_url: str = GMAIL_API_URL, timeout: float = OAUTH_HTTP_TIMEOUT):
+        self.base_url = base_url
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def _get(self, access_token: str, path: str, params: Any = None) -> Dict[str, Any]:
+        if self._client is None:
+            self._client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout)
+        try:
+            response = await self._client.get(
+                path, params=params, headers={"Authorization": f"Bearer {access_token}"}
+            )
+        except httpx.HTTPError as e:
+            raise ConnectorError(f"Gmail API unreachable: {e}")
+        if response.status_code == 200:
+            return response.json()
+        if response.status_code == 404 and path == "/history":
+            raise CursorExpired("Gmail history ID expired")
+        raise ConnectorError(
+            f"Gmail API {path} returned HTTP {response.status_code}",
+            permanent=response.status_code in (403, 404)
+        )
+
+    async def get_profile(self, access_token: str) -> Dict[str, Any]:
+        return await self._get(access_token, "/profile")
+
+    async def list_messages(self, access_token: str, query: str,
+                            page_token: Optional[str] = None) -> Dict[str, Any]:
+        params = {"q": query, "maxResults": 500}
+        if page_token:
+            params["pageToken"] = page_token
+        return await self._get(access_token, "/messages", params)
+
+    async def get_message(self, access_token: str, message_id: str, format: str = "metadata") -> Dict[str, Any]:
+        params = [("format", format)]
+        if format == "metadata":
+            params += [("metadataHeaders", header) for header in _METADATA_HEADERS]
+        return await self._get(access_token, f"/messages/{message_id}", params)
+
+    async def list_history(self, access_token: str, start_history_id: str,
+                           page_token: Optional[str] = None) -> Dict[str, Any]:
+        params = [("startHistoryId", start_history_id)]
+        params += [("historyTypes", kind) for kind in ("messageAdded", "messageDeleted", "labelAdded", "labelRemoved")]
+        if page_token:
+            params.append(("pageToken", page_token))
+        return await self._get(access_token, "/history", params)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class LocalGmailApi(GmailApi):
+    """
+    In-memory mailbox answering like the Gmail API, for tests and local runs.
+
+    Messages are added with add_message and changed with set_labels and
+    delete_message; each change is recorded in the mailbox history.
+    """
+
+    def __init__(self):
+        self.messages: Dict[str, Dict[str, Any]] = {}
+        self.history: List[Dict[str, Any]] = []
+        self.history_id = 1000
+        # History IDs older than this are reported as expired
+        self.oldest_history_id = 0
+        self.calls: Dict[str, int] = {}
+
+    def _count(self, name: str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def _record(self, kind: str, message_id: str) -> None:
+        self.history_id += 1
+        self.history.append({
+            "id": str(self.history_id),
+            kind: [{"message": {"id": message_id, "threadId": message_id}}]
+        })
+
+    def add_message(self, sender: str, subject: str, body: str, to: str = "me@example.com",
+                    received_at: Optional[datetime] = None, labels: Tuple[str, ...] = ("INBOX", "UNREAD")) -> str:
+        message_id = uuid.uuid4().hex[:16]
+        received_at = received_at or datetime.now(timezone.utc)
+        self.messages[message_id] = {
+            "id": message_id,
+            "threadId": message_id,
+            "labelIds": list(labels),
+            "snippet": body[:100],
+            "internalDate": str(int(received_at.timestamp() * 1000)),
+            "payload": {
+                "mimeType": "text/plain",
+                "headers": [{"name": "From", "value": sender}, {"name": "To", "value": to},
+                            {"name": "Subject", "value": subject}],
+                "body": {"data": base64.urlsafe_b64encode(body.encode()).decode()},
+            },
+        }
+        self._record("messagesAdded", message_id)
+        return message_id
+
+    def set_labels(self, message_id: str, labels: List[str]) -> None:
+        self.messages[message_id]["labelIds"] = list(labels)
+        self._record("labelsAdded", message_id)
+
+    def delete_message(self, message_id: str) -> None:
+        del self.messages[message_id]
+        self._record("messagesDeleted", message_id)
+
+    async def get_profile(self, access_token: str) -> Dict[str, Any]:
+        self._count("get_profile")
+        return {"historyId": str(self.history_id)}
+
+    async def list_messages(self, access_token: str, query: str,
+                            page_token: Optional[str] = None) -> Dict[str, Any]:
+        # Only the "newer_than:Nd" search used by full syncs is understood
+        self._count("list_messages")
+        days = int(query.partition("newer_than:")[2].rstrip("d") or 36500)
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).timestamp() * 1000
+        matches = sorted(
+            (m for m in self.messages.values() if int(m["internalDate"]) >= cutoff),
+            key=lambda m: int(m["internalDate"]), reverse=True
+        )
+        return {"messages": [{"id": m["id"], "threadId": m["threadId"]} for m in matches]}
+
+    async def get_message(self, access_token: str, message_id: str, format: str = "metadata") -> Dict[str, Any]:
+        self._count(f"get_message_{format}")
+        message = self.messages.get(message_id)
+        if message is None:
+            raise ConnectorError(f"Gmail message {message_id} not found", permanent=True)
+        if format == "metadata":
+            payload = {"headers": [h for h in message["payload"]["headers"] if h["name"] in _METADATA_HEADERS]}
+            return {**message, "payload": payload}
+        return message
+
+    async def list_history(self, access_token: str, start_history_id: str,
+                           page_token: Optional[str] = None) -> Dict[str, Any]:
+        self._count("list_history")
+        if int(start_history_id) < self.oldest_history_id:
+            raise CursorExpired("Gmail history ID expired")
+        return {
+            "history": [h for h in self.history if int(h["id"]) > int(start_history_id)],
+            "historyId": str(self.history_id),
+        }
+
+
+def _header(message: Dict[str, Any], name: str) -> Optional[str]:
+    for header in message.get("payload", {}).get("headers", []):
+        if header["name"].lower() == name.lower():
+            return header["value"]
+    return None
+
+
+def _index_row(connector_id: uuid.UUID, message: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a Gmail message (metadata format) into a gmail_messages row."""
+    recipients = ", ".join(filter(None, (_header(message, "To"), _header(message, "Cc"))))
+    return {
+        "user_connector_id": connector_id,
+        "message_id": message["id"],
+        "thread_id": message.get("threadId"),
+        "received_at": datetime.fromtimestamp(int(message["internalDate"]) / 1000, timezone.utc),
+        "sender": _header(message, "From"),
+        "recipients": recipients or None,
+        "subject": _header(message, "Subject"),
+        "snippet": message.get("snippet"),
+        "label_ids": message.get("labelIds", []),
+    }
+
+
+def _message_text(payload: Dict[str, Any]) -> str:
+    """Extract the plain text body of a full-format message payload."""
+    if payload.get("mimeType") == "text/plain" and payload.get("body", {}).get("data"):
+        return base64.urlsafe_b64decode(payload["body"]["data"] + "===").decode(errors="replace")
+    for part in payload.get("parts", []):
+        text = _message_text(part)
+        if text:
+            return text
+    return ""
+
+
+def _serialize(message: GmailMessage) -> Dict[str, Any]:
+    return {
+        "id": message.message_id,
+        "thread_id": message.thread_id,
+        "received_at": message.received_at.isoformat(),
+        "from": message.sender,
+        "to": message.recipients,
+        "subject": message.subject,
+        "snippet": message.snippet,
+        "labels": message.label_ids or [],
+    }
+
+
+class GmailConnector(IncrementalSync):
+    """
+    Searches and reads a Gmail connector's mail through its local index.
+
+    Args:
+        api: Gmail API implementation
+        session_factory: Callable returning an AsyncSession on the primary
+        tokens: Token manager supplying access tokens
+        max_age: Seconds the index may go unsynced before a search syncs it
+        index_days: Days of mail kept in the index
+    """
+
+    def __init__(
+        self,
+        api: Optional[GmailApi] = None,
+        session_factory=AsyncSessionLocal,
+        tokens: TokenManager = token_manager,
+        max_age: float = GMAIL_SYNC_MAX_AGE,
+        index_days: int = GMAIL_INDEX_DAYS
+    ):
+        super().__init__(session_factory, tokens, max_age)
+        self.api = api or HttpGmailApi()
+        self.index_days = index_days
+        self._bodies: TTLCache[Tuple[uuid.UUID, str], Dict[str, Any]] = TTLCache(
+            GMAIL_MESSAGE_CACHE_SIZE, GMAIL_MESSAGE_CACHE_TTL
+        )
+
+    async def _fetch_metadata(self, access_token: str, message_ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch messages' metadata concurrently, skipping ones deleted meanwhile."""
+        semaphore = asyncio.Semaphore(GMAIL_FETCH_CONCURRENCY)
+
+        async def fetch(message_id: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await self.api.get_message(access_token, message_id)
+                except ConnectorError as e:
+                    if e.permanent:
+                        return None
+                    raise
+
+        return [m for m in await asyncio.gather(*(fetch(m) for m in message_ids)) if m is not None]
+
+    async def fetch_full(self, access_token: str) -> Tuple[Any, str]:
+        # Taken first, so changes made while listing are replayed by the next sync
+        history_id = (await self.api.get_profile(access_token))["historyId"]
+        message_ids: List[str] = []
+        page_token = None
+        while len(message_ids) < GMAIL_BACKFILL_LIMIT:
+            page = await self.api.list_messages(access_token, f"newer_than:{self.index_days}d", page_token)
+            message_ids += [m["id"] for m in page.get("messages", [])]
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                break
+        messages = await self._fetch_metadata(access_token, message_ids[:GMAIL_BACKFILL_LIMIT])
+        return {"upsert": messages, "delete": []}, history_id
+
+    async def fetch_changes(self, access_token: str, cursor: str) -> Tuple[Any, str]:
+        changed: Dict[str, None] = {}
+        deleted = set()
+        page_token = None
+        history_id = cursor
+        while True:
+            page = await self.api.list_history(access_token, cursor, page_token)
+            for record in page.get("history", []):
+                for kind in ("messagesAdded", "labelsAdded", "labelsRemoved"):
+                    for entry in record.get(kind, []):
+                        changed[entry["message"]["id"]] = None
+                        deleted.discard(entry["message"]["id"])
+                for entry in record.get("messagesDeleted", []):
+                    changed.pop(entry["message"]["id"], None)
+                    deleted.add(entry["message"]["id"])
+            history_id = page.get("historyId", history_id)
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                break
+        messages = await self._fetch_metadata(access_token, list(changed))
+        # Messages gone by the time they were fetched are deleted too
+        fetched = {m["id"] for m in messages}
+        deleted |= {message_id for message_id in changed if message_id not in fetched}
+        return {"upsert": messages, "delete": sorted(deleted)}, history_id
+
+    async def apply(self, db: AsyncSession, connector_id: uuid.UUID, data: Any, full: bool) -> None:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.index_days)
+        rows = [_index_row(connector_id, m) for m in data["upsert"]]
+        rows = [row for row in rows if row["received_at"] >= cutoff]
+        insert = dialect_insert(db)
+        for batch in batched(rows, len(GmailMessage.__table__.columns)):
+            statement = insert(GmailMessage).values(batch)
+            await db.execute(statement.on_conflict_do_update(
+                index_elements=[GmailMessage.user_connector_id, GmailMessage.message_id],
+                set_={column: statement.excluded[column] for column in
+                      ("thread_id", "received_at", "sender", "recipients", "subject", "snippet", "label_ids")}
+            ))
+        # Replace the label rows of every message written or deleted
+        if not full:
+            for batch in batched([row["message_id"] for row in rows] + list(data["delete"]), 1):
+                await db.execute(delete(GmailMessageLabel).where(
+                    GmailMessageLabel.user_connector_id == connector_id,
+                    GmailMessageLabel.message_id.in_(batch)
+                ))
+        labels = [
+            {"user_connector_id": connector_id, "message_id": row["message_id"],
+             "label_id": label_id, "received_at": row["received_at"]}
+            for row in rows for label_id in sorted(set(row["label_ids"] or []))
+        ]
+        for batch in batched(labels, len(GmailMessageLabel.__table__.columns)):
+            await db.execute(insert(GmailMessageLabel).values(batch))
+        for batch in batched(list(data["delete"]), 1):
+            await db.execute(delete(GmailMessage).where(
+                GmailMessage.user_connector_id == connector_id,
+                GmailMessage.message_id.in_(batch)
+            ))
+        # Keep the index to the configured window
+        await db.execute(delete(GmailMessageLabel).where(
+            GmailMessageLabel.user_connector_id == connector_id,
+            GmailMessageLabel.received_at < cutoff
+        ))
+        await db.execute(delete(GmailMessage).where(
+            GmailMessage.user_connector_id == connector_id,
+            GmailMessage.received_at < cutoff
+        ))
+
+    async def clear(self, db: AsyncSession, connector_id: uuid.UUID) -> None:
+        await db.execute(delete(GmailMessageLabel).where(GmailMessageLabel.user_connector_id == connector_id))
+        await db.execute(delete(GmailMessage).where(GmailMessage.user_connector_id == connector_id))
+
+    async def search_messages(
+        self,
+        connector_id: uuid.UUID,
+        text: Optional[str] = None,
+        sender: Optional[str] = None,
+        label: Optional[str] = None,
+        after: Optional[datetime] = None,
+        before: Optional[datetime] = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        Search a connector's recent mail, newest first.
+
+        Args:
+            connector_id: ID of the Gmail user connector
+            text: Case-insensitive text to find in the subject, snippet or sender
+            sender: Case-insensitive text to find in the sender
+            label: Gmail label ID the message must carry (e.g. "UNREAD")
+            after: Only messages received at or after this time
+            before: Only messages received before this time
+            limit: Maximum number of messages to return
+
+        Returns:
+            Message summaries (ID, thread, date, from, to, subject, snippet, labels)
+
+        Raises:
+            ConnectorError: If the index has never been synced and syncing failed
+            OAuthError: Likewise, if no access token could be obtained
+        """
+        await self.ensure_fresh(connector_id)
+        query = select(GmailMessage).where(GmailMessage.user_connector_id == connector_id)
+        received_at = GmailMessage.received_at
+        if label:
+            # Walk the label's rows newest first, so the LIMIT stops the scan early
+            query = query.join(GmailMessageLabel, and_(
+                GmailMessageLabel.user_connector_id == GmailMessage.user_connector_id,
+                GmailMessageLabel.message_id == GmailMessage.message_id
+            )).where(GmailMessageLabel.user_connector_id == connector_id, GmailMessageLabel.label_id == label)
+            received_at = GmailMessageLabel.received_at
+        if text:
+            pattern = f"%{text}%"
+            query = query.where(or_(
+                GmailMessage.subject.ilike(pattern),
+                GmailMessage.snippet.ilike(pattern),
+                GmailMessage.sender.ilike(pattern)
+            ))
+        if sender:
+            query = query.where(GmailMessage.sender.ilike(f"%{sender}%"))
+        if after:
+            query = query.where(received_at >= after)
+        if before:
+            query = query.where(received_at < before)
+        query = query.order_by(received_at.desc()).limit(limit)
+
+        async with self.session_factory() as db:
+            return [_serialize(message) for message in (await db.execute(query)).scalars()]
+
+    async def get_message(self, connector_id: uuid.UUID, message_id: str) -> Dict[str, Any]:
+        """
+        Get a message with its body, fetched from Gmail on first request.
+
+        Args:
+            connector_id: ID of the Gmail user connector
+            message_id: Gmail message ID
+
+        Returns:
+            Message summary plus its plain text body
+
+        Raises:
+            ConnectorError: If the message cannot be fetched
+            OAuthError: If no access token could be obtained
+        """
+        cached = self._bodies.get((connector_id, message_id))
+        if cached is not None:
+            return cached
+        access_token = await self.tokens.get_access_token(connector_id)
+        message = await self.api.get_message(access_token, message_id, format="full")
+        row = _index_row(connector_id, message)
+        result = {
+            "id": message["id"],
+            "thread_id": row["thread_id"],
+            "received_at": row["received_at"].isoformat(),
+            "from": row["sender"],
+            "to": row["recipients"],
+            "subject": row["subject"],
+            "snippet": row["snippet"],
+            "labels": row["label_ids"],
+            "body": _message_text(message.get("payload", {})),
+        }
+        self._bodies.set((connector_id, message_id), result)
+        return result
+
+
+# Gmail connector used by agents (execution_ref "connectors.gmail")
+gmail = GmailConnector()
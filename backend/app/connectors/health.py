@@ -0,0 +1,391 @@
+"""
+Background health checks for user connectors.
+
+A user connector's setup_status otherwise only changes when its owner PATCHes
+it, so an agent finds out about revoked or expired credentials mid-chat. The
+scheduler periodically runs a probe against every active (or errored)
+connector and records the outcome:
+
+- healthy: the connector is marked active
+- unhealthy: the credentials were rejected; the connector is marked error
+- unknown: the check could not tell (timeout, network or provider error);
+  the status is left alone, so transient outages do not flap connectors
+
+Probes are registered per connector type (catalog name) with register_probe.
+Types without one only get a local check that their stored credentials still
+decrypt. StubProbe returns canned outcomes without network access, for tests
+and local runs.
+
+Connectors are read in keyset batches of CONNECTOR_HEALTH_BATCH_SIZE. Checks
+in a batch run concurrently, at most CONNECTOR_HEALTH_CONCURRENCY at a time
+per connector type, each after a random delay of up to
+CONNECTOR_HEALTH_JITTER seconds. Status changes from a batch are written in
+one statement, and only to rows whose status has not changed since they were
+read, so a concurrent PATCH wins.
+
+With Redis configured, a lease makes one worker run each pass; without it,
+every worker runs its own.
+
+    python -m app.connectors.health [--stub healthy|unhealthy|unknown]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import Counter
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db.redis_client import get_redis
+from ..models import Tool, UserConnector
+from ..schemas.connector_schemas import SetupStatus
+from ..security.encryption import decrypt_data
+
+logger = logging.getLogger(__name__)
+
+# Seconds between health check passes (0 disables the scheduler)
+CONNECTOR_HEALTH_INTERVAL = float(os.getenv("CONNECTOR_HEALTH_INTERVAL", "900"))
+
+# Maximum random delay, in seconds, before each check, spreading a pass's
+# requests to a provider over time
+CONNECTOR_HEALTH_JITTER = float(os.getenv("CONNECTOR_HEALTH_JITTER", "30"))
+
+# Maximum concurrent checks per connector type
+CONNECTOR_HEALTH_CONCURRENCY = int(os.getenv("CONNECTOR_HEALTH_CONCURRENCY", "5"))
+
+# Seconds a single check may take before its outcome counts as unknown
+CONNECTOR_HEALTH_TIMEOUT = float(os.getenv("CONNECTOR_HEALTH_TIMEOUT", "10"))
+
+# Connectors read, checked and written per batch
+CONNECTOR_HEALTH_BATCH_SIZE = int(os.getenv("CONNECTOR_HEALTH_BATCH_SIZE", "500"))
+
+# Statuses whose connectors are checked; needs_setup connectors have nothing to check
+CHECKED_STATUSES = (SetupStatus.ACTIVE.value, SetupStatus.ERROR.value)
+
+# Redis key of the lease held by the worker running the current pass
+_LEASE_KEY = "connector_health:lease"
+
+
+class ProbeOutcome(str, Enum):
+    """Result of checking a connector."""
+    HEALTHY = "healthy"
+    UNHEALTHY = "unhealthy"
+    UNKNOWN = "unknown"
+
+
+# Setup status recorded for each outcome (unknown leaves the status as is)
+_OUTCOME_STATUS = {
+    ProbeOutcome.HEALTHY: SetupStatus.ACTIVE.value,
+    ProbeOutcome.UNHEALTHY: SetupStatus.ERROR.value,
+}
+
+
+@dataclass(frozen=True)
+class ProbeTarget:
+    """A user connector to check, with its credentials decrypted."""
+    connector_id: uuid.UUID
+    user_id: uuid.UUID
+    connector_type: str
+    config_data: Optional[Dict[str, Any]]
+    encrypted_credentials: Optional[str]
+    credentials: Optional[str]
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    """Outcome of a check, with a short reason for logs."""
+    outcome: ProbeOutcome
+    detail: str = ""
+
+
+class HealthProbe(ABC):
+    """Checks whether a connector's credentials still work."""
+
+    @abstractmethod
+    async def check(self, target: ProbeTarget) -> ProbeResult:
+        """
+        Check a connector.
+
+        Probes should report UNHEALTHY only when the provider rejected the
+        credentials, and UNKNOWN for anything that may be transient.
+
+        Args:
+            target: Connector to check
+
+        Returns:
+            The outcome of the check
+        """
+
+
+class CredentialsProbe(HealthProbe):
+    """
+    Local check that a connector's stored credentials can be decrypted.
+
+    Decryptable credentials may still be rejected by the provider, so this
+    probe never reports a connector healthy.
+    """
+
+    async def check(self, target: ProbeTarget) -> ProbeResult:
+        if target.encrypted_credentials is not None and target.credentials is None:
+            return ProbeResult(ProbeOutcome.UNHEALTHY, "credentials cannot be decrypted")
+        return ProbeResult(ProbeOutcome.UNKNOWN, "no probe for this connector type")
+
+
+class StubProbe(HealthProbe):
+    """
+    Probe with canned outcomes, for tests and local runs.
+
+    Args:
+        default: Outcome for connectors without an entry in ``outcomes``
+        outcomes: Outcomes by connector ID
+        delay: Seconds each check takes
+    """
+
+    def __init__(self, default: ProbeOutcome = ProbeOutcome.HEALTHY,
+                 outcomes: Optional[Dict[uuid.UUID, ProbeOutcome]] = None, delay: float = 0):
+        self.default = default
+        self.outcomes = outcomes or {}
+        self.delay = delay
+        self.checked: List[uuid.UUID] = []
+
+    async def check(self, target: ProbeTarget) -> ProbeResult:
+        self.checked.append(target.connector_id)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return ProbeResult(self.outcomes.get(target.connector_id, self.default), "stub")
+
+
+# Probes by connector type name
+_probes: Dict[str, HealthProbe] = {}
+_default_probe = CredentialsProbe()
+
+
+def register_probe(connector_type: str, probe: HealthProbe) -> None:
+    """
+    Register the health probe for a connector type.
+
+    Args:
+        connector_type: Catalog name of the connector type (e.g. "Gmail")
+        probe: Probe to run against connectors of that type
+    """
+    _probes[connector_type] = probe
+
+
+def get_probe(connector_type: str) -> HealthProbe:
+    """Get the probe for a connector type, falling back to the credentials check."""
+    return _probes.get(connector_type, _default_probe)
+
+
+class HealthCheckScheduler:
+    """
+    Runs connector health checks in the background.
+
+    Args:
+        session_factory: Callable returning an AsyncSession on the primary
+        interval: Seconds between passes
+        jitter: Maximum random delay before each check
+        concurrency: Maximum concurrent checks per connector type
+        timeout: Seconds before a check's outcome counts as unknown
+        batch_size: Connectors per batch
+        probe: Probe to run for every connector type instead of the
+            registered ones (e.g. a StubProbe)
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        interval: float = CONNECTOR_HEALTH_INTERVAL,
+        jitter: float = CONNECTOR_HEALTH_JITTER,
+        concurrency: int = CONNECTOR_HEALTH_CONCURRENCY,
+        timeout: float = CONNECTOR_HEALTH_TIMEOUT,
+        batch_size: int = CONNECTOR_HEALTH_BATCH_SIZE,
+        probe: Optional[HealthProbe] = None
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.jitter = jitter
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.probe = probe
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _probe(self, connector_type: str) -> HealthProbe:
+        return self.probe or get_probe(connector_type)
+
+    def _semaphore(self, connector_type: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(connector_type)
+        if semaphore is None:
+            semaphore = self._semaphores[connector_type] = asyncio.Semaphore(self.concurrency)
+        return semaphore
+
+    async def _check(self, target: ProbeTarget) -> ProbeResult:
+        """Run one check: jittered, bounded per connector type and time-limited."""
+        if self.jitter > 0:
+            await asyncio.sleep(random.uniform(0, self.jitter))
+        async with self._semaphore(target.connector_type):
+            try:
+                return await asyncio.wait_for(self._probe(target.connector_type).check(target), self.timeout)
+            except asyncio.TimeoutError:
+                return ProbeResult(ProbeOutcome.UNKNOWN, "timed out")
+            except Exception as e:
+                logger.warning(f"Health probe for connector {target.connector_id} failed: {e}")
+                return ProbeResult(ProbeOutcome.UNKNOWN, "probe error")
+
+    async def _write(self, db: AsyncSession, changes: List[Dict[str, Any]]) -> int:
+        """Apply a batch's status changes in one statement; returns rows changed."""
+        if not changes:
+            return 0
+        table = UserConnector.__table__
+        result = await db.execute(
+            update(table)
+            .where(table.c.id == bindparam("b_id"), table.c.setup_status == bindparam("b_old"))
+            .values(setup_status=bindparam("b_new")),
+            changes
+        )
+        await db.commit()
+        return result.rowcount if result.rowcount is not None and result.rowcount >= 0 else len(changes)
+
+    async def run_once(self) -> Counter:
+        """
+        Check every active or errored connector once.
+
+        Returns:
+            Counts of outcomes, plus "changed" for statuses written
+        """
+        summary: Counter = Counter()
+        after: Optional[uuid.UUID] = None
+        started = time.monotonic()
+        async with self.session_factory() as db:
+            while True:
+                query = (
+                    select(
+                        UserConnector.id, UserConnector.user_id, UserConnector.setup_status,
+                        UserConnector.config_data, UserConnector.encrypted_credentials, Tool.name
+                    )
+                    .join(Tool, Tool.id == UserConnector.tool_id)
+                    .where(UserConnector.setup_status.in_(CHECKED_STATUSES))
+                    .order_by(UserConnector.id)
+                    .limit(self.batch_size)
+                )
+                if after is not None:
+                    query = query.where(UserConnector.id > after)
+                rows = (await db.execute(query)).all()
+                # Release the read transaction while the probes run
+                await db.rollback()
+                if not rows:
+                    break
+                after = rows[-1].id
+
+                targets = [
+                    ProbeTarget(
+                        connector_id=row.id,
+                        user_id=row.user_id,
+                        connector_type=row.name,
+                        config_data=row.config_data,
+                        encrypted_credentials=row.encrypted_credentials,
+                        credentials=decrypt_data(row.encrypted_credentials) if row.encrypted_credentials else None
+                    )
+                    for row in rows
+                ]
+                results = await asyncio.gather(*(self._check(target) for target in targets))
+
+                changes = []
+                for row, result in zip(rows, results):
+                    summary[result.outcome.value] += 1
+                    new_status = _OUTCOME_STATUS.get(result.outcome)
+                    if new_status is not None and new_status != row.setup_status:
+                        logger.info(
+                            f"Connector {row.id} ({row.name}) is {result.outcome.value}"
+                            f"{': ' + result.detail if result.detail else ''}; marking {new_status}"
+                        )
+                        changes.append({"b_id": row.id, "b_old": row.setup_status, "b_new": new_status})
+                summary["changed"] += await self._write(db, changes)
+
+                if len(rows) < self.batch_size:
+                    break
+        logger.info(f"Connector health check finished in {time.monotonic() - started:.1f}s: {dict(summary)}")
+        return summary
+
+    async def _acquire_lease(self) -> bool:
+        """Claim this pass for this worker; always True without Redis."""
+        client = get_redis()
+        if client is None:
+            return True
+        try:
+            # The lease expires shortly before the next pass is due
+            return bool(await client.set(_LEASE_KEY, "1", nx=True, px=max(1, int(self.interval * 900))))
+        except RedisError as e:
+            logger.warning(f"Could not take the connector health lease, running anyway: {e}")
+            return True
+
+    async def _run(self) -> None:
+        while True:
+            # Spread workers' (and restarts') passes over the interval
+            await asyncio.sleep(self.interval * random.uniform(0.9, 1.1))
+            try:
+                if await self._acquire_lease():
+                    await self.run_once()
+            except SQLAlchemyError as e:
+                logger.error(f"Connector health check failed: {e}")
+            except Exception as e:
+                logger.exception(f"Unexpected error in connector health check: {e}")
+
+    def start(self) -> None:
+        """Start running passes in the background, unless the interval is 0."""
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="connector-health-checks")
+        logger.info(f"Connector health checks every {self.interval:.0f}s")
+
+    async def stop(self) -> None:
+        """Stop the background task, abandoning any pass in progress."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Run one pass of connector health checks")
+    parser.add_argument("--stub", choices=[outcome.value for outcome in ProbeOutcome], default=None,
+                        help="Use a stub probe with this outcome for every connector type")
+    parser.add_argument("--batch-size", type=int, default=CONNECTOR_HEALTH_BATCH_SIZE, help="Connectors per batch")
+    args = parser.parse_args()
+
+    from ..db.session import AsyncSessionLocal, async_engine
+
+    probe = StubProbe(ProbeOutcome(args.stub)) if args.stub else None
+    scheduler = HealthCheckScheduler(AsyncSessionLocal, jitter=0, batch_size=args.batch_size, probe=probe)
+
+    async def run() -> Counter:
+        try:
+            return await scheduler.run_once()
+        finally:
+            await async_engine.dispose()
+
+    summary = asyncio.run(run())
+    print(dict(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,471 @@
+"""
+OAuth access tokens for user connectors.
+
+OAuth connectors (Gmail, Google Calendar) store their client credentials and
+tokens as encrypted JSON in UserConnector.encrypted_credentials:
+
+    {"client_id": ..., "client_secret": ..., "refresh_token": ...,
+     "access_token": ..., "expires_at": <epoch seconds>, "token_uri": ...}
+
+TokenManager hands out access tokens to tool calls from memory. Tokens used
+within OAUTH_KEEP_WARM seconds are refreshed in the background once they are
+within OAUTH_REFRESH_AHEAD seconds of expiry, so a call only waits on the
+token endpoint when its connector has not been used recently. Concurrent
+refreshes of one connector share a single call to the token endpoint.
+
+Refreshed tokens are written back only if the stored credentials are still the
+ones the refresh started from. If another worker got there first, its tokens
+are used instead, so a rotated refresh token is never overwritten with a stale
+one.
+
+The token endpoint is pluggable: HttpTokenEndpoint talks to the provider,
+LocalTokenEndpoint issues tokens in-process for tests and local runs.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import secrets
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Optional, Set
+
+import httpx
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db.session import AsyncSessionLocal
+from ..models import UserConnector
+from ..security.encryption import decrypt_data, encrypt_data
+from ..services.connector_catalog import CONNECTOR_REGISTRY
+from ..ttl_cache import TTLCache
+from .health import HealthProbe, ProbeOutcome, ProbeResult, ProbeTarget, register_probe
+
+logger = logging.getLogger(__name__)
+
+# Token endpoint used when the stored credentials do not name one
+OAUTH_TOKEN_URI = os.getenv("OAUTH_TOKEN_URI", "https://oauth2.googleapis.com/token")
+
+# Seconds before expiry at which a token is refreshed
+OAUTH_REFRESH_AHEAD = float(os.getenv("OAUTH_REFRESH_AHEAD", "300"))
+
+# Seconds since last use for which a connector's token is kept fresh in the background
+OAUTH_KEEP_WARM = float(os.getenv("OAUTH_KEEP_WARM", "3600"))
+
+# Seconds between background scans for tokens due for refresh
+OAUTH_REFRESH_CHECK_INTERVAL = float(os.getenv("OAUTH_REFRESH_CHECK_INTERVAL", "30"))
+
+# Maximum concurrent background refreshes per worker
+OAUTH_REFRESH_CONCURRENCY = int(os.getenv("OAUTH_REFRESH_CONCURRENCY", "10"))
+
+# Maximum access tokens kept in memory per worker
+OAUTH_TOKEN_CACHE_SIZE = int(os.getenv("OAUTH_TOKEN_CACHE_SIZE", "10000"))
+
+# Seconds to wait on the token endpoint
+OAUTH_HTTP_TIMEOUT = float(os.getenv("OAUTH_HTTP_TIMEOUT", "10"))
+
+# Connector types whose credentials are OAuth tokens
+OAUTH_CONNECTOR_TYPES = [c["name"] for c in CONNECTOR_REGISTRY if c["tool_type"] == "oauth2"]
+
+# Token endpoint errors meaning the grant itself is no longer valid
+_PERMANENT_ERRORS = {"invalid_grant", "invalid_client", "unauthorized_client"}
+
+
+class OAuthError(Exception):
+    """
+    A token could not be obtained.
+
+    Args:
+        message: What went wrong
+        permanent: True if retrying cannot help (e.g. the user revoked
+            access), False for transient failures
+    """
+
+    def __init__(self, message: str, permanent: bool = False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+@dataclass
+class OAuthCredentials:
+    """Decrypted OAuth credentials of a connector."""
+    client_id: str
+    client_secret: str
+    refresh_token: str
+    access_token: Optional[str] = None
+    expires_at: float = 0
+    token_uri: Optional[str] = None
+
+    @classmethod
+    def from_json(cls, data: str) -> "OAuthCredentials":
+        """
+        Parse stored credentials.
+
+        Raises:
+            OAuthError: If the credentials are malformed (permanent)
+        """
+        try:
+            values = json.loads(data)
+            return cls(**{name: values[name] for name in cls.__dataclass_fields__ if name in values})
+        except (ValueError, TypeError) as e:
+            raise OAuthError(f"Malformed OAuth credentials: {e}", permanent=True)
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    def valid_for(self, seconds: float) -> bool:
+        """Whether the access token is still valid ``seconds`` from now."""
+        return bool(self.access_token) and self.expires_at - time.time() > seconds
+
+
+@dataclass(frozen=True)
+class TokenGrant:
+    """A token endpoint's response to a refresh."""
+    access_token: str
+    expires_in: float
+    # Set when the provider rotates refresh tokens
+    refresh_token: Optional[str] = None
+
+
+class TokenEndpoint(ABC):
+    """Exchanges refresh tokens for access tokens."""
+
+    @abstractmethod
+    async def refresh(self, credentials: OAuthCredentials) -> TokenGrant:
+        """
+        Get a new access token.
+
+        Args:
+            credentials: Current credentials, including the refresh token
+
+        Returns:
+            The new access token
+
+        Raises:
+            OAuthError: If no token could be obtained
+        """
+
+
+class HttpTokenEndpoint(TokenEndpoint):
+    """Refreshes tokens against the provider's token endpoint (RFC 6749 section 6)."""
+
+    def __init__(self, timeout: float = OAUTH_HTTP_TIMEOUT):
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def refresh(self, credentials: OAuthCredentials) -> TokenGrant:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        try:
+            response = await self._client.post(credentials.token_uri or OAUTH_TOKEN_URI, data={
+                "grant_type": "refresh_token",
+                "refresh_token": credentials.refresh_token,
+                "client_id": credentials.client_id,
+                "client_secret": credentials.client_secret,
+            })
+        except httpx.HTTPError as e:
+            raise OAuthError(f"Token endpoint unreachable: {e}")
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        if response.status_code != 200 or "access_token" not in body:
+            error = body.get("error", f"HTTP {response.status_code}")
+            raise OAuthError(f"Token refresh failed: {error}", permanent=error in _PERMANENT_ERRORS)
+        return TokenGrant(
+            access_token=body["access_token"],
+            expires_in=float(body.get("expires_in", 3600)),
+            refresh_token=body.get("refresh_token")
+        )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class LocalTokenEndpoint(TokenEndpoint):
+    """
+    In-process stand-in for a token endpoint, for tests and local runs.
+
+    Args:
+        lifetime: Seconds issued access tokens are valid
+        delay: Seconds each refresh takes
+        rotate: Whether to issue a new refresh token on each refresh
+    """
+
+    def __init__(self, lifetime: float = 3600, delay: float = 0, rotate: bool = False):
+        self.lifetime = lifetime
+        self.delay = delay
+        self.rotate = rotate
+        self.calls = 0
+        # Refresh tokens to reject as revoked
+        self.revoked: Set[str] = set()
+
+    async def refresh(self, credentials: OAuthCredentials) -> TokenGrant:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if credentials.refresh_token in self.revoked:
+            raise OAuthError("Token refresh failed: invalid_grant", permanent=True)
+        if self.rotate:
+            self.revoked.add(credentials.refresh_token)
+        return TokenGrant(
+            access_token=f"local-{secrets.token_urlsafe(16)}",
+            expires_in=self.lifetime,
+            refresh_token=f"local-refresh-{secrets.token_urlsafe(16)}" if self.rotate else None
+        )
+
+
+@dataclass
+class CachedToken:
+    """An access token held in memory, with when its connector last used it."""
+    access_token: str
+    expires_at: float
+    # time.monotonic() of the last use, -inf if the token has not been used
+    last_used: float = float("-inf")
+
+
+class TokenManager:
+    """
+    Serves connector access tokens from memory and keeps them fresh.
+
+    Args:
+        session_factory: Callable returning an AsyncSession on the primary
+        endpoint: Token endpoint to refresh against
+        refresh_ahead: Seconds before expiry at which tokens are refreshed
+        keep_warm: Seconds since last use for which tokens are refreshed in
+            the background
+        check_interval: Seconds between background refresh scans
+        concurrency: Maximum concurrent background refreshes
+        cache_size: Maximum tokens kept in memory
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        endpoint: Optional[TokenEndpoint] = None,
+        refresh_ahead: float = OAUTH_REFRESH_AHEAD,
+        keep_warm: float = OAUTH_KEEP_WARM,
+        check_interval: float = OAUTH_REFRESH_CHECK_INTERVAL,
+        concurrency: int = OAUTH_REFRESH_CONCURRENCY,
+        cache_size: int = OAUTH_TOKEN_CACHE_SIZE
+    ):
+        self.session_factory = session_factory
+        self.endpoint = endpoint or HttpTokenEndpoint()
+        self.refresh_ahead = refresh_ahead
+        self.keep_warm = keep_warm
+        self.check_interval = check_interval
+        self.concurrency = concurrency
+        self._tokens: TTLCache[uuid.UUID, CachedToken] = TTLCache(cache_size, keep_warm + refresh_ahead)
+        self._inflight: Dict[uuid.UUID, asyncio.Future] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def get_access_token(self, connector_id: uuid.UUID) -> str:
+        """
+        Get a valid access token for a connector.
+
+        Args:
+            connector_id: ID of the user connector
+
+        Returns:
+            An access token valid for at least OAUTH_REFRESH_AHEAD seconds, or
+            one being refreshed in the background if it is still valid at all
+
+        Raises:
+            OAuthError: If no valid token could be obtained
+        """
+        cached = self._tokens.get(connector_id)
+        if cached is not None:
+            cached.last_used = time.monotonic()
+            remaining = cached.expires_at - time.time()
+            if remaining > self.refresh_ahead:
+                return cached.access_token
+            if remaining > 0:
+                # Still usable: refresh without making this call wait
+                if connector_id not in self._inflight:
+                    asyncio.create_task(self._refresh_quietly(connector_id))
+                return cached.access_token
+        token = await self.refresh(connector_id)
+        token.last_used = time.monotonic()
+        return token.access_token
+
+    async def check(self, connector_id: uuid.UUID) -> None:
+        """
+        Check that a connector can get a valid access token.
+
+        Unlike get_access_token this is not a use of the connector, so it does
+        not keep the connector's token warm.
+
+        Args:
+            connector_id: ID of the user connector
+
+        Raises:
+            OAuthError: If no valid token could be obtained
+        """
+        cached = self._tokens.get(connector_id)
+        if cached is not None and cached.expires_at - time.time() > self.refresh_ahead:
+            return
+        await self.refresh(connector_id)
+
+    def invalidate(self, connector_id: uuid.UUID) -> None:
+        """Forget a connector's token, e.g. when its credentials change or it is deleted."""
+        self._tokens.delete(connector_id)
+
+    async def refresh(self, connector_id: uuid.UUID) -> CachedToken:
+        """
+        Refresh a connector's token, joining a refresh already in progress.
+
+        Returns:
+            The refreshed token
+
+        Raises:
+            OAuthError: If no valid token could be obtained
+        """
+        future = self._inflight.get(connector_id)
+        if future is None:
+            future = asyncio.ensure_future(self._refresh(connector_id))
+            self._inflight[connector_id] = future
+            future.add_done_callback(lambda _: self._inflight.pop(connector_id, None))
+        # Shielded so a cancelled caller does not cancel the refresh for the others
+        return await asyncio.shield(future)
+
+    async def _load(self, db: AsyncSession, connector_id: uuid.UUID):
+        """Load a connector's stored ciphertext and decrypted credentials."""
+        encrypted = await db.scalar(
+            select(UserConnector.encrypted_credentials).where(UserConnector.id == connector_id)
+        )
+        if encrypted is None:
+            raise OAuthError(f"Connector {connector_id} has no OAuth credentials", permanent=True)
+        decrypted = decrypt_data(encrypted)
+        if decrypted is None:
+            raise OAuthError(f"Credentials of connector {connector_id} cannot be decrypted", permanent=True)
+        return encrypted, OAuthCredentials.from_json(decrypted)
+
+    def _remember(self, connector_id: uuid.UUID, credentials: OAuthCredentials) -> CachedToken:
+        previous = self._tokens.get(connector_id)
+        # Refreshing is not a use; only get_access_token marks the token used
+        last_used = previous.last_used if previous is not None else float("-inf")
+        token = CachedToken(credentials.access_token, credentials.expires_at, last_used)
+        self._tokens.set(connector_id, token)
+        return token
+
+    async def _refresh(self, connector_id: uuid.UUID) -> CachedToken:
+        async with self.session_factory() as db:
+            encrypted, credentials = await self._load(db, connector_id)
+            # Another worker may already have refreshed it
+            if credentials.valid_for(self.refresh_ahead):
+                return self._remember(connector_id, credentials)
+            await db.rollback()
+
+            grant = await self.endpoint.refresh(credentials)
+            credentials.access_token = grant.access_token
+            credentials.expires_at = time.time() + grant.expires_in
+            if grant.refresh_token:
+                credentials.refresh_token = grant.refresh_token
+
+            # Write back only over the credentials this refresh started from
+            result = await db.execute(
+                update(UserConnector)
+                .where(UserConnector.id == connector_id, UserConnector.encrypted_credentials == encrypted)
+                .values(encrypted_credentials=encrypt_data(credentials.to_json()))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            if result.rowcount == 0:
+                logger.info(f"OAuth credentials of connector {connector_id} changed during refresh, using stored ones")
+                _, stored = await self._load(db, connector_id)
+                await db.rollback()
+                if stored.valid_for(0):
+                    return self._remember(connector_id, stored)
+                raise OAuthError(f"Connector {connector_id} has no valid token after a concurrent update")
+
+        logger.info(f"Refreshed OAuth token for connector {connector_id}")
+        return self._remember(connector_id, credentials)
+
+    async def _refresh_quietly(self, connector_id: uuid.UUID) -> None:
+        try:
+            await self.refresh(connector_id)
+        except OAuthError as e:
+            logger.warning(f"Background refresh for connector {connector_id} failed: {e}")
+            if e.permanent:
+                self.invalidate(connector_id)
+        except Exception as e:
+            logger.exception(f"Unexpected error refreshing connector {connector_id}: {e}")
+
+    async def refresh_due(self) -> int:
+        """
+        Refresh every recently used token that is close to expiry.
+
+        Returns:
+            Number of tokens refreshed or attempted
+        """
+        now = time.time()
+        idle_before = time.monotonic() - self.keep_warm
+        due = []
+        for connector_id, token in self._tokens.items():
+            if token.last_used < idle_before:
+                self._tokens.delete(connector_id)
+            elif token.expires_at - now <= self.refresh_ahead and connector_id not in self._inflight:
+                due.append(connector_id)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def refresh_one(connector_id: uuid.UUID) -> None:
+            async with semaphore:
+                await self._refresh_quietly(connector_id)
+
+        await asyncio.gather(*(refresh_one(connector_id) for connector_id in due))
+        return len(due)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await self.refresh_due()
+            except Exception as e:
+                logger.exception(f"Unexpected error in OAuth refresh loop: {e}")
+
+    def start(self) -> None:
+        """Start refreshing tokens in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="oauth-token-refresh")
+
+    async def stop(self) -> None:
+        """Stop background refreshes and close the token endpoint's connections."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if isinstance(self.endpoint, HttpTokenEndpoint):
+            await self.endpoint.close()
+
+
+class OAuthProbe(HealthProbe):
+    """Health probe for OAuth connectors: their refresh token must still be accepted."""
+
+    def __init__(self, manager: TokenManager):
+        self.manager = manager
+
+    async def check(self, target: ProbeTarget) -> ProbeResult:
+        if target.encrypted_credentials is None:
+            return ProbeResult(ProbeOutcome.UNKNOWN, "no credentials stored")
+        try:
+            await self.manager.check(target.connector_id)
+        except OAuthError as e:
+            return ProbeResult(ProbeOutcome.UNHEALTHY if e.permanent else ProbeOutcome.UNKNOWN, str(e))
+        return ProbeResult(ProbeOutcome.HEALTHY)
+
+
+# Token manager shared by the API's connectors
+token_manager = TokenManager()
+
+for _connector_type in OAUTH_CONNECTOR_TYPES:
+    register_probe(_connector_type, OAuthProbe(token_manager))
@@ -0,0 +1,279 @@
+"""
+Incremental sync of provider data into per-connector local indexes.
+
+Connectors such as Gmail and Google Calendar answer agent questions from a
+local copy of the user's data rather than calling the provider per question.
+IncrementalSync keeps that copy current: the first sync (or one whose cursor
+the provider has expired) fetches everything in scope, later syncs fetch only
+the changes since the stored cursor (Gmail history ID, Calendar sync token).
+Connectors whose scope moves with time, such as a calendar window reaching
+further ahead each day, also resync in full every full_sync_interval seconds,
+since the change feed only reports changes, not items entering the scope.
+
+Provider calls are made outside any database transaction. The fetched changes
+and the new cursor are then written in one transaction, and only if the stored
+cursor is still the one the fetch started from, so two workers syncing the
+same connector cannot move it backwards or skip changes. Concurrent syncs of a
+connector within a worker share one run.
+"""
+
+import asyncio
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import ConnectorSyncState
+from ..ttl_cache import TTLCache
+from .oauth import OAuthError, TokenManager
+
+logger = logging.getLogger(__name__)
+
+# Bind parameters per statement; asyncpg allows 32767 and SQLite 32766, and
+# the rest is headroom for a statement's parameters outside its rows
+MAX_BIND_PARAMETERS = 32000
+
+T = TypeVar("T")
+
+
+class ConnectorError(Exception):
+    """
+    A provider call failed.
+
+    Args:
+        message: What went wrong
+        permanent: True if retrying cannot help (e.g. access was revoked)
+    """
+
+    def __init__(self, message: str, permanent: bool = False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+class CursorExpired(ConnectorError):
+    """The provider no longer accepts the stored cursor; a full sync is needed."""
+
+
+def dialect_insert(db: AsyncSession):
+    """Get the dialect-specific insert construct that supports ON CONFLICT."""
+    return sqlite_insert if db.get_bind().dialect.name == "sqlite" else pg_insert
+
+
+def batched(items: Sequence[T], parameters_per_item: int) -> Iterator[Sequence[T]]:
+    """
+    Split rows (or IN list values) into batches small enough for one statement.
+
+    Args:
+        items: Rows or values to write
+        parameters_per_item: Bind parameters each item adds to the statement,
+            e.g. the column count of an INSERT row
+
+    Yields:
+        Consecutive slices of items
+    """
+    size = max(1, MAX_BIND_PARAMETERS // parameters_per_item)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class IncrementalSync(ABC):
+    """
+    Keeps a connector type's local indexes in step with its provider.
+
+    Subclasses fetch from the provider and apply the results to their tables.
+
+    Args:
+        session_factory: Callable returning an AsyncSession on the primary
+        tokens: Token manager supplying the connectors' access tokens
+        max_age: Seconds an index may go without syncing before a read
+            syncs it first
+        full_sync_interval: Seconds after which a sync rebuilds the index in
+            full rather than applying changes; None to only sync in full
+            when the cursor expires
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        tokens: TokenManager,
+        max_age: float,
+        full_sync_interval: Optional[float] = None
+    ):
+        self.session_factory = session_factory
+        self.tokens = tokens
+        self.max_age = max_age
+        self.full_sync_interval = full_sync_interval
+        # Connectors this worker has synced within max_age
+        self._fresh: TTLCache[uuid.UUID, bool] = TTLCache(100000, max_age)
+        self._inflight: Dict[uuid.UUID, asyncio.Future] = {}
+
+    @abstractmethod
+    async def fetch_full(self, access_token: str) -> Tuple[Any, str]:
+        """
+        Fetch everything in scope.
+
+        Returns:
+            Tuple of (data for apply, cursor to continue from)
+
+        Raises:
+            ConnectorError: If the provider call fails
+        """
+
+    @abstractmethod
+    async def fetch_changes(self, access_token: str, cursor: str) -> Tuple[Any, str]:
+        """
+        Fetch the changes since a cursor.
+
+        Returns:
+            Tuple of (data for apply, cursor to continue from)
+
+        Raises:
+            CursorExpired: If the provider no longer accepts the cursor
+            ConnectorError: If the provider call fails
+        """
+
+    @abstractmethod
+    async def apply(self, db: AsyncSession, connector_id: uuid.UUID, data: Any, full: bool) -> None:
+        """
+        Write fetched data to the index, without committing.
+
+        Args:
+            db: Database session
+            connector_id: ID of the user connector
+            data: Data returned by fetch_full or fetch_changes
+            full: True if data replaces the whole index
+        """
+
+    @abstractmethod
+    async def clear(self, db: AsyncSession, connector_id: uuid.UUID) -> None:
+        """Delete a connector's index rows, without committing."""
+
+    def synced(self, connector_id: uuid.UUID) -> None:
+        """Called when a connector's stored index may have changed; override to drop derived caches."""
+
+    def _mark_fresh(self, connector_id: uuid.UUID) -> None:
+        self._fresh.set(connector_id, True)
+        self.synced(connector_id)
+
+    def _full_sync_due(self, full_synced_at: Optional[datetime]) -> bool:
+        if self.full_sync_interval is None:
+            return False
+        if full_synced_at is None:
+            return True
+        age = (datetime.now(timezone.utc) - _as_utc(full_synced_at)).total_seconds()
+        return age >= self.full_sync_interval
+
+    async def _save_cursor(self, db: AsyncSession, connector_id: uuid.UUID,
+                           expected: Optional[str], cursor: str, full: bool) -> bool:
+        """Move the stored cursor from ``expected`` to ``cursor``; False if it had moved."""
+        now = datetime.now(timezone.utc)
+        values = {"cursor": cursor, "synced_at": now}
+        if full:
+            values["full_synced_at"] = now
+        if expected is None:
+            insert = dialect_insert(db)
+            result = await db.execute(
+                insert(ConnectorSyncState)
+                .values(user_connector_id=connector_id, **values)
+                .on_conflict_do_nothing(index_elements=[ConnectorSyncState.user_connector_id])
+            )
+        else:
+            result = await db.execute(
+                update(ConnectorSyncState)
+                .where(ConnectorSyncState.user_connector_id == connector_id, ConnectorSyncState.cursor == expected)
+                .values(**values)
+            )
+        return result.rowcount == 1
+
+    async def _sync(self, connector_id: uuid.UUID, force: bool) -> None:
+        async with self.session_factory() as db:
+            state = (await db.execute(
+                select(ConnectorSyncState.cursor, ConnectorSyncState.synced_at, ConnectorSyncState.full_synced_at)
+                .where(ConnectorSyncState.user_connector_id == connector_id)
+            )).first()
+            await db.rollback()
+            if state is not None and not force:
+                age = (datetime.now(timezone.utc) - _as_utc(state.synced_at)).total_seconds()
+                if age < self.max_age:
+                    # Synced recently, possibly by another worker
+                    self._mark_fresh(connector_id)
+                    return
+
+            access_token = await self.tokens.get_access_token(connector_id)
+            full = state is None or self._full_sync_due(state.full_synced_at)
+            if full and state is not None:
+                logger.info(f"Periodic full resync of connector {connector_id}")
+            if not full:
+                try:
+                    data, cursor = await self.fetch_changes(access_token, state.cursor)
+                except CursorExpired:
+                    logger.info(f"Sync cursor of connector {connector_id} expired, resyncing in full")
+                    full = True
+            if full:
+                data, cursor = await self.fetch_full(access_token)
+
+            if full:
+                await self.clear(db, connector_id)
+            await self.apply(db, connector_id, data, full)
+            if not await self._save_cursor(db, connector_id, state.cursor if state else None, cursor, full):
+                await db.rollback()
+                logger.info(f"Connector {connector_id} was synced concurrently, discarding this sync")
+                return
+            await db.commit()
+        self._mark_fresh(connector_id)
+        logger.info(f"Synced connector {connector_id} ({'full' if full else 'incremental'})")
+
+    async def sync(self, connector_id: uuid.UUID, force: bool = False) -> None:
+        """
+        Bring a connector's index up to date, joining a sync already in progress.
+
+        Args:
+            connector_id: ID of the user connector
+            force: Sync even if the index was synced within max_age
+
+        Raises:
+            ConnectorError: If a provider call fails
+            OAuthError: If no access token could be obtained
+        """
+        future = self._inflight.get(connector_id)
+        if future is None:
+            future = asyncio.ensure_future(self._sync(connector_id, force))
+            self._inflight[connector_id] = future
+            future.add_done_callback(lambda _: self._inflight.pop(connector_id, None))
+        await asyncio.shield(future)
+
+    async def ensure_fresh(self, connector_id: uuid.UUID) -> None:
+        """
+        Sync a connector's index if it is older than max_age.
+
+        If the sync fails but the connector has been synced before, the
+        (stale) index is used as is rather than failing the read.
+
+        Raises:
+            ConnectorError: If the connector has never been synced and the
+                sync failed
+            OAuthError: Likewise, if no access token could be obtained
+        """
+        if self._fresh.get(connector_id):
+            return
+        try:
+            await self.sync(connector_id)
+        except (ConnectorError, OAuthError) as e:
+            async with self.session_factory() as db:
+                synced = await db.scalar(
+                    select(ConnectorSyncState.synced_at).where(ConnectorSyncState.user_connector_id == connector_id)
+                )
+            if synced is None:
+                raise
+            logger.warning(f"Sync of connector {connector_id} failed, serving index from {synced}: {e}")
@@ -0,0 +1,439 @@
+"""
+Web Search connector.
+
+A Web Search connector holds keys for one or more search providers (Google
+Programmable Search, Bing). A search queries all of them concurrently and
+waits at most WEB_SEARCH_DEADLINE seconds: providers that have not answered
+by then are dropped from that search. Results are merged by reciprocal rank
+fusion and deduplicated by normalized URL.
+
+Results are cached per connector and normalized query (case and whitespace
+folded) in an LRU cache with a TTL, and concurrent identical searches share
+one fan-out, so repeated questions cost no provider calls. Results missing a
+provider that timed out or failed are only cached for
+WEB_SEARCH_DEGRADED_CACHE_TTL seconds, so the next search soon tries it again.
+
+Providers are pluggable through register_provider; LocalSearchProvider
+answers from canned results, for tests and local runs.
+
+Credentials are stored as either a JSON object keyed by provider, e.g.
+{"google": {"api_key": "...", "cx": "..."}, "bing": {"api_key": "..."}}, or a
+bare API key for the provider named by config_data["search_engine"] (with
+Google's engine ID in config_data["cx"]).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import httpx
+from sqlalchemy import select
+
+from ..db.session import AsyncSessionLocal
+from ..models import UserConnector
+from ..security import decrypt_data
+from ..ttl_cache import TTLCache
+from .sync import ConnectorError
+
+logger = logging.getLogger(__name__)
+
+# Provider endpoints
+GOOGLE_CSE_URL = os.getenv("GOOGLE_CSE_URL", "https://www.googleapis.com/customsearch/v1")
+BING_SEARCH_URL = os.getenv("BING_SEARCH_URL", "https://api.bing.microsoft.com/v7.0/search")
+
+# Seconds a search waits for providers before returning what it has
+WEB_SEARCH_DEADLINE = float(os.getenv("WEB_SEARCH_DEADLINE", "3"))
+
+# Results requested from each provider and returned at most per search
+WEB_SEARCH_RESULTS = int(os.getenv("WEB_SEARCH_RESULTS", "10"))
+
+# Cached searches per worker, and for how many seconds
+WEB_SEARCH_CACHE_SIZE = int(os.getenv("WEB_SEARCH_CACHE_SIZE", "5000"))
+WEB_SEARCH_CACHE_TTL = float(os.getenv("WEB_SEARCH_CACHE_TTL", "900"))
+
+# Seconds results are cached when a provider timed out or failed
+WEB_SEARCH_DEGRADED_CACHE_TTL = float(os.getenv("WEB_SEARCH_DEGRADED_CACHE_TTL", "30"))
+
+# Seconds a connector's provider setup (decrypted keys) is kept in memory
+WEB_SEARCH_PROVIDER_TTL = float(os.getenv("WEB_SEARCH_PROVIDER_TTL", "300"))
+
+# Query parameters that only track the click and are dropped when comparing URLs
+_TRACKING_PARAMS = re.compile(r"^(utm_.*|gclid|fbclid|msclkid|mc_cid|mc_eid|ref|ref_src)$")
+
+# Reciprocal rank fusion constant; larger values flatten the weight of top ranks
+_RRF_K = 60
+
+
+@dataclass
+class SearchResult:
+    """A web page returned by a search."""
+    title: str
+    url: str
+    snippet: str = ""
+    sources: List[str] = field(default_factory=list)  # Providers that returned it
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"title": self.title, "url": self.url, "snippet": self.snippet, "sources": self.sources}
+
+
+class SearchProvider(ABC):
+    """A search engine queried by the connector."""
+
+    name: str
+
+    @abstractmethod
+    async def search(self, query: str, count: int) -> List[SearchResult]:
+        """
+        Search the web.
+
+        Args:
+            query: Search query
+            count: Maximum number of results
+
+        Returns:
+            Results in the provider's ranking order
+
+        Raises:
+            ConnectorError: If the provider call fails
+        """
+
+
+async def _get_json(client: httpx.AsyncClient, provider: str, url: str, **kwargs: Any) -> Dict[str, Any]:
+    try:
+        response = await client.get(url, **kwargs)
+    except httpx.HTTPError as e:
+        raise ConnectorError(f"{provider} search unreachable: {e}")
+    if response.status_code != 200:
+        raise ConnectorError(
+            f"{provider} search returned HTTP {response.status_code}",
+            permanent=response.status_code in (401, 403)
+        )
+    return response.json()
+
+
+class GoogleSearchProvider(SearchProvider):
+    """Google Programmable Search (Custom Search JSON API)."""
+
+    name = "google"
+
+    def __init__(self, client: httpx.AsyncClient, api_key: str, cx: str):
+        self.client = client
+        self.api_key = api_key
+        self.cx = cx
+
+    async def search(self, query: str, count: int) -> List[SearchResult]:
+        # The API returns at most 10 results per request
+        data = await _get_json(self.client, "Google", GOOGLE_CSE_URL, params={
+            "key": self.api_key, "cx": self.cx, "q": query, "num": min(count, 10)
+        })
+        return [
+            SearchResult(item.get("title", ""), item["link"], item.get("snippet", ""))
+            for item in data.get("items", []) if item.get("link")
+        ]
+
+
+class BingSearchProvider(SearchProvider):
+    """Bing Web Search API."""
+
+    name = "bing"
+
+    def __init__(self, client: httpx.AsyncClient, api_key: str):
+        self.client = client
+        self.api_key = api_key
+
+    async def search(self, query: str, count: int) -> List[SearchResult]:
+        data = await _get_json(
+            self.client, "Bing", BING_SEARCH_URL,
+            params={"q": query, "count": count, "responseFilter": "Webpages"},
+            headers={"Ocp-Apim-Subscription-Key": self.api_key}
+        )
+        return [
+            SearchResult(page.get("name", ""), page["url"], page.get("snippet", ""))
+            for page in data.get("webPages", {}).get("value", []) if page.get("url")
+        ]
+
+
+class LocalSearchProvider(SearchProvider):
+    """
+    Provider answering from canned results, for tests and local runs.
+
+    Args:
+        name: Provider name reported in results
+        results: Results per query (matched after normalize_query); other
+            queries get no results
+        delay: Seconds to wait before answering
+        fail: Raise ConnectorError instead of answering
+    """
+
+    def __init__(self, name: str = "local", results: Optional[Dict[str, List[Tuple[str, str]]]] = None,
+                 delay: float = 0, fail: bool = False):
+        self.name = name
+        self.results = {normalize_query(q): r for q, r in (results or {}).items()}
+        self.delay = delay
+        self.fail = fail
+        self.calls: List[str] = []
+
+    async def search(self, query: str, count: int) -> List[SearchResult]:
+        self.calls.append(query)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectorError(f"{self.name} search failed")
+        return [SearchResult(title, url, f"{title} ({self.name})")
+                for title, url in self.results.get(normalize_query(query), [])[:count]]
+
+
+# Builds a provider from its credentials (a dict of key material) and the shared HTTP client
+ProviderFactory = Callable[[Dict[str, Any], httpx.AsyncClient], SearchProvider]
+
+_PROVIDERS: Dict[str, ProviderFactory] = {
+    "google": lambda creds, client: GoogleSearchProvider(client, creds["api_key"], creds["cx"]),
+    "bing": lambda creds, client: BingSearchProvider(client, creds["api_key"]),
+}
+
+
+def register_provider(name: str, factory: ProviderFactory) -> None:
+    """
+    Register (or replace) the factory for a search provider.
+
+    Args:
+        name: Provider name used in connector credentials
+        factory: Callable building the provider from its credentials and
+            the shared HTTP client
+    """
+    _PROVIDERS[name] = factory
+
+
+def normalize_query(query: str) -> str:
+    """Fold case and whitespace so equivalent queries share a cache entry."""
+    return " ".join(query.casefold().split())
+
+
+def normalize_url(url: str) -> str:
+    """
+    Reduce a URL to a key under which equivalent URLs compare equal.
+
+    Scheme, "www.", default ports, fragments, tracking parameters, query
+    parameter order and trailing slashes are ignored.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = re.sub(r"/+$", "", parts.path) or ""
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _TRACKING_PARAMS.match(key.lower())
+    ))
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+def merge_results(ranked: List[Tuple[str, List[SearchResult]]], count: int) -> List[SearchResult]:
+    """
+    Merge providers' result lists, deduplicating by normalized URL.
+
+    Results are ordered by reciprocal rank fusion: each provider listing a
+    page adds 1 / (60 + rank) to its score. The first listing of a page
+    supplies its title and snippet.
+
+    Args:
+        ranked: (provider name, results in rank order) per provider
+        count: Maximum number of results
+
+    Returns:
+        Merged results, best first
+    """
+    merged: Dict[str, SearchResult] = {}
+    scores: Dict[str, float] = {}
+    for name, results in ranked:
+        for rank, result in enumerate(results, start=1):
+            key = normalize_url(result.url)
+            if key not in merged:
+                merged[key] = SearchResult(result.title, result.url, result.snippet)
+                scores[key] = 0.0
+            if name not in merged[key].sources:
+                merged[key].sources.append(name)
+                scores[key] += 1 / (_RRF_K + rank)
+    # sorted is stable, so ties keep first-seen order
+    order = sorted(merged, key=lambda key: scores[key], reverse=True)
+    return [merged[key] for key in order[:count]]
+
+
+def _provider_credentials(config_data: Optional[Dict[str, Any]], secret: str) -> Dict[str, Dict[str, Any]]:
+    """Parse a connector's stored credentials into key material per provider."""
+    try:
+        parsed = json.loads(secret)
+    except ValueError:
+        parsed = secret
+    if isinstance(parsed, dict):
+        return parsed
+    config_data = config_data or {}
+    engine = config_data.get("search_engine", "google")
+    credentials = {"api_key": secret}
+    if "cx" in config_data:
+        credentials["cx"] = config_data["cx"]
+    return {engine: credentials}
+
+
+class WebSearchConnector:
+    """
+    Searches the web through a connector's configured providers.
+
+    Args:
+        session_factory: Callable returning an AsyncSession
+        deadline: Seconds a search waits for providers
+        providers: Providers to use for every connector instead of the
+            connectors' stored credentials (for tests and local runs)
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        deadline: float = WEB_SEARCH_DEADLINE,
+        providers: Optional[List[SearchProvider]] = None
+    ):
+        self.session_factory = session_factory
+        self.deadline = deadline
+        self.providers = providers
+        self._client: Optional[httpx.AsyncClient] = None
+        self._setups: TTLCache[uuid.UUID, List[SearchProvider]] = TTLCache(
+            WEB_SEARCH_CACHE_SIZE, WEB_SEARCH_PROVIDER_TTL
+        )
+        self._results: TTLCache[Tuple[uuid.UUID, str], Dict[str, Any]] = TTLCache(
+            WEB_SEARCH_CACHE_SIZE, WEB_SEARCH_CACHE_TTL
+        )
+        self._degraded: TTLCache[Tuple[uuid.UUID, str], Dict[str, Any]] = TTLCache(
+            WEB_SEARCH_CACHE_SIZE, WEB_SEARCH_DEGRADED_CACHE_TTL
+        )
+        self._inflight: Dict[Tuple[uuid.UUID, str], asyncio.Future] = {}
+
+    async def _get_providers(self, connector_id: uuid.UUID) -> List[SearchProvider]:
+        if self.providers is not None:
+            return self.providers
+        providers = self._setups.get(connector_id)
+        if providers is not None:
+            return providers
+        async with self.session_factory() as db:
+            row = (await db.execute(
+                select(UserConnector.config_data, UserConnector.encrypted_credentials)
+                .where(UserConnector.id == connector_id)
+            )).first()
+        if row is None or row.encrypted_credentials is None:
+            raise ConnectorError(f"Connector {connector_id} has no search API keys", permanent=True)
+        secret = decrypt_data(row.encrypted_credentials)
+        if secret is None:
+            raise ConnectorError(f"Credentials of connector {connector_id} cannot be decrypted", permanent=True)
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.deadline)
+        providers = []
+        for name, credentials in _provider_credentials(row.config_data, secret).items():
+            factory = _PROVIDERS.get(name)
+            if factory is None:
+                logger.warning(f"Connector {connector_id} has keys for unknown search provider {name}")
+                continue
+            try:
+                providers.append(factory(credentials, self._client))
+            except KeyError as e:
+                logger.warning(f"Connector {connector_id} is missing {e} for search provider {name}")
+        if not providers:
+            raise ConnectorError(f"Connector {connector_id} has no usable search providers", permanent=True)
+        self._setups.set(connector_id, providers)
+        return providers
+
+    async def _fan_out(self, connector_id: uuid.UUID, query: str) -> Dict[str, Any]:
+        providers = await self._get_providers(connector_id)
+        tasks = {
+            asyncio.ensure_future(provider.search(query, WEB_SEARCH_RESULTS)): provider.name
+            for provider in providers
+        }
+        done, pending = await asyncio.wait(tasks, timeout=self.deadline)
+        for task in pending:
+            task.cancel()
+
+        status: Dict[str, str] = {}
+        ranked: List[Tuple[str, List[SearchResult]]] = []
+        # Merge in configuration order so ties do not depend on which provider answered first
+        for task, name in tasks.items():
+            if task not in done:
+                status[name] = "timeout"
+                continue
+            try:
+                ranked.append((name, task.result()))
+                status[name] = "ok"
+            except Exception as e:
+                logger.warning(f"Search provider {name} failed for connector {connector_id}: {e}")
+                status[name] = "error"
+        if not ranked:
+            raise ConnectorError(f"No search provider answered within {self.deadline}s: {status}")
+
+        result = {
+            "results": [r.to_dict() for r in merge_results(ranked, WEB_SEARCH_RESULTS)],
+            "providers": status,
+        }
+        cache = self._results if all(value == "ok" for value in status.values()) else self._degraded
+        cache.set((connector_id, query), result)
+        return result
+
+    async def search(self, connector_id: uuid.UUID, query: str, count: int = WEB_SEARCH_RESULTS) -> Dict[str, Any]:
+        """
+        Search the web, from cache if the same query was searched recently.
+
+        Args:
+            connector_id: ID of the Web Search user connector
+            query: Search query
+            count: Maximum number of results (at most WEB_SEARCH_RESULTS)
+
+        Returns:
+            {"query": str, "results": [{title, url, snippet, sources}],
+            "providers": {name: "ok" | "error" | "timeout"}, "cached": bool}
+
+        Raises:
+            ConnectorError: If the query is empty, the connector has no
+                usable keys, or no provider answered in time
+        """
+        normalized = normalize_query(query)
+        if not normalized:
+            raise ConnectorError("Search query is empty", permanent=True)
+        key = (connector_id, normalized)
+        cached = self._results.get(key) or self._degraded.get(key)
+        if cached is None:
+            future = self._inflight.get(key)
+            if future is None:
+                future = asyncio.ensure_future(self._fan_out(connector_id, normalized))
+                self._inflight[key] = future
+                future.add_done_callback(lambda _: self._inflight.pop(key, None))
+            result = await asyncio.shield(future)
+        else:
+            result = cached
+        return {
+            "query": normalized,
+            "results": result["results"][:count],
+            "providers": result["providers"],
+            "cached": cached is not None,
+        }
+
+    def invalidate(self, connector_id: uuid.UUID) -> None:
+        """Forget a connector's provider setup and results, e.g. after its keys or configuration changed."""
+        self._setups.delete(connector_id)
+        for cache in (self._results, self._degraded):
+            for key, _ in cache.items():
+                if key[0] == connector_id:
+                    cache.delete(key)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Web Search connector used by agents (execution_ref "connectors.web_search")
+web_search = WebSearchConnector()
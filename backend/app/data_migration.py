@@ -1,96 +1,113 @@
 """
 This script adds LLM configurations for existing API keys in the database.
 It's meant to be run once to migrate existing data.
+
+Users who stored an OpenAI or Anthropic key get the same default set of
+configurations as the setup flow creates. Keys are processed in id order in
+batches, each with one INSERT ... SELECT ... WHERE NOT EXISTS and its own
+commit, and progress is checkpointed so an interrupted run can be resumed.
+Users that already have any LLM configuration are skipped, and a user with
+several supported keys gets configurations for their first one only.
+
+    python -m app.data_migration [--dry-run] [--batch-size N] [--restart]
 """
 
-import sys
-import asyncio
-from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
-from app.models import User, APIKey, LLMConfig
-
-async def migrate_api_keys_to_llm_configs():
-    """Create LLM configurations for existing API keys."""
-    db = SessionLocal()
-    try:
-        # Get all API keys
-        api_keys = db.query(APIKey).all()
-        print(f"Found {len(api_keys)} API keys to process")
-        
-        for api_key in api_keys:
-            # Check if user already has LLM configs
-            existing_configs = db.query(LLMConfig).filter(
-                LLMConfig.user_id == api_key.user_id
-            ).count()
-            
-            if existing_configs > 0:
-                print(f"User {api_key.user_id} already has {existing_configs} LLM configs, skipping")
-                continue
-                
-            # Create LLM configs based on provider
-            if api_key.provider_name.lower() == "openai":
-                print(f"Creating OpenAI configs for user {api_key.user_id}")
-                # Add GPT-4o configuration (default)
-                gpt4o_config = LLMConfig(
-                    user_id=api_key.user_id,
-                    provider="openai",
-                    model_name="gpt-4o",
-                    encrypted_credentials=api_key.encrypted_key,
-                    is_default=True
-                )
-                db.add(gpt4o_config)
-                
-                # Add GPT-3.5 Turbo configuration
-                gpt35_config = LLMConfig(
-                    user_id=api_key.user_id,
-                    provider="openai",
-                    model_name="gpt-3.5-turbo",
-                    encrypted_credentials=api_key.encrypted_key,
-                    is_default=False
-                )
-                db.add(gpt35_config)
-                
-            elif api_key.provider_name.lower() == "anthropic":
-                print(f"Creating Anthropic configs for user {api_key.user_id}")
-                # Add Claude 3 Opus configuration (default)
-                claude_opus_config = LLMConfig(
-                    user_id=api_key.user_id,
-                    provider="anthropic",
-                    model_name="claude-3-opus-20240229",
-                    encrypted_credentials=api_key.encrypted_key,
-                    is_default=True
-                )
-                db.add(claude_opus_config)
-                
-                # Add Claude 3 Sonnet configuration
-                claude_sonnet_config = LLMConfig(
-                    user_id=api_key.user_id,
-                    provider="anthropic",
-                    model_name="claude-3-sonnet-20240229",
-                    encrypted_credentials=api_key.encrypted_key,
-                    is_default=False
-                )
-                db.add(claude_sonnet_config)
-                
-                # Add Claude 3 Haiku configuration
-                claude_haiku_config = LLMConfig(
-                    user_id=api_key.user_id,
-                    provider="anthropic",
-                    model_name="claude-3-haiku-20240307",
-                    encrypted_credentials=api_key.encrypted_key,
-                    is_default=False
-                )
-                db.add(claude_haiku_config)
-        
-        # Commit changes
-        db.commit()
-        print("Migration completed successfully")
-        
-    except Exception as e:
-        print(f"Error during migration: {e}")
-        db.rollback()
-    finally:
-        db.close()
+import argparse
+import logging
+import uuid
+
+from sqlalchemy import Boolean, String, column, exists, func, insert, select, values
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import aliased
+
+from app.backfill import Backfill, run_backfill
+from app.db.session import engine
+from app.models import APIKey, LLMConfig
+
+# Configurations created per provider: (provider, model_name, is_default)
+MODEL_TEMPLATES = values(
+    column("provider", String),
+    column("model_name", String),
+    column("is_default", Boolean),
+    name="model_templates",
+).data([
+    ("openai", "gpt-4o", True),
+    ("openai", "gpt-3.5-turbo", False),
+    ("anthropic", "claude-3-opus-20240229", True),
+    ("anthropic", "claude-3-sonnet-20240229", False),
+    ("anthropic", "claude-3-haiku-20240307", False),
+])
+
+SUPPORTED_PROVIDERS = ("openai", "anthropic")
+
+
+class ApiKeyLLMConfigBackfill(Backfill):
+    """Create default LLM configurations for users who only have an API key."""
+
+    name = "api_keys_to_llm_configs"
+    key_column = APIKey.__table__.c.id
+
+    def parse_key(self, value: str) -> uuid.UUID:
+        return uuid.UUID(value)
+
+    def _source(self, lower, upper):
+        """Rows to insert into llm_configs for keys in (lower, upper]."""
+        earlier_key = aliased(APIKey)
+        return (
+            select(
+                func.gen_random_uuid(),
+                APIKey.user_id,
+                MODEL_TEMPLATES.c.provider,
+                MODEL_TEMPLATES.c.model_name,
+                APIKey.encrypted_key,
+                MODEL_TEMPLATES.c.is_default,
+            )
+            .select_from(APIKey)
+            .join(MODEL_TEMPLATES, MODEL_TEMPLATES.c.provider == func.lower(APIKey.provider_name))
+            .where(
+                self.key_range(lower, upper),
+                # Users with existing configurations (including ones created by earlier batches)
+                ~exists().where(LLMConfig.user_id == APIKey.user_id),
+                # Only the user's first supported key
+                ~exists().where(
+                    earlier_key.user_id == APIKey.user_id,
+                    earlier_key.id < APIKey.id,
+                    func.lower(earlier_key.provider_name).in_(SUPPORTED_PROVIDERS),
+                ),
+            )
+        )
+
+    def apply(self, conn: Connection, lower, upper) -> int:
+        result = conn.execute(
+            insert(LLMConfig).from_select(
+                ["id", "user_id", "provider", "model_name", "encrypted_credentials", "is_default"],
+                self._source(lower, upper),
+            )
+        )
+        return result.rowcount
+
+    def pending(self, conn: Connection, lower, upper) -> int:
+        return conn.execute(
+            select(func.count()).select_from(self._source(lower, upper).subquery())
+        ).scalar_one()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Create LLM configurations for existing API keys")
+    parser.add_argument("--dry-run", action="store_true", help="Report how many configurations would be created")
+    parser.add_argument("--batch-size", type=int, default=None, help="API keys per batch (default 1000)")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start from the first key")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    run_backfill(
+        ApiKeyLLMConfigBackfill(),
+        engine,
+        dry_run=args.dry_run,
+        restart=args.restart,
+        batch_size=args.batch_size,
+    )
+
 
 if __name__ == "__main__":
-    asyncio.run(migrate_api_keys_to_llm_configs()) 
\ No newline at end of file
+    main()
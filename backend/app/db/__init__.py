@@ -2,6 +2,6 @@
 Database utilities and connection management.
 """
 
-from .session import get_db
+from .session import get_db, get_sync_db, AsyncSessionLocal, SessionLocal
 
-__all__ = ["get_db"] 
\ No newline at end of file
+__all__ = ["get_db", "get_sync_db", "AsyncSessionLocal", "SessionLocal"]
@@ -0,0 +1,105 @@
+"""
+Database engine configuration.
+
+All connection pool settings are read from environment variables so they can
+be tuned per deployment without code changes.
+"""
+
+import os
+from typing import Any, Dict
+from uuid import uuid4
+
+from sqlalchemy.engine import make_url
+
+from .pool import InstrumentedAsyncQueuePool, InstrumentedNullPool
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    """Read a boolean flag from the environment."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Number of connections kept open in the pool
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+
+# Extra connections allowed above pool_size under burst load
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+# Seconds to wait for a free connection before raising
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# Seconds after which a connection is replaced (guards against server/firewall idle kills)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# Test connections with a lightweight ping on checkout
+DB_POOL_PRE_PING = _env_flag("DB_POOL_PRE_PING", True)
+
+# Set when DATABASE_URL points at PgBouncer in transaction pooling mode
+DB_PGBOUNCER = _env_flag("DB_PGBOUNCER", False)
+
+# Compiled SQL cache entries per engine (statement construction is skipped on a hit)
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "500"))
+
+# asyncpg server-side prepared statements cached per connection (ignored behind PgBouncer)
+DB_PREPARED_STATEMENT_CACHE_SIZE = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "100"))
+
+# Seconds a user's reads stay on the primary after they write (read-your-writes).
+# Shared across workers through Redis when REDIS_URL is set, otherwise per worker
+DB_REPLICA_STICKY_SECONDS = float(os.getenv("DB_REPLICA_STICKY_SECONDS", "5"))
+
+# Replication lag (seconds) above which reads fall back to the primary
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+
+# Seconds between replication lag checks
+DB_REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "5"))
+
+# Seconds to stop using the replica after it fails to respond
+DB_REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+
+
+def async_engine_options(name: str, url: str) -> Dict[str, Any]:
+    """
+    Build keyword arguments for ``create_async_engine``.
+
+    In PgBouncer mode pooling is delegated to PgBouncer: the application opens
+    a connection per checkout and disables asyncpg's prepared statement cache,
+    since server-side statements do not survive transaction-level pooling.
+    Otherwise asyncpg keeps prepared statements per connection, which pays off
+    together with SQLAlchemy's compiled cache producing identical SQL text.
+
+    Args:
+        name: Name used for the pool in logs and metrics (e.g. "primary")
+        url: Database URL the engine connects to
+
+    Returns:
+        Dictionary of engine options
+    """
+    if DB_PGBOUNCER:
+        return {
+            "poolclass": InstrumentedNullPool,
+            "pool_logging_name": name,
+            "pool_pre_ping": DB_POOL_PRE_PING,
+            "query_cache_size": DB_QUERY_CACHE_SIZE,
+            "connect_args": {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            },
+        }
+
+    options = {
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_logging_name": name,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "query_cache_size": DB_QUERY_CACHE_SIZE,
+    }
+    if make_url(url).get_backend_name() == "postgresql":
+        options["connect_args"] = {"prepared_statement_cache_size": DB_PREPARED_STATEMENT_CACHE_SIZE}
+    return options
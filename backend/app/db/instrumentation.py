@@ -0,0 +1,222 @@
+"""
+SQL statement instrumentation.
+
+Engine event hooks time every statement. While a request (or a
+``query_budget`` block) is active, statements are also counted against a
+per-request QueryStats object held in a context variable, so the HTTP
+middleware can report how many round-trips a request made and where the
+database time went.
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Statements slower than this (in milliseconds) are logged as warnings
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+
+# Requests issuing more statements than this are logged with their slowest statements (0 disables)
+DB_REQUEST_MAX_QUERIES = int(os.getenv("DB_REQUEST_MAX_QUERIES", "0"))
+
+# Number of slowest statements kept per request
+DB_TRACK_SLOWEST = int(os.getenv("DB_TRACK_SLOWEST", "3"))
+
+# Longest statement text kept in logs and metrics
+_MAX_STATEMENT_LENGTH = 500
+
+
+def _shorten(statement: str) -> str:
+    """Collapse whitespace and truncate a statement for logging."""
+    statement = " ".join(statement.split())
+    if len(statement) > _MAX_STATEMENT_LENGTH:
+        statement = statement[:_MAX_STATEMENT_LENGTH] + "..."
+    return statement
+
+
+class QueryStats:
+    """Statements issued within one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest: List[Tuple[float, str]] = []
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        """Record a completed statement and how long it took."""
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if len(self.slowest) < DB_TRACK_SLOWEST or elapsed_ms > self.slowest[-1][0]:
+            self.slowest.append((elapsed_ms, statement))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[DB_TRACK_SLOWEST:]
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def start_query_stats() -> Tuple[QueryStats, Token]:
+    """
+    Start counting statements for the current context.
+
+    Returns:
+        Tuple of (stats object, token to pass to stop_query_stats)
+    """
+    stats = QueryStats()
+    return stats, _current_stats.set(stats)
+
+
+def stop_query_stats(token: Token) -> None:
+    """Stop counting statements for the current context."""
+    _current_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_query_start_time", None)
+    if start is None:
+        return
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+
+    if elapsed_ms >= DB_SLOW_QUERY_MS:
+        logger.warning(f"Slow SQL statement ({elapsed_ms:.1f} ms): {_shorten(statement)}")
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Attach statement timing hooks to an engine.
+
+    Args:
+        engine: Sync engine (for async engines pass ``async_engine.sync_engine``)
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class RouteQueryMetrics:
+    """Cumulative statement counts and DB time for one route."""
+
+    def __init__(self):
+        self.requests = 0
+        self.statements = 0
+        self.db_ms = 0.0
+        self.max_statements = 0
+        self.slowest_ms = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def record(self, stats: QueryStats) -> None:
+        """Add one request's statistics."""
+        self.requests += 1
+        self.statements += stats.count
+        self.db_ms += stats.total_ms
+        self.max_statements = max(self.max_statements, stats.count)
+        if stats.slowest and stats.slowest[0][0] > self.slowest_ms:
+            self.slowest_ms, statement = stats.slowest[0]
+            self.slowest_statement = _shorten(statement)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the metrics as a dictionary."""
+        return {
+            "requests": self.requests,
+            "statements_avg": round(self.statements / self.requests, 2) if self.requests else 0.0,
+            "statements_max": self.max_statements,
+            "db_ms_avg": round(self.db_ms / self.requests, 3) if self.requests else 0.0,
+            "slowest_ms": round(self.slowest_ms, 3),
+            "slowest_statement": self.slowest_statement,
+        }
+
+
+_ROUTE_METRICS: Dict[str, RouteQueryMetrics] = {}
+
+
+def record_request(route: str, stats: QueryStats) -> None:
+    """
+    Add a finished request to the per-route metrics and log it if over budget.
+
+    Args:
+        route: Method and route template, e.g. "GET /api/v1/agents"
+        stats: Statements recorded for the request
+    """
+    if route not in _ROUTE_METRICS:
+        _ROUTE_METRICS[route] = RouteQueryMetrics()
+    _ROUTE_METRICS[route].record(stats)
+
+    if DB_REQUEST_MAX_QUERIES and stats.count > DB_REQUEST_MAX_QUERIES:
+        slowest = "; ".join(f"{ms:.1f} ms: {_shorten(sql)}" for ms, sql in stats.slowest)
+        logger.warning(
+            f"{route} issued {stats.count} SQL statements ({stats.total_ms:.1f} ms), "
+            f"budget is {DB_REQUEST_MAX_QUERIES}. Slowest: {slowest}"
+        )
+
+
+def get_route_query_metrics() -> Dict[str, Dict[str, Any]]:
+    """Get per-route statement metrics keyed by "METHOD /route"."""
+    return {route: metrics.snapshot() for route, metrics in sorted(_ROUTE_METRICS.items())}
+
+
+@contextmanager
+def query_budget(max_statements: int) -> Iterator[QueryStats]:
+    """
+    Fail if the enclosed block issues more than max_statements statements.
+
+    Intended for tests of service functions called in the current task:
+
+        with query_budget(2):
+            await get_agent_connectors(db, user_id, agent_id)
+
+    Args:
+        max_statements: Largest allowed number of statements
+
+    Yields:
+        QueryStats for the block
+
+    Raises:
+        AssertionError: If the budget is exceeded
+    """
+    stats, token = start_query_stats()
+    try:
+        yield stats
+    finally:
+        stop_query_stats(token)
+    if stats.count > max_statements:
+        statements = "\n".join(f"  {ms:.1f} ms: {_shorten(sql)}" for ms, sql in stats.slowest)
+        raise AssertionError(
+            f"Expected at most {max_statements} SQL statements, got {stats.count}. Slowest:\n{statements}"
+        )
+
+
+def assert_query_budget(response: Any, max_statements: int) -> None:
+    """
+    Fail if an HTTP response reports more than max_statements statements.
+
+    Works with any client response carrying the X-DB-Query-Count header set
+    by QueryMetricsMiddleware, e.g. from FastAPI's TestClient.
+
+    Args:
+        response: Response object with a ``headers`` mapping
+        max_statements: Largest allowed number of statements
+
+    Raises:
+        AssertionError: If the header is missing or the budget is exceeded
+    """
+    count = response.headers.get("X-DB-Query-Count")
+    if count is None:
+        raise AssertionError("Response has no X-DB-Query-Count header; is QueryMetricsMiddleware installed?")
+    if int(count) > max_statements:
+        raise AssertionError(f"Expected at most {max_statements} SQL statements, got {count}")
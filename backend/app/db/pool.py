@@ -0,0 +1,106 @@
+"""
+Instrumented connection pools.
+
+The pool classes here behave exactly like their SQLAlchemy counterparts but
+record how long each checkout waited for a connection, so saturation of the
+pool shows up in metrics instead of as unexplained request latency.
+"""
+
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool
+
+logger = logging.getLogger(__name__)
+
+# Checkouts slower than this (in milliseconds) are logged as warnings
+DB_POOL_SLOW_CHECKOUT_MS = float(os.getenv("DB_POOL_SLOW_CHECKOUT_MS", "100"))
+
+
+class PoolMetrics:
+    """Cumulative checkout statistics for a single named pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.timeouts = 0
+        self.slow_checkouts = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+
+    def record_checkout(self, wait_ms: float) -> None:
+        """Record a successful checkout and how long it waited."""
+        self.checkouts += 1
+        self.wait_total_ms += wait_ms
+        if wait_ms > self.wait_max_ms:
+            self.wait_max_ms = wait_ms
+        if wait_ms >= DB_POOL_SLOW_CHECKOUT_MS:
+            self.slow_checkouts += 1
+            logger.warning(f"Slow connection checkout from pool '{self.name}': {wait_ms:.1f} ms")
+
+    def record_timeout(self) -> None:
+        """Record a checkout that gave up waiting for a connection."""
+        self.timeouts += 1
+
+    def snapshot(self, pool: Optional[Pool] = None) -> Dict[str, Any]:
+        """
+        Get the current metrics as a dictionary.
+
+        Args:
+            pool: Live pool to read in-use/overflow counts from, if available
+
+        Returns:
+            Dictionary of checkout statistics and current pool usage
+        """
+        data = {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "slow_checkouts": self.slow_checkouts,
+            "wait_avg_ms": round(self.wait_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+            "wait_max_ms": round(self.wait_max_ms, 3),
+        }
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            data.update({
+                "pool_size": pool.size(),
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            })
+        return data
+
+
+# Metrics keyed by pool logging name, so they survive pool recreation on dispose()
+_POOL_METRICS: Dict[str, PoolMetrics] = {}
+
+
+def get_pool_metrics(name: str) -> PoolMetrics:
+    """Get (or create) the metrics object for a named pool."""
+    if name not in _POOL_METRICS:
+        _POOL_METRICS[name] = PoolMetrics(name)
+    return _POOL_METRICS[name]
+
+
+class _InstrumentedPoolMixin:
+    """Times every checkout and reports it to the pool's PoolMetrics."""
+
+    def connect(self):
+        metrics = get_pool_metrics(self._orig_logging_name or "default")
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            metrics.record_timeout()
+            raise
+        metrics.record_checkout((time.perf_counter() - start) * 1000)
+        return connection
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout wait times."""
+
+
+class InstrumentedNullPool(_InstrumentedPoolMixin, NullPool):
+    """NullPool that records connection setup time (used behind PgBouncer)."""
@@ -0,0 +1,50 @@
+"""
+Shared Redis client.
+
+Redis is optional: when REDIS_URL is not set, get_redis() returns None and
+callers fall back to in-process state.
+"""
+
+import logging
+import os
+from typing import Optional
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+# Redis connection URL; leave unset to run without Redis
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Seconds to wait on a Redis connect or command before treating Redis as unavailable
+REDIS_TIMEOUT = float(os.getenv("REDIS_TIMEOUT", "0.5"))
+
+_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """
+    Get the process-wide Redis client, creating it on first use.
+
+    Returns:
+        Redis client, or None if REDIS_URL is not configured
+    """
+    global _client
+    if REDIS_URL is None:
+        return None
+    if _client is None:
+        _client = redis.from_url(
+            REDIS_URL,
+            socket_timeout=REDIS_TIMEOUT,
+            socket_connect_timeout=REDIS_TIMEOUT,
+            decode_responses=True,
+        )
+    return _client
+
+
+async def close_redis() -> None:
+    """Close the Redis client's connections, if one was created."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
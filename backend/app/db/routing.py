@@ -0,0 +1,154 @@
+"""
+Read-replica routing.
+
+Decides per request whether read-only queries may use the replica. Reads go
+to the primary when the replica is not configured, is down or lagging, or the
+user wrote something within the last few seconds (read-your-writes).
+
+Recent writes are remembered in process and, with Redis configured, in a
+short-lived Redis key, so a write handled by one worker also keeps the user's
+reads on other workers on the primary. Without Redis (or while it is down)
+read-your-writes only holds within the worker that handled the write.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Set
+from uuid import UUID
+
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import (
+    DB_REPLICA_STICKY_SECONDS,
+    DB_REPLICA_MAX_LAG_SECONDS,
+    DB_REPLICA_CHECK_INTERVAL,
+    DB_REPLICA_RETRY_SECONDS,
+)
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Replication lag in seconds; an idle replica that has replayed everything reports 0
+REPLICA_LAG_SQL = text(
+    "SELECT CASE "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) "
+    "END"
+)
+
+# Prune the write log once it grows past this many users
+_MAX_TRACKED_WRITERS = 10000
+
+# Redis key prefix marking users who wrote within the sticky window
+_STICKY_PREFIX = "replica_sticky:"
+
+
+class ReplicaRouter:
+    """Tracks replica health and recent writes to route read sessions."""
+
+    def __init__(
+        self,
+        sticky_seconds: float = DB_REPLICA_STICKY_SECONDS,
+        max_lag_seconds: float = DB_REPLICA_MAX_LAG_SECONDS,
+        check_interval: float = DB_REPLICA_CHECK_INTERVAL,
+        retry_seconds: float = DB_REPLICA_RETRY_SECONDS,
+    ):
+        self.sticky_seconds = sticky_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.retry_seconds = retry_seconds
+        self._last_write: Dict[UUID, float] = {}
+        # Redis writes in flight, referenced so they are not garbage collected
+        self._pending: Set[asyncio.Task] = set()
+        self._down_until = 0.0
+        self._lag_checked_at = 0.0
+        self._lagging = False
+
+    def record_write(self, user_id: Optional[UUID]) -> None:
+        """
+        Remember that a user just committed a write.
+
+        Called from a session's after_commit hook, which cannot await, so the
+        Redis marker is set by a background task.
+        """
+        if user_id is None:
+            return
+        now = time.monotonic()
+        if len(self._last_write) >= _MAX_TRACKED_WRITERS:
+            cutoff = now - self.sticky_seconds
+            self._last_write = {k: v for k, v in self._last_write.items() if v > cutoff}
+        self._last_write[user_id] = now
+
+        client = get_redis()
+        if client is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._share_write(client, user_id))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _share_write(self, client, user_id: UUID) -> None:
+        try:
+            await client.set(f"{_STICKY_PREFIX}{user_id}", "1", px=max(1, int(self.sticky_seconds * 1000)))
+        except RedisError as e:
+            logger.warning(f"Could not share read-your-writes marker: {e}")
+
+    async def is_sticky(self, user_id: Optional[UUID]) -> bool:
+        """Check whether a user's reads must stay on the primary, after a write on any worker."""
+        if user_id is None:
+            return False
+        last_write = self._last_write.get(user_id)
+        if last_write is not None and time.monotonic() - last_write < self.sticky_seconds:
+            return True
+        client = get_redis()
+        if client is None:
+            return False
+        try:
+            return bool(await client.exists(f"{_STICKY_PREFIX}{user_id}"))
+        except RedisError as e:
+            logger.warning(f"Read-your-writes marker check failed, using local state: {e}")
+            return False
+
+    async def replica_usable(self, db: AsyncSession) -> bool:
+        """
+        Check that a replica session can serve reads.
+
+        Acquires the session's connection (so a dead replica is detected before
+        the endpoint runs) and re-measures replication lag every check_interval.
+
+        Args:
+            db: Session bound to the replica engine
+
+        Returns:
+            True if the replica is reachable and not lagging
+        """
+        now = time.monotonic()
+        if now < self._down_until:
+            return False
+
+        try:
+            if now - self._lag_checked_at < self.check_interval:
+                await db.connection()
+                return not self._lagging
+
+            lag = await db.scalar(REPLICA_LAG_SQL)
+        except (SQLAlchemyError, OSError, asyncio.TimeoutError) as e:
+            logger.warning(f"Read replica unavailable, using primary for {self.retry_seconds}s: {e}")
+            self._down_until = now + self.retry_seconds
+            return False
+
+        self._lag_checked_at = now
+        self._lagging = lag is not None and float(lag) > self.max_lag_seconds
+        if self._lagging:
+            logger.warning(f"Read replica lagging by {float(lag):.1f}s, using primary")
+        return not self._lagging
+
+
+replica_router = ReplicaRouter()
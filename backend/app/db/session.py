@@ -1,22 +1,115 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from uuid import UUID
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 import os
 
+from .config import async_engine_options
+from .instrumentation import instrument_engine
+from .routing import replica_router
+from .urls import to_async_url, to_sync_url
+
 # Get the database URL from environment variable
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-# Create SQLAlchemy engine
-engine = create_engine(DATABASE_URL)
+# Optional read replica; when unset all reads go to the primary
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+
+
+class PrimarySession(Session):
+    """Session bound to the primary; commits mark the user as a recent writer."""
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _record_user_write(session: Session) -> None:
+    """Keep the committing user's reads on the primary for a short window."""
+    replica_router.record_write(session.info.get("user_id"))
+
+
+# Create the async SQLAlchemy engine used by the API (asyncpg), with pool
+# settings taken from the DB_POOL_* environment variables
+async_engine = create_async_engine(to_async_url(DATABASE_URL), **async_engine_options("primary", DATABASE_URL))
 
-# Create session factory
+# Create async session factory. Objects are not expired on commit so that
+# attributes stay readable after commit without an implicit (blocking) reload.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    sync_session_class=PrimarySession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+instrument_engine(async_engine.sync_engine)
+
+# Replica engine and session factory, if a replica is configured
+replica_engine = None
+ReplicaSessionLocal = None
+if DATABASE_REPLICA_URL:
+    replica_engine = create_async_engine(
+        to_async_url(DATABASE_REPLICA_URL), **async_engine_options("replica", DATABASE_REPLICA_URL)
+    )
+    instrument_engine(replica_engine.sync_engine)
+    ReplicaSessionLocal = async_sessionmaker(
+        bind=replica_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+# Synchronous engine kept for Alembic and one-off maintenance scripts (psycopg2)
+engine = create_engine(to_sync_url(DATABASE_URL))
+instrument_engine(engine)
+
+# Create sync session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Function to get a database session
-def get_db():
+async def get_db():
     """
-    Get a database session.
-    
+    Get an async database session.
+
+    Yields:
+        AsyncSession: A database session that will be automatically closed after use
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+@asynccontextmanager
+async def get_read_session(user_id: Optional[UUID] = None) -> AsyncIterator[AsyncSession]:
+    """
+    Open a session for read-only work, preferring the read replica.
+
+    Falls back to the primary when no replica is configured, the replica is
+    down or lagging, or the user has written within the sticky window.
+
+    Args:
+        user_id: ID of the user the reads are made for
+
+    Yields:
+        AsyncSession: A session bound to the replica or the primary
+    """
+    if ReplicaSessionLocal is not None and not await replica_router.is_sticky(user_id):
+        db = ReplicaSessionLocal()
+        try:
+            usable = await replica_router.replica_usable(db)
+            if usable:
+                yield db
+                return
+        finally:
+            await db.close()
+
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_sync_db():
+    """
+    Get a synchronous database session for scripts running outside the event loop.
+
     Yields:
         SQLAlchemy Session: A database session that will be automatically closed after use
     """
@@ -24,4 +117,4 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
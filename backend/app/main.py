@@ -1,28 +1,55 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
 # Import your models if needed for early checks, though not strictly required for just starting
 # from .models import Base
 
-from .db.session import get_db
-from .services.connector_catalog import initialize_connector_registry
+from .api.dependencies import get_current_superuser
+from .db.session import AsyncSessionLocal, async_engine, replica_engine
+from .db.pool import get_pool_metrics
+from .db.instrumentation import get_route_query_metrics
+from .db.redis_client import close_redis
+from .connectors import HealthCheckScheduler, token_manager
+from .middleware import QueryMetricsMiddleware, RateLimitMiddleware
+from .security.revocation import revocation_list
+from .security.principals import Principal
+from .services.connector_catalog import initialize_connector_registry, load_connector_catalog
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Periodic validation of user connectors' credentials
+health_checks = HealthCheckScheduler(AsyncSessionLocal)
+
 # Placeholder for startup/shutdown events (e.g., DB connection pool)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("AgentBase API starting up...")
     # Initialize connector registry
-    db = next(get_db())
-    try:
-        initialize_connector_registry(db)
-    except Exception as e:
-        logger.error(f"Error initializing connector registry: {e}")
+    async with AsyncSessionLocal() as db:
+        try:
+            await initialize_connector_registry(db)
+        except Exception as e:
+            logger.error(f"Error initializing connector registry: {e}")
+    # Materialize the catalog; if this fails it is loaded on first request instead
+    async with AsyncSessionLocal() as db:
+        try:
+            await load_connector_catalog(db)
+        except Exception as e:
+            logger.error(f"Error loading connector catalog: {e}")
+    revocation_list.start()
+    health_checks.start()
+    token_manager.start()
     yield
     logger.info("AgentBase API shutting down...")
+    await health_checks.stop()
+    await revocation_list.stop()
+    await token_manager.stop()
+    await async_engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
+    await close_redis()
 
 app = FastAPI(
     title="AgentBase API",
@@ -31,6 +58,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Per-client rate limits; added before CORS so that 429 responses carry CORS headers
+app.add_middleware(RateLimitMiddleware)
+
 # Add CORS middleware to allow cross-origin requests from the frontend
 app.add_middleware(
     CORSMiddleware,
@@ -38,8 +68,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "X-Next-Cursor", "ETag",
+        "X-DB-Query-Count", "X-DB-Time-Ms", "Server-Timing",
+        "RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset", "Retry-After",
+    ],
 )
 
+# Count SQL statements and database time per request
+app.add_middleware(QueryMetricsMiddleware)
+
 @app.get("/", tags=["Health"])
 async def read_root():
     """Basic endpoint to check if the API is responding."""
@@ -51,6 +89,19 @@ async def health_check():
     # In future, check DB and Redis connections here
     return {"status": "ok"}
 
+@app.get("/health/db", tags=["Health"])
+async def database_pool_status(current_user: Principal = Depends(get_current_superuser)):
+    """Connection pool usage and checkout wait statistics (superusers only)."""
+    pools = {"primary": get_pool_metrics("primary").snapshot(async_engine.pool)}
+    if replica_engine is not None:
+        pools["replica"] = get_pool_metrics("replica").snapshot(replica_engine.pool)
+    return pools
+
+@app.get("/health/queries", tags=["Health"])
+async def query_metrics(current_user: Principal = Depends(get_current_superuser)):
+    """SQL statement counts and database time per route (superusers only)."""
+    return get_route_query_metrics()
+
 # --- API Routers ---
 from .api.v1 import api_router
 app.include_router(api_router, prefix="/api/v1")
@@ -0,0 +1,83 @@
+"""
+Fills in api_keys.masked_key for keys stored before it existed.
+
+Listing API keys shows the stored masked form; keys without one have to be
+decrypted on every listing until this has run. Runs as a resumable backfill
+(see app/backfill.py) and must use the same Fernet keys as the API.
+
+    python -m app.mask_api_keys [--dry-run] [--batch-size N] [--restart]
+"""
+
+import argparse
+import logging
+import uuid
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.engine import Connection
+
+from app.backfill import Backfill, run_backfill
+from app.db.session import engine
+from app.models import APIKey
+from app.security.encryption import decrypt_data, mask_secret
+
+logger = logging.getLogger(__name__)
+
+api_keys = APIKey.__table__
+
+
+class MaskedKeyBackfill(Backfill):
+    """Store the masked form of API keys that have none."""
+
+    name = "api_keys_masked_key"
+    key_column = api_keys.c.id
+
+    def parse_key(self, value: str) -> uuid.UUID:
+        return uuid.UUID(value)
+
+    def apply(self, conn: Connection, lower, upper) -> int:
+        rows = conn.execute(
+            select(api_keys.c.id, api_keys.c.encrypted_key)
+            .where(self.key_range(lower, upper), api_keys.c.masked_key.is_(None))
+        ).all()
+
+        params = []
+        for row in rows:
+            decrypted = decrypt_data(row.encrypted_key)
+            if decrypted is None:
+                logger.warning(f"API key {row.id} could not be decrypted; left unmasked")
+                continue
+            params.append({"b_id": row.id, "b_masked": mask_secret(decrypted)})
+        if not params:
+            return 0
+
+        result = conn.execute(
+            update(api_keys)
+            .where(api_keys.c.id == bindparam("b_id"), api_keys.c.masked_key.is_(None))
+            .values(masked_key=bindparam("b_masked")),
+            params
+        )
+        return result.rowcount
+
+    def pending(self, conn: Connection, lower, upper) -> int:
+        return conn.execute(
+            select(func.count())
+            .select_from(api_keys)
+            .where(self.key_range(lower, upper), api_keys.c.masked_key.is_(None))
+        ).scalar_one()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    parser = argparse.ArgumentParser(description="Store masked forms of existing API keys")
+    parser.add_argument("--dry-run", action="store_true", help="Count keys to mask without writing")
+    parser.add_argument("--batch-size", type=int, default=None, help="Keys per batch (default 1000)")
+    parser.add_argument("--restart", action="store_true", help="Ignore saved progress and start from the beginning")
+    args = parser.parse_args()
+
+    run_backfill(MaskedKeyBackfill(), engine, dry_run=args.dry_run, restart=args.restart, batch_size=args.batch_size)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
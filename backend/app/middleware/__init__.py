@@ -0,0 +1,4 @@
+from .query_metrics import QueryMetricsMiddleware
+from .rate_limit import RateLimitMiddleware
+
+__all__ = ['QueryMetricsMiddleware', 'RateLimitMiddleware']
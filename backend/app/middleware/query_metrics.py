@@ -0,0 +1,48 @@
+"""
+Per-request SQL metrics middleware.
+
+Counts the statements each request issues and the time spent in the
+database, reports them in response headers and adds them to per-route
+metrics (see ``/health/queries``).
+"""
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..db.instrumentation import record_request, start_query_stats, stop_query_stats
+
+
+class QueryMetricsMiddleware:
+    """
+    ASGI middleware adding X-DB-Query-Count, X-DB-Time-Ms and Server-Timing headers.
+
+    Statements issued after the response has started (e.g. while streaming)
+    are counted in the route metrics but not in the headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = start_query_stats()
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("X-DB-Query-Count", str(stats.count))
+                headers.append("X-DB-Time-Ms", f"{stats.total_ms:.1f}")
+                headers.append("Server-Timing", f"db;dur={stats.total_ms:.1f}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            stop_query_stats(token)
+            # Use the route template so metrics are not keyed by IDs in the path
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "<unmatched>"
+            record_request(f"{scope['method']} {path}", stats)
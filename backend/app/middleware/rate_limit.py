@@ -0,0 +1,291 @@
+"""
+Per-client rate limiting middleware.
+
+Each API request draws from two token buckets: one for its route class (chat,
+auth, bulk, write, read) and one for all of the client's requests. Clients are
+identified by user ID for JWTs, by token prefix for access tokens, and by IP
+address otherwise. Access tokens only count as an identity once verified
+against the token cache, so made-up tokens cannot open fresh buckets, and
+auth requests are always counted against the client's IP address.
+
+Buckets live in Redis and are checked and updated by one Lua script call per
+request, so limits hold across workers. Without Redis each worker enforces the
+limits on its own. If Redis fails, requests are let through.
+
+Responses carry RateLimit-Limit, RateLimit-Remaining and RateLimit-Reset
+headers for the tighter of the two buckets. Rejected requests get a 429 with
+Retry-After.
+"""
+
+import logging
+import math
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from jose import JWTError, jwt
+from redis.exceptions import RedisError
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..db.redis_client import get_redis
+from ..security.access_tokens import is_access_token, verify_cached_token
+from ..security.tokens import ALGORITHM, SECRET_KEY
+from ..ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Turn rate limiting off entirely
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").strip().lower() in ("1", "true", "yes", "on")
+
+# Limits as "class=requests/seconds"; "all" applies to all of a client's requests.
+# Classes left out of RATE_LIMITS keep their default.
+DEFAULT_RATE_LIMITS = "chat=30/60,auth=10/60,bulk=10/60,write=120/60,read=600/60,all=1200/60"
+RATE_LIMITS = os.getenv("RATE_LIMITS", "")
+
+# Only requests under this path are limited
+RATE_LIMIT_PATH_PREFIX = "/api/v1/"
+
+# POST /api/v1/agents/{agent_id}/chat
+_CHAT_PATH = re.compile(r"^/api/v1/agents/[^/]+/chat/?$")
+
+_WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Token buckets for all of a request's keys, checked and updated atomically.
+# KEYS: bucket keys. ARGV: cost, then capacity and refill rate (tokens/s) per key.
+# Returns: allowed (0/1), limit, remaining, seconds until full and seconds until
+# the request could succeed, all for the tightest bucket (Lua floats are
+# truncated on return, so times are rounded up here).
+TOKEN_BUCKET_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local cost = tonumber(ARGV[1])
+local allowed = 1
+local retry = 0
+local levels = {}
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[i * 2])
+  local rate = tonumber(ARGV[i * 2 + 1])
+  local state = redis.call('HMGET', key, 'tokens', 'ts')
+  local tokens = tonumber(state[1]) or capacity
+  local ts = tonumber(state[2]) or now
+  tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+  levels[i] = tokens
+  if tokens < cost then
+    allowed = 0
+    retry = math.max(retry, (cost - tokens) / rate)
+  end
+end
+local limit, remaining, reset = 0, -1, 0
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[i * 2])
+  local rate = tonumber(ARGV[i * 2 + 1])
+  local tokens = levels[i]
+  if allowed == 1 then tokens = tokens - cost end
+  redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+  redis.call('PEXPIRE', key, math.ceil((capacity - tokens) / rate * 1000) + 1000)
+  if remaining < 0 or tokens < remaining then
+    limit, remaining, reset = capacity, tokens, (capacity - tokens) / rate
+  end
+end
+return {allowed, limit, math.floor(remaining), math.ceil(reset), math.ceil(retry)}
+"""
+
+
+@dataclass(frozen=True)
+class Limit:
+    """A token bucket: ``capacity`` requests, refilled over ``period`` seconds."""
+    capacity: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+
+@dataclass(frozen=True)
+class Decision:
+    """Outcome of a rate limit check, for the tightest bucket involved."""
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int
+    retry_after: int
+
+
+def parse_limits(spec: str) -> Dict[str, Limit]:
+    """
+    Parse a limits setting such as "chat=30/60,read=600/60".
+
+    Args:
+        spec: Comma-separated class=requests/seconds pairs
+
+    Returns:
+        Limits by route class
+
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    limits = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = entry.partition("=")
+        requests, _, seconds = value.partition("/")
+        limits[name.strip()] = Limit(int(requests), float(seconds))
+    return limits
+
+
+def route_class(method: str, path: str) -> str:
+    """Classify a request for rate limiting."""
+    if method == "POST" and _CHAT_PATH.match(path):
+        return "chat"
+    if path.startswith("/api/v1/auth/"):
+        return "auth"
+    if path.startswith("/api/v1/bulk/"):
+        return "bulk"
+    if method in _WRITE_METHODS:
+        return "write"
+    return "read"
+
+
+def ip_identity(scope: Scope) -> str:
+    """Identify a request's client by IP address."""
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+def client_identity(scope: Scope) -> str:
+    """
+    Identify the client a request is counted against.
+
+    JWTs are verified (not just decoded), so a client cannot spend another
+    user's quota by forging a subject claim. Access tokens are verified
+    against the token cache (no database lookup); a token that is not cached
+    yet, or does not verify, counts against the client's IP address until
+    authentication has cached it.
+    """
+    authorization = Headers(scope=scope).get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        if is_access_token(token):
+            cached = verify_cached_token(token)
+            if cached is not None:
+                return f"token:{cached.id}"
+        else:
+            try:
+                subject = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+                if subject:
+                    return f"user:{subject}"
+            except JWTError:
+                pass
+    return ip_identity(scope)
+
+
+class LocalBuckets:
+    """In-process token buckets, used when Redis is not configured."""
+
+    def __init__(self, maxsize: int = 100000, ttl: float = 3600):
+        self._buckets: TTLCache[str, List[float]] = TTLCache(maxsize, ttl)
+
+    def check(self, keys: List[str], limits: List[Limit], cost: float = 1) -> Decision:
+        now = time.monotonic()
+        levels = []
+        allowed = True
+        retry = 0.0
+        for key, limit in zip(keys, limits):
+            state = self._buckets.get(key)
+            tokens = limit.capacity if state is None else min(limit.capacity, state[0] + (now - state[1]) * limit.rate)
+            levels.append(tokens)
+            if tokens < cost:
+                allowed = False
+                retry = max(retry, (cost - tokens) / limit.rate)
+
+        tightest: Optional[Tuple[Limit, float]] = None
+        for key, limit, tokens in zip(keys, limits, levels):
+            if allowed:
+                tokens -= cost
+            self._buckets.set(key, [tokens, now])
+            if tightest is None or tokens < tightest[1]:
+                tightest = (limit, tokens)
+
+        limit, tokens = tightest
+        return Decision(
+            allowed=allowed,
+            limit=limit.capacity,
+            remaining=max(0, math.floor(tokens)),
+            reset=math.ceil((limit.capacity - tokens) / limit.rate),
+            retry_after=math.ceil(retry)
+        )
+
+
+class RateLimitMiddleware:
+    """ASGI middleware enforcing per-client, per-route-class token bucket limits."""
+
+    def __init__(self, app: ASGIApp, limits: Optional[Dict[str, Limit]] = None):
+        self.app = app
+        self.limits = limits or {**parse_limits(DEFAULT_RATE_LIMITS), **parse_limits(RATE_LIMITS)}
+        self._local = LocalBuckets()
+        self._script = None
+
+    async def _check(self, keys: List[str], limits: List[Limit]) -> Optional[Decision]:
+        client = get_redis()
+        if client is None:
+            return self._local.check(keys, limits)
+
+        if self._script is None:
+            self._script = client.register_script(TOKEN_BUCKET_LUA)
+        args: List[float] = [1]
+        for limit in limits:
+            args += [limit.capacity, limit.rate]
+        try:
+            allowed, limit, remaining, reset, retry_after = await self._script(keys=keys, args=args)
+        except RedisError as e:
+            logger.warning(f"Rate limit check failed, allowing request: {e}")
+            return None
+        return Decision(bool(allowed), int(limit), max(0, int(remaining)), int(reset), int(retry_after))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            not RATE_LIMIT_ENABLED
+            or scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or not scope["path"].startswith(RATE_LIMIT_PATH_PREFIX)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        request_class = route_class(scope["method"], scope["path"])
+        # Login and refresh attempts are limited per IP, whatever credentials they carry
+        identity = ip_identity(scope) if request_class == "auth" else client_identity(scope)
+        # The hash tag keeps a client's buckets in one Redis Cluster slot
+        keys = [f"ratelimit:{{{identity}}}:{request_class}", f"ratelimit:{{{identity}}}:all"]
+        decision = await self._check(keys, [self.limits[request_class], self.limits["all"]])
+        if decision is None:
+            await self.app(scope, receive, send)
+            return
+
+        rate_headers = {
+            "RateLimit-Limit": str(decision.limit),
+            "RateLimit-Remaining": str(decision.remaining),
+            "RateLimit-Reset": str(decision.reset),
+        }
+
+        if not decision.allowed:
+            response = JSONResponse(
+                {"detail": "Rate limit exceeded"},
+                status_code=429,
+                headers={**rate_headers, "Retry-After": str(max(1, decision.retry_after))}
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in rate_headers.items():
+                    headers.append(name, value)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -1,7 +1,7 @@
 import uuid
 from sqlalchemy import (
-    create_engine, Column, String, DateTime, Boolean, ForeignKey, JSON,
-    UniqueConstraint, Index, TIMESTAMP, Text
+    create_engine, Column, String, DateTime, Boolean, ForeignKey, JSON, BigInteger,
+    UniqueConstraint, Index, TIMESTAMP, Text, text
 )
 from sqlalchemy.orm import relationship, declarative_base
 from sqlalchemy.dialects.postgresql import UUID
@@ -25,6 +25,10 @@ class User(Base):
     configured_tools = relationship("ConfiguredTool", back_populates="user", cascade="all, delete-orphan")
     log_entries = relationship("LogEntry", back_populates="user", cascade="all, delete-orphan")
     user_connectors = relationship("UserConnector", back_populates="user", cascade="all, delete-orphan")
+    access_tokens = relationship("AccessToken", back_populates="user", cascade="all, delete-orphan")
+
+    # Superusers are rare; a partial index keeps the setup-complete check off a full scan
+    __table_args__ = (Index('ix_users_superuser', 'id', postgresql_where=text('is_superuser')),)
 
 class APIKey(Base):
     __tablename__ = 'api_keys'
@@ -32,10 +36,35 @@ class APIKey(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
     provider_name = Column(String, nullable=False, index=True)  # e.g., 'OpenAI', 'Anthropic'
     encrypted_key = Column(String, nullable=False)  # Store the encrypted key here
+    masked_key = Column(String, nullable=True)  # Display form, computed when the key is stored
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     user = relationship("User", back_populates="api_keys")
 
+    __table_args__ = (
+        Index('ix_api_keys_user_created', 'user_id', 'created_at', 'id'),
+        Index('ix_api_keys_user_provider_name', 'user_id', 'provider_name', 'id'),
+    )
+
+class AccessToken(Base):
+    """Long-lived AgentBase API token for programmatic clients (see app/security/access_tokens.py)"""
+    __tablename__ = 'access_tokens'
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
+    name = Column(String, nullable=False)  # User-defined label (e.g., "CI pipeline")
+    prefix = Column(String, nullable=False, unique=True)  # Public lookup part of the token
+    secret_hash = Column(String, nullable=False)  # HMAC-SHA256 of the secret part, hex
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=True)  # NULL = no expiry
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+
+    user = relationship("User", back_populates="access_tokens")
+
+    __table_args__ = (
+        Index('ix_access_tokens_user_created', 'user_id', 'created_at', 'id'),
+        Index('ix_access_tokens_user_name', 'user_id', 'name', 'id'),
+    )
+
 class LLMConfig(Base):
     __tablename__ = 'llm_configs'
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -50,11 +79,17 @@ class LLMConfig(Base):
     user = relationship("User", back_populates="llm_configs")
     agents = relationship("Agent", back_populates="llm_config")
 
+    __table_args__ = (
+        Index('ix_llm_configs_user_created', 'user_id', 'created_at', 'id'),
+        Index('ix_llm_configs_user_model_name', 'user_id', 'model_name', 'id'),
+        Index('ix_llm_configs_user_default', 'user_id', postgresql_where=text('is_default')),
+    )
+
 class Agent(Base):
     __tablename__ = 'agents'
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
-    llm_config_id = Column(UUID(as_uuid=True), ForeignKey('llm_configs.id'), nullable=True) # Can start null, link later
+    llm_config_id = Column(UUID(as_uuid=True), ForeignKey('llm_configs.id'), nullable=True, index=True) # Can start null, link later
     name = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     system_prompt = Column(Text, nullable=True)
@@ -68,7 +103,11 @@ class Agent(Base):
     log_entries = relationship("LogEntry", back_populates="agent", cascade="all, delete-orphan")
     agent_connector_links = relationship("AgentConnectorLink", back_populates="agent", cascade="all, delete-orphan")
 
-    __table_args__ = (UniqueConstraint('user_id', 'name', name='uq_user_agent_name'),)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'name', name='uq_user_agent_name'),
+        Index('ix_agents_user_created', 'user_id', 'created_at', 'id'),
+        Index('ix_agents_user_name', 'user_id', 'name', 'id'),
+    )
 
 class Tool(Base):
     """Registry of available tool types"""
@@ -101,18 +140,71 @@ class UserConnector(Base):
     tool = relationship("Tool", back_populates="user_connectors")
     agent_connector_links = relationship("AgentConnectorLink", back_populates="user_connector", cascade="all, delete-orphan")
 
-    __table_args__ = (UniqueConstraint('user_id', 'name', name='uq_user_connector_name'),)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'name', name='uq_user_connector_name'),
+        Index('ix_user_connectors_user_created', 'user_id', 'created_at', 'id'),
+        Index('ix_user_connectors_user_name', 'user_id', 'name', 'id'),
+    )
 
 class AgentConnectorLink(Base):
     """Links an Agent to a specific UserConnector instance"""
     __tablename__ = 'agent_connector_links'
     agent_id = Column(UUID(as_uuid=True), ForeignKey('agents.id'), primary_key=True)
-    user_connector_id = Column(UUID(as_uuid=True), ForeignKey('user_connectors.id'), primary_key=True)
+    user_connector_id = Column(UUID(as_uuid=True), ForeignKey('user_connectors.id'), primary_key=True, index=True)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
 
     agent = relationship("Agent", back_populates="agent_connector_links")
     user_connector = relationship("UserConnector", back_populates="agent_connector_links")
 
+class ConnectorSyncState(Base):
+    """Position of a user connector's local index in its provider's change feed (see app/connectors/sync.py)"""
+    __tablename__ = 'connector_sync_states'
+    user_connector_id = Column(UUID(as_uuid=True), ForeignKey('user_connectors.id'), primary_key=True)
+    cursor = Column(String, nullable=False)  # Provider's sync position (e.g. Gmail history ID)
+    synced_at = Column(TIMESTAMP(timezone=True), nullable=False)  # When the index was last brought up to date
+    full_synced_at = Column(TIMESTAMP(timezone=True), nullable=True)  # When the index was last rebuilt by a full sync
+
+class GmailMessage(Base):
+    """Metadata and snippet of a Gmail message in a connector's local index (see app/connectors/gmail.py)"""
+    __tablename__ = 'gmail_messages'
+    user_connector_id = Column(UUID(as_uuid=True), ForeignKey('user_connectors.id'), primary_key=True)
+    message_id = Column(String, primary_key=True)  # Gmail message ID
+    thread_id = Column(String, nullable=True)
+    received_at = Column(TIMESTAMP(timezone=True), nullable=False)  # Gmail internalDate
+    sender = Column(Text, nullable=True)  # From header
+    recipients = Column(Text, nullable=True)  # To and Cc headers
+    subject = Column(Text, nullable=True)
+    snippet = Column(Text, nullable=True)
+    label_ids = Column(JSON, nullable=True)
+
+    __table_args__ = (Index('ix_gmail_messages_connector_received', 'user_connector_id', 'received_at'),)
+
+class GmailMessageLabel(Base):
+    """A label on a message in a connector's Gmail index, so label searches can filter and limit in SQL"""
+    __tablename__ = 'gmail_message_labels'
+    user_connector_id = Column(UUID(as_uuid=True), ForeignKey('user_connectors.id'), primary_key=True)
+    message_id = Column(String, primary_key=True)  # Gmail message ID
+    label_id = Column(String, primary_key=True)  # Gmail label ID (e.g. "UNREAD")
+    received_at = Column(TIMESTAMP(timezone=True), nullable=False)  # Copied from the message, for newest-first scans
+
+    __table_args__ = (
+        Index('ix_gmail_message_labels_connector_label_received', 'user_connector_id', 'label_id', 'received_at'),
+    )
+
+class CalendarEvent(Base):
+    """A Google Calendar event in a connector's local store (see app/connectors/calendar.py)"""
+    __tablename__ = 'calendar_events'
+    user_connector_id = Column(UUID(as_uuid=True), ForeignKey('user_connectors.id'), primary_key=True)
+    event_id = Column(String, primary_key=True)  # Calendar event ID (one per occurrence of recurring events)
+    summary = Column(Text, nullable=True)
+    location = Column(Text, nullable=True)
+    start_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    end_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    all_day = Column(Boolean, nullable=False, default=False)
+    busy = Column(Boolean, nullable=False, default=True)  # False for events shown as free (transparent)
+
+    __table_args__ = (Index('ix_calendar_events_connector_start', 'user_connector_id', 'start_at'),)
+
 class ConfiguredTool(Base):
     """An instance of a Tool configured by a user"""
     __tablename__ = 'configured_tools'
@@ -160,6 +252,8 @@ class ConversationTurn(Base):
 
     agent = relationship("Agent", back_populates="conversation_turns")
 
+    __table_args__ = (Index('ix_conversation_turns_agent_timestamp', 'agent_id', 'timestamp'),)
+
 class LogEntry(Base):
     """Stores detailed operational logs"""
     __tablename__ = 'log_entries'
@@ -173,4 +267,23 @@ class LogEntry(Base):
     timestamp = Column(TIMESTAMP(timezone=True), server_default=func.now(), index=True)
 
     user = relationship("User", back_populates="log_entries")
-    agent = relationship("Agent", back_populates="log_entries") 
\ No newline at end of file
+    agent = relationship("Agent", back_populates="log_entries") 
+
+
+class BackfillCheckpoint(Base):
+    """Progress of a resumable data backfill (see app/backfill.py)"""
+    __tablename__ = 'backfill_checkpoints'
+    name = Column(String, primary_key=True)
+    last_key = Column(String, nullable=True) # Last key processed, as text
+    rows_scanned = Column(BigInteger, nullable=False, default=0)
+    rows_written = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
+    completed_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
+
+class RegistryChecksum(Base):
+    """Checksum of a code-defined registry last synced to the database (e.g. connector types)"""
+    __tablename__ = 'registry_checksums'
+    name = Column(String, primary_key=True)
+    checksum = Column(String, nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
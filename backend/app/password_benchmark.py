@@ -0,0 +1,93 @@
+"""
+Benchmark of login password checks and their effect on other requests.
+
+Runs a burst of concurrent bcrypt verifications on one event loop, once inline
+(as login did before, blocking the loop) and once on the hashing thread pool,
+while a probe coroutine stands in for cheap non-login requests and measures how
+late the loop lets it run. Uses the configured BCRYPT_ROUNDS and
+PASSWORD_HASH_WORKERS.
+
+    python -m app.password_benchmark [--logins 40] [--concurrency 20]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+from app.security.passwords import (
+    BCRYPT_ROUNDS,
+    PASSWORD_HASH_WORKERS,
+    hash_password,
+    verify_and_update_password,
+    verify_password,
+)
+
+# Milliseconds between probe requests
+PROBE_INTERVAL_MS = 5.0
+
+
+async def _probe(stop: asyncio.Event, delays: List[float]) -> None:
+    """Record how much later than scheduled each probe tick runs, in ms."""
+    interval = PROBE_INTERVAL_MS / 1000
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        delays.append((time.perf_counter() - expected) * 1000)
+
+
+async def _run(verify: Callable[[str, str], Awaitable[object]], hashed: str, logins: int, concurrency: int) -> None:
+    """Run a login burst with a probe alongside and print the results."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login() -> None:
+        async with semaphore:
+            await verify("correct horse battery staple", hashed)
+
+    stop = asyncio.Event()
+    delays: List[float] = []
+    probe = asyncio.create_task(_probe(stop, delays))
+    await asyncio.sleep(PROBE_INTERVAL_MS / 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+
+    delays.sort()
+    p99 = delays[min(len(delays) - 1, int(len(delays) * 0.99))] if delays else 0.0
+    median = statistics.median(delays) if delays else 0.0
+    print(f"  logins/s          {logins / elapsed:8.1f}")
+    print(f"  probe requests    {len(delays):8d}")
+    print(f"  probe delay p50   {median:8.1f} ms")
+    print(f"  probe delay p99   {p99:8.1f} ms")
+    print(f"  probe delay max   {(delays[-1] if delays else 0.0):8.1f} ms")
+
+
+async def _inline_verify(password: str, hashed: str) -> bool:
+    """Verify on the event loop thread, as a plain call inside async code would."""
+    return verify_password(password, hashed)
+
+
+async def main_async(logins: int, concurrency: int) -> None:
+    hashed = hash_password("correct horse battery staple")
+    print(f"bcrypt rounds {BCRYPT_ROUNDS}, {PASSWORD_HASH_WORKERS} hashing threads, "
+          f"{logins} logins at concurrency {concurrency}")
+    print("inline verify (blocks the event loop)")
+    await _run(_inline_verify, hashed, logins, concurrency)
+    print("thread pool verify")
+    await _run(verify_and_update_password, hashed, logins, concurrency)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark login hashing and event loop responsiveness")
+    parser.add_argument("--logins", type=int, default=40, help="Logins in the burst")
+    parser.add_argument("--concurrency", type=int, default=20, help="Logins in flight at once")
+    args = parser.parse_args()
+    asyncio.run(main_async(args.logins, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
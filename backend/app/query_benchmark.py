@@ -0,0 +1,132 @@
+"""
+Microbenchmark of per-call Python overhead for the hottest lookups.
+
+Compares the legacy ``Query`` API, a plain 2.0 ``select()`` and a lambda
+statement for the queries run on every request (user lookup) and every chat
+message (agent with its LLM configuration, conversation history). Uses an
+in-memory SQLite database so the numbers are dominated by statement
+construction, compilation/caching and ORM loading rather than the network.
+
+    python -m app.query_benchmark [--iterations 5000]
+"""
+
+import argparse
+import time
+import uuid
+from typing import Callable, Dict
+
+from sqlalchemy import create_engine, lambda_stmt, select
+from sqlalchemy.orm import Session
+
+from app.models import Agent, Base, ConversationTurn, LLMConfig, User
+
+
+def _seed(session: Session) -> Dict[str, uuid.UUID]:
+    """Create one user with an agent, an LLM config and a short conversation."""
+    user = User(email="bench@example.invalid", hashed_password="x", is_superuser=True)
+    session.add(user)
+    session.flush()
+    config = LLMConfig(user_id=user.id, provider="openai", model_name="gpt-4o",
+                       encrypted_credentials="x", is_default=True)
+    session.add(config)
+    session.flush()
+    agent = Agent(user_id=user.id, llm_config_id=config.id, name="bench")
+    session.add(agent)
+    session.flush()
+    for i in range(20):
+        session.add(ConversationTurn(agent_id=agent.id, role="user", content=f"message {i}"))
+    session.commit()
+    return {"user_id": user.id, "agent_id": agent.id}
+
+
+def _cases(session: Session, ids: Dict[str, uuid.UUID]) -> Dict[str, Dict[str, Callable[[], object]]]:
+    """Build the benchmarked callables, grouped by query."""
+    user_id = ids["user_id"]
+    agent_id = ids["agent_id"]
+
+    def agent_with_config_legacy():
+        agent = session.query(Agent).filter(Agent.id == agent_id, Agent.user_id == user_id).first()
+        return agent, session.query(LLMConfig).filter(LLMConfig.id == agent.llm_config_id).first()
+
+    def agent_with_config_select():
+        agent = session.execute(
+            select(Agent).where(Agent.id == agent_id, Agent.user_id == user_id)
+        ).scalars().first()
+        return agent, session.execute(
+            select(LLMConfig).where(LLMConfig.id == agent.llm_config_id)
+        ).scalars().first()
+
+    return {
+        "get_user_by_id": {
+            "legacy Query": lambda: session.query(User).filter(User.id == user_id).first(),
+            "select()": lambda: session.execute(select(User).where(User.id == user_id)).scalars().first(),
+            "lambda_stmt": lambda: session.execute(
+                lambda_stmt(lambda: select(User).where(User.id == user_id))
+            ).scalars().first(),
+        },
+        "get_agent_with_config": {
+            "legacy Query (2 queries)": agent_with_config_legacy,
+            "select() (2 queries)": agent_with_config_select,
+            "lambda_stmt (joined)": lambda: session.execute(
+                lambda_stmt(
+                    lambda: select(Agent, LLMConfig)
+                    .outerjoin(LLMConfig, LLMConfig.id == Agent.llm_config_id)
+                    .where(Agent.id == agent_id, Agent.user_id == user_id)
+                )
+            ).first(),
+        },
+        "get_conversation_history": {
+            "legacy Query": lambda: session.query(ConversationTurn)
+            .filter(ConversationTurn.agent_id == agent_id)
+            .order_by(ConversationTurn.timestamp.asc())
+            .limit(50)
+            .all(),
+            "select()": lambda: session.execute(
+                select(ConversationTurn)
+                .where(ConversationTurn.agent_id == agent_id)
+                .order_by(ConversationTurn.timestamp.asc())
+                .limit(50)
+            ).scalars().all(),
+            "lambda_stmt": lambda: session.execute(
+                lambda_stmt(
+                    lambda: select(ConversationTurn)
+                    .where(ConversationTurn.agent_id == agent_id)
+                    .order_by(ConversationTurn.timestamp.asc())
+                    .limit(50)
+                )
+            ).scalars().all(),
+        },
+    }
+
+
+def _time_per_call(func: Callable[[], object], iterations: int) -> float:
+    """Average wall time of func in microseconds, after a short warm-up."""
+    for _ in range(50):
+        func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark hot-path query construction overhead")
+    parser.add_argument("--iterations", type=int, default=5000, help="Calls per variant")
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        ids = _seed(session)
+        for query, variants in _cases(session, ids).items():
+            print(query)
+            baseline = None
+            for label, func in variants.items():
+                micros = _time_per_call(func, args.iterations)
+                baseline = baseline or micros
+                print(f"  {label:<26} {micros:8.1f} us/call  ({micros / baseline:.2f}x)")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
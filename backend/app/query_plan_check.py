@@ -0,0 +1,283 @@
+"""
+Query plan regression check for the service layer.
+
+Seeds a realistic number of users, agents, connectors and related rows inside
+a transaction, runs the service-layer read paths against them and EXPLAINs
+every statement they issue. The run fails if any statement falls back to a
+sequential scan on one of the per-user tables. All seeded rows are rolled back.
+
+Run against a migrated PostgreSQL database:
+
+    python -m app.query_plan_check [--users 200] [--rows-per-user 50]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.db.session import async_engine
+from app.models import APIKey
+from app.services.agent_service import get_agent_by_id, get_agents_by_user
+from app.services.chat_service import ChatService
+from app.services.llm_config_service import get_llm_configs_by_user
+from app.services.pagination import paginate
+from app.services.setup_service import is_setup_complete
+from app.services.user_connector_service import (
+    delete_user_connector,
+    get_agent_connectors,
+    get_user_connector,
+    get_user_connectors,
+)
+from app.services.user_service import get_user_by_id
+
+# Tables that grow with the number of users; a sequential scan on any of them is a regression.
+# Small, fixed-size tables such as tools are expected to be scanned.
+CHECKED_TABLES = {
+    "users",
+    "api_keys",
+    "llm_configs",
+    "agents",
+    "user_connectors",
+    "agent_connector_links",
+    "conversation_turns",
+}
+
+SEED_EMAIL_PATTERN = "plan-check-%@example.invalid"
+
+SEED_STATEMENTS = [
+    """
+    INSERT INTO users (id, email, hashed_password, is_active, is_superuser, created_at, updated_at)
+    SELECT gen_random_uuid(), 'plan-check-' || g || '@example.invalid', 'x', true, g = 1, now(), now()
+    FROM generate_series(1, :users) g
+    """,
+    """
+    INSERT INTO api_keys (id, user_id, provider_name, encrypted_key, created_at)
+    SELECT gen_random_uuid(), u.id, p.name, 'x', now()
+    FROM users u CROSS JOIN (VALUES ('OpenAI'), ('Anthropic')) AS p(name)
+    WHERE u.email LIKE :pattern
+    """,
+    """
+    INSERT INTO llm_configs (id, user_id, provider, model_name, encrypted_credentials, is_default, created_at, updated_at)
+    SELECT gen_random_uuid(), u.id, 'openai', 'model-' || g, 'x', g = 1, now() - g * interval '1 minute', now()
+    FROM users u CROSS JOIN generate_series(1, 3) g
+    WHERE u.email LIKE :pattern
+    """,
+    """
+    INSERT INTO agents (id, user_id, llm_config_id, name, created_at, updated_at)
+    SELECT gen_random_uuid(), u.id, c.id, 'agent-' || g, now() - g * interval '1 second', now()
+    FROM users u
+    JOIN llm_configs c ON c.user_id = u.id AND c.is_default
+    CROSS JOIN generate_series(1, :per_user) g
+    WHERE u.email LIKE :pattern
+    """,
+    """
+    INSERT INTO tools (id, name, description, tool_type, execution_ref, created_at)
+    VALUES (gen_random_uuid(), 'plan_check_tool', 'Query plan check', 'api_key', 'plan_check', now())
+    ON CONFLICT (name) DO NOTHING
+    """,
+    """
+    INSERT INTO user_connectors (id, user_id, tool_id, name, setup_status, created_at, updated_at)
+    SELECT gen_random_uuid(), u.id, t.id, 'connector-' || g, 'needs_setup', now() - g * interval '1 second', now()
+    FROM users u
+    JOIN tools t ON t.name = 'plan_check_tool'
+    CROSS JOIN generate_series(1, :per_user) g
+    WHERE u.email LIKE :pattern
+    """,
+    """
+    INSERT INTO agent_connector_links (agent_id, user_connector_id, created_at)
+    SELECT a.id, c.id, now()
+    FROM agents a
+    JOIN users u ON u.id = a.user_id
+    JOIN user_connectors c ON c.user_id = a.user_id AND substr(c.name, 11) = substr(a.name, 7)
+    WHERE u.email LIKE :pattern
+    """,
+    """
+    INSERT INTO conversation_turns (id, agent_id, role, content, timestamp)
+    SELECT gen_random_uuid(), a.id, r.role, 'x', now() - r.n * interval '1 second'
+    FROM agents a
+    JOIN users u ON u.id = a.user_id
+    CROSS JOIN (VALUES (1, 'user'), (2, 'agent')) AS r(n, role)
+    WHERE u.email LIKE :pattern
+    """,
+]
+
+
+@dataclass
+class Sample:
+    """IDs of seeded rows the checks run against."""
+    user_id: UUID
+    agent_id: UUID
+    connector_id: UUID
+
+
+class StatementRecorder:
+    """Collects the statements sent to the database while enabled."""
+
+    def __init__(self):
+        self.enabled = False
+        self.statements: List[Tuple[str, Any]] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.enabled:
+            self.statements.append((statement, parameters))
+
+
+def _api_keys_page(db: AsyncSession, user_id: UUID) -> Awaitable[Any]:
+    """Same query as GET /users/me/api-keys."""
+    query = select(APIKey).where(APIKey.user_id == user_id)
+    return paginate(db, query, APIKey, "created_at", {"created_at": APIKey.created_at})
+
+
+CHECKS: List[Tuple[str, Callable[[AsyncSession, Sample], Awaitable[Any]]]] = [
+    ("is_setup_complete", lambda db, s: is_setup_complete(db)),
+    ("get_user_by_id", lambda db, s: get_user_by_id(db, s.user_id)),
+    ("get_api_keys", lambda db, s: _api_keys_page(db, s.user_id)),
+    ("get_llm_configs_by_user", lambda db, s: get_llm_configs_by_user(db, s.user_id)),
+    ("get_llm_configs_by_user(is_default)", lambda db, s: get_llm_configs_by_user(db, s.user_id, is_default=True)),
+    ("get_agents_by_user", lambda db, s: get_agents_by_user(db, s.user_id)),
+    ("get_agent_by_id", lambda db, s: get_agent_by_id(db, s.agent_id, s.user_id)),
+    ("get_user_connectors", lambda db, s: get_user_connectors(db, s.user_id, include_details=True)),
+    ("get_user_connector", lambda db, s: get_user_connector(db, s.user_id, s.connector_id)),
+    ("get_agent_connectors", lambda db, s: get_agent_connectors(db, s.user_id, s.agent_id)),
+    ("get_agent_with_config", lambda db, s: ChatService(db).get_agent_with_config(s.agent_id, s.user_id)),
+    ("get_conversation_history", lambda db, s: ChatService(db).get_conversation_history(s.agent_id)),
+    ("delete_user_connector", lambda db, s: delete_user_connector(db, s.user_id, s.connector_id)),
+]
+
+
+async def seed(conn: AsyncConnection, users: int, per_user: int) -> Sample:
+    """
+    Insert the seed rows and refresh planner statistics.
+
+    Args:
+        conn: Connection with an open transaction
+        users: Number of users to create
+        per_user: Number of agents and connectors per user
+
+    Returns:
+        IDs of a seeded (non-superuser) user, one of their agents and a linked connector
+    """
+    params = {"users": users, "per_user": per_user, "pattern": SEED_EMAIL_PATTERN}
+    for statement in SEED_STATEMENTS:
+        await conn.execute(text(statement), params)
+    for table in sorted(CHECKED_TABLES | {"tools"}):
+        await conn.exec_driver_sql(f"ANALYZE {table}")
+
+    row = (await conn.execute(text(
+        """
+        SELECT u.id, a.id, l.user_connector_id
+        FROM users u
+        JOIN agents a ON a.user_id = u.id
+        JOIN agent_connector_links l ON l.agent_id = a.id
+        WHERE u.email = 'plan-check-2@example.invalid'
+        LIMIT 1
+        """
+    ))).one()
+    return Sample(user_id=row[0], agent_id=row[1], connector_id=row[2])
+
+
+def find_seq_scans(plan: Dict[str, Any]) -> List[str]:
+    """
+    Find sequential scans on checked tables in an EXPLAIN (FORMAT JSON) plan.
+
+    Args:
+        plan: Plan node
+
+    Returns:
+        Names of the checked tables that are scanned sequentially
+    """
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in CHECKED_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(find_seq_scans(child))
+    return found
+
+
+async def explain(conn: AsyncConnection, statement: str, parameters: Any) -> Dict[str, Any]:
+    """Get the JSON plan of a statement without executing it."""
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    document = result.scalar()
+    if isinstance(document, str):
+        document = json.loads(document)
+    return document[0]["Plan"]
+
+
+async def run(users: int, per_user: int) -> List[str]:
+    """
+    Seed the database, run every check and collect plan regressions.
+
+    Args:
+        users: Number of users to seed
+        per_user: Number of agents and connectors per user
+
+    Returns:
+        Failure messages, empty if every statement uses an index
+    """
+    recorder = StatementRecorder()
+    event.listen(async_engine.sync_engine, "before_cursor_execute", recorder)
+    failures = []
+    try:
+        async with async_engine.connect() as conn:
+            transaction = await conn.begin()
+            try:
+                print(f"Seeding {users} users with {per_user} agents and connectors each...")
+                sample = await seed(conn, users, per_user)
+
+                for name, check in CHECKS:
+                    # Service commits only release a savepoint; the outer transaction is rolled back below
+                    async with AsyncSession(bind=conn, join_transaction_mode="create_savepoint") as db:
+                        recorder.statements = []
+                        recorder.enabled = True
+                        try:
+                            await check(db, sample)
+                        finally:
+                            recorder.enabled = False
+
+                    for statement, parameters in recorder.statements:
+                        if not statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+                            continue
+                        scans = find_seq_scans(await explain(conn, statement, parameters))
+                        status = "ok" if not scans else f"SEQ SCAN on {', '.join(scans)}"
+                        print(f"  {name}: {status}")
+                        if scans:
+                            failures.append(f"{name}: sequential scan on {', '.join(scans)}\n    {statement}")
+            finally:
+                await transaction.rollback()
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", recorder)
+        await async_engine.dispose()
+
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check service-layer query plans for sequential scans")
+    parser.add_argument("--users", type=int, default=200, help="Number of users to seed")
+    parser.add_argument("--rows-per-user", type=int, default=50, help="Agents and connectors per user")
+    args = parser.parse_args()
+
+    if async_engine.dialect.name != "postgresql":
+        print("The query plan check requires PostgreSQL")
+        return 2
+
+    failures = asyncio.run(run(args.users, args.rows_per_user))
+    if failures:
+        print(f"\n{len(failures)} statement(s) regressed to a sequential scan:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+
+    print("\nAll statements use an index")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
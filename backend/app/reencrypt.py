@@ -0,0 +1,213 @@
+"""
+Re-encrypts stored secrets under the primary Fernet key.
+
+Rotating the encryption key is an online operation:
+
+1. Prepend the new key to AGENTBASE_FERNET_KEYS (new,old) and deploy. New
+   data is encrypted with the new key; old data stays readable.
+2. Run this job. It walks api_keys, llm_configs, user_connectors and
+   configured_tools in keyset batches and rewrites every value that is not
+   already encrypted with the primary key.
+3. Once it has finished, remove the old key from AGENTBASE_FERNET_KEYS.
+
+Decryption and re-encryption run on a process pool. Each table is a backfill
+(see app/backfill.py) checkpointed under the primary key's fingerprint, so an
+interrupted run resumes where it stopped and a later rotation starts afresh.
+Rows are updated only if their value has not changed since they were read, so
+the job can run while the API is writing.
+
+An LLM configuration created from an API key stores the same ciphertext as the
+key, and deleting the key finds its configurations by that equality. When an
+API key is re-encrypted, its user's configurations holding the same ciphertext
+are updated to the new value in the same transaction.
+
+    python -m app.reencrypt [--dry-run] [--batch-size N] [--restart] [--workers N]
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from sqlalchemy import Table, and_, bindparam, select, update
+from sqlalchemy.engine import Connection
+
+from app.backfill import Backfill, run_backfill
+from app.db.session import engine
+from app.models import APIKey, ConfiguredTool, LLMConfig, UserConnector
+from app.security.encryption import FERNET_KEY_ENV, FERNET_KEYS_ENV, get_fernet_keys
+
+logger = logging.getLogger(__name__)
+
+# Fernet instances of a worker process: the primary key alone, and all keys
+_primary: Optional[Fernet] = None
+_fernet: Optional[MultiFernet] = None
+
+
+def _init_worker(keys: List[bytes]) -> None:
+    """Build the worker's Fernet instances once per process."""
+    global _primary, _fernet
+    _primary = Fernet(keys[0])
+    _fernet = MultiFernet([Fernet(key) for key in keys])
+
+
+def _rotate(tokens: List[str]) -> Tuple[List[Optional[str]], int]:
+    """
+    Re-encrypt tokens under the primary key (runs in a worker process).
+
+    Returns:
+        The new token for each input, or None where the token is already
+        under the primary key or cannot be decrypted; and the number of
+        tokens that could not be decrypted with any key
+    """
+    rotated: List[Optional[str]] = []
+    unreadable = 0
+    for token in tokens:
+        data = token.encode()
+        try:
+            _primary.decrypt(data)
+            rotated.append(None)
+            continue
+        except InvalidToken:
+            pass
+        try:
+            rotated.append(_fernet.rotate(data).decode())
+        except InvalidToken:
+            rotated.append(None)
+            unreadable += 1
+    return rotated, unreadable
+
+
+class ReencryptBackfill(Backfill):
+    """Re-encrypt one encrypted column of a table."""
+
+    def __init__(self, table: Table, column_name: str, pool: Executor, workers: int, fingerprint: str):
+        self.table = table
+        self.column = table.c[column_name]
+        self.key_column = table.c.id
+        self.name = f"reencrypt_{table.name}_{column_name}_{fingerprint}"
+        self.pool = pool
+        self.workers = workers
+        self.unreadable = 0
+
+    def parse_key(self, value: str):
+        return self.key_column.type.python_type(value)
+
+    def _changes(self, conn: Connection, lower, upper) -> List[dict]:
+        """Read the batch's values and re-encrypt them on the pool."""
+        rows = conn.execute(
+            select(self.key_column, self.table.c.user_id, self.column).where(
+                self.key_range(lower, upper),
+                self.column.is_not(None),
+                self.column != ""
+            )
+        ).all()
+        if not rows:
+            return []
+
+        tokens = [row._mapping[self.column.name] for row in rows]
+        size = -(-len(tokens) // self.workers)
+        rotated: List[Optional[str]] = []
+        for chunk_rotated, unreadable in self.pool.map(_rotate, [tokens[i:i + size] for i in range(0, len(tokens), size)]):
+            rotated.extend(chunk_rotated)
+            self.unreadable += unreadable
+
+        return [
+            {"row": row._mapping, "old": old, "new": new}
+            for row, old, new in zip(rows, tokens, rotated)
+            if new is not None
+        ]
+
+    def apply(self, conn: Connection, lower, upper) -> int:
+        changes = self._changes(conn, lower, upper)
+        if not changes:
+            return 0
+
+        # Only overwrite values nobody has changed since they were read
+        result = conn.execute(
+            update(self.table)
+            .where(self.key_column == bindparam("b_id"), self.column == bindparam("b_old"))
+            .values({self.column.name: bindparam("b_new")}),
+            [{"b_id": c["row"]["id"], "b_old": c["old"], "b_new": c["new"]} for c in changes]
+        )
+        return result.rowcount
+
+    def pending(self, conn: Connection, lower, upper) -> int:
+        return len(self._changes(conn, lower, upper))
+
+
+class ApiKeyReencryptBackfill(ReencryptBackfill):
+    """Re-encrypt API keys together with the LLM configurations copied from them."""
+
+    def apply(self, conn: Connection, lower, upper) -> int:
+        changes = self._changes(conn, lower, upper)
+        if not changes:
+            return 0
+
+        params = [
+            {"b_id": c["row"]["id"], "b_user_id": c["row"]["user_id"], "b_old": c["old"], "b_new": c["new"]}
+            for c in changes
+        ]
+        llm_configs = LLMConfig.__table__
+        conn.execute(
+            update(llm_configs)
+            .where(and_(
+                llm_configs.c.user_id == bindparam("b_user_id"),
+                llm_configs.c.encrypted_credentials == bindparam("b_old")
+            ))
+            .values(encrypted_credentials=bindparam("b_new")),
+            params
+        )
+        result = conn.execute(
+            update(self.table)
+            .where(self.key_column == bindparam("b_id"), self.column == bindparam("b_old"))
+            .values({self.column.name: bindparam("b_new")}),
+            params
+        )
+        return result.rowcount
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    parser = argparse.ArgumentParser(description="Re-encrypt stored secrets under the primary Fernet key")
+    parser.add_argument("--dry-run", action="store_true", help="Count values needing re-encryption without writing")
+    parser.add_argument("--batch-size", type=int, default=None, help="Rows per batch (default 1000)")
+    parser.add_argument("--restart", action="store_true", help="Ignore saved progress and start from the beginning")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    args = parser.parse_args()
+
+    # A generated key would not match the API's, and workers would each generate their own
+    if not (os.getenv(FERNET_KEYS_ENV) or os.getenv(FERNET_KEY_ENV)):
+        logger.error(f"Set {FERNET_KEYS_ENV} (or {FERNET_KEY_ENV}) to the keys the API uses")
+        return 1
+
+    keys = get_fernet_keys()
+    fingerprint = hashlib.sha256(keys[0]).hexdigest()[:12]
+    logger.info(f"Re-encrypting under primary key {fingerprint} ({len(keys)} key(s) configured)")
+
+    unreadable = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(keys,)) as pool:
+        # API keys first, so their LLM configurations are rotated with them
+        backfills = [
+            ApiKeyReencryptBackfill(APIKey.__table__, "encrypted_key", pool, args.workers, fingerprint),
+            ReencryptBackfill(LLMConfig.__table__, "encrypted_credentials", pool, args.workers, fingerprint),
+            ReencryptBackfill(UserConnector.__table__, "encrypted_credentials", pool, args.workers, fingerprint),
+            ReencryptBackfill(ConfiguredTool.__table__, "encrypted_credentials", pool, args.workers, fingerprint),
+        ]
+        for backfill in backfills:
+            run_backfill(backfill, engine, dry_run=args.dry_run, restart=args.restart, batch_size=args.batch_size)
+            if backfill.unreadable:
+                logger.warning(f"{backfill.name}: {backfill.unreadable} values could not be decrypted with any configured key")
+            unreadable += backfill.unreadable
+
+    engine.dispose()
+    return 1 if unreadable else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
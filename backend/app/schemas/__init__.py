@@ -3,7 +3,11 @@ Pydantic schema models for API request/response validation.
 """
 
 from .auth_schemas import (
-    Token, TokenData
+    Token, TokenData, RefreshRequest
+)
+
+from .access_token_schemas import (
+    AccessTokenCreate, AccessTokenResponse, AccessTokenCreateResponse, AccessTokenListResponse
 )
 
 from .setup_schemas import (
@@ -23,17 +27,23 @@ from .connector_schemas import (
     ConnectorStatus, ConnectorType
 )
 
+from .bulk_schemas import (
+    BulkFormat, BulkKind, BulkConflictMode, BulkImportResponse
+)
+
 from .chat_schemas import (
     MessageRole, ChatMessageRequest, ChatMessageResponse, 
     ChatHistoryResponse, ToolCallRequest, ToolCallResponse
 )
 
 __all__ = [
-    'Token', 'TokenData',
+    'Token', 'TokenData', 'RefreshRequest',
+    'AccessTokenCreate', 'AccessTokenResponse', 'AccessTokenCreateResponse', 'AccessTokenListResponse',
     'SetupRequest', 'SetupResponse',
     'AgentCreate', 'AgentResponse', 'AgentUpdate', 'AgentListResponse',
     'LLMConfigResponse', 'LLMConfigListResponse',
     'ConnectorBase', 'ConnectorRead', 'ConnectorList', 'ConnectorStatus', 'ConnectorType',
+    'BulkFormat', 'BulkKind', 'BulkConflictMode', 'BulkImportResponse',
     'MessageRole', 'ChatMessageRequest', 'ChatMessageResponse', 
     'ChatHistoryResponse', 'ToolCallRequest', 'ToolCallResponse'
 ] 
\ No newline at end of file
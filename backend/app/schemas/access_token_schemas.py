@@ -0,0 +1,35 @@
+from pydantic import BaseModel, Field, UUID4
+from typing import Optional, List
+from datetime import datetime
+
+
+class AccessTokenCreate(BaseModel):
+    """Schema for creating an access token."""
+    name: str = Field(..., min_length=1, max_length=100, description="Label for the token (e.g., 'CI pipeline')")
+    expires_in_days: Optional[int] = Field(None, ge=1, description="Days until the token expires; omit for no expiry")
+
+
+class AccessTokenResponse(BaseModel):
+    """Schema for access token information returned to clients. Never includes the secret."""
+    id: UUID4
+    name: str
+    prefix: str
+    created_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    revoked_at: Optional[datetime] = None
+
+    class Config:
+        """Pydantic config for the AccessToken model."""
+        from_attributes = True
+
+
+class AccessTokenCreateResponse(AccessTokenResponse):
+    """Schema for a newly created access token, including the token itself."""
+    token: str = Field(..., description="The access token; it is shown only once")
+
+
+class AccessTokenListResponse(BaseModel):
+    """Schema for a list of access tokens."""
+    tokens: List[AccessTokenResponse]
+    count: int
+    next_cursor: Optional[str] = None
@@ -35,4 +35,5 @@ class AgentResponse(BaseModel):
 class AgentListResponse(BaseModel):
     """Schema for a list of agents."""
     agents: List[AgentResponse]
-    count: int 
\ No newline at end of file
+    count: int
+    next_cursor: Optional[str] = None 
\ No newline at end of file
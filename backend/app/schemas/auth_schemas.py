@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel, Field
 
 
@@ -9,6 +10,12 @@ class Token(BaseModel):
     """
     access_token: str = Field(..., description="JWT access token")
     token_type: str = Field(..., description="Token type (bearer)")
+    refresh_token: Optional[str] = Field(None, description="JWT refresh token, exchanged at /auth/refresh for a new token pair")
+
+
+class RefreshRequest(BaseModel):
+    """Schema for exchanging or revoking a refresh token."""
+    refresh_token: str = Field(..., description="JWT refresh token")
 
 
 class TokenData(BaseModel):
@@ -0,0 +1,65 @@
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, Field, field_validator
+from enum import Enum
+
+
+class BulkFormat(str, Enum):
+    """Serialization format for bulk import/export."""
+    NDJSON = "ndjson"  # One JSON object per line, with a "type" field
+    CSV = "csv"        # One record kind per file
+
+
+class BulkKind(str, Enum):
+    """Kind of record in a bulk file."""
+    AGENTS = "agents"
+    CONNECTORS = "connectors"
+    LINKS = "links"
+
+
+class BulkConflictMode(str, Enum):
+    """What to do with imported agents or connectors whose name already exists."""
+    SKIP = "skip"    # Keep the existing row and count the record as skipped
+    ERROR = "error"  # Reject the whole import
+
+
+class AgentRecord(BaseModel):
+    """An agent in a bulk file. The LLM configuration is referenced by provider and model."""
+    name: str = Field(..., min_length=1, max_length=100)
+    description: Optional[str] = None
+    system_prompt: Optional[str] = None
+    llm_provider: Optional[str] = None
+    llm_model: Optional[str] = None
+
+    @field_validator("llm_provider")
+    @classmethod
+    def lowercase_provider(cls, value: Optional[str]) -> Optional[str]:
+        """Providers are stored in lower case."""
+        return value.lower() if value else None
+
+
+class ConnectorRecord(BaseModel):
+    """A connector instance in a bulk file. The connector type is referenced by catalog name."""
+    name: str = Field(..., min_length=1)
+    connector_type: str = Field(..., min_length=1)
+    config_data: Optional[Dict[str, Any]] = None
+
+
+class LinkRecord(BaseModel):
+    """An agent-connector link in a bulk file, referencing both sides by name."""
+    agent_name: str = Field(..., min_length=1)
+    connector_name: str = Field(..., min_length=1)
+
+
+class BulkImportCounts(BaseModel):
+    """Outcome of a bulk import for one kind of record."""
+    received: int = 0
+    inserted: int = 0
+    skipped: int = 0
+
+
+class BulkImportResponse(BaseModel):
+    """Result of a bulk import."""
+    agents: BulkImportCounts
+    connectors: BulkImportCounts
+    links: BulkImportCounts
+    dry_run: bool = Field(False, description="True if nothing was written")
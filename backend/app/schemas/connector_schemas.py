@@ -44,7 +44,8 @@ class ConnectorRead(ConnectorBase):
 class ConnectorList(BaseModel):
     """Model for list of connectors response."""
     connectors: List[ConnectorRead] = Field(..., description="List of available connectors")
-    count: int = Field(..., description="Total number of connectors")
+    count: int = Field(..., description="Number of connectors in this page")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if there is one")
 
 
 class UserConnectorBase(BaseModel):
@@ -81,4 +82,5 @@ class UserConnectorRead(UserConnectorBase):
 class UserConnectorList(BaseModel):
     """Model for list of user connectors response."""
     connectors: List[UserConnectorRead] = Field(..., description="List of user's configured connectors")
-    count: int = Field(..., description="Total number of user's connectors") 
\ No newline at end of file
+    count: int = Field(..., description="Number of user's connectors in this page")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if there is one") 
\ No newline at end of file
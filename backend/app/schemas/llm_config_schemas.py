@@ -20,4 +20,5 @@ class LLMConfigResponse(BaseModel):
 class LLMConfigListResponse(BaseModel):
     """Schema for a list of LLM configurations."""
     configs: List[LLMConfigResponse]
-    count: int 
\ No newline at end of file
+    count: int
+    next_cursor: Optional[str] = None 
\ No newline at end of file
@@ -4,15 +4,22 @@ Security package for AgentBase API.
 Contains utilities for password hashing, JWT authentication, and other security-related functionality.
 """
 
-from .passwords import hash_password, verify_password
-from .encryption import encrypt_data, decrypt_data
+from .passwords import hash_password, verify_password, hash_password_async, verify_and_update_password
+from .encryption import SECRET_MASK, encrypt_data, decrypt_data, mask_secret
+from .credential_cache import decrypt_credentials, invalidate_credentials
 from .tokens import create_access_token, decode_access_token, get_token_data
 
 __all__ = [
     "hash_password", 
     "verify_password",
+    "hash_password_async",
+    "verify_and_update_password",
     "encrypt_data",
     "decrypt_data",
+    "mask_secret",
+    "SECRET_MASK",
+    "decrypt_credentials",
+    "invalidate_credentials",
     "create_access_token",
     "decode_access_token",
     "get_token_data"
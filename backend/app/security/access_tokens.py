@@ -0,0 +1,169 @@
+"""
+AgentBase access tokens for programmatic clients.
+
+A token looks like ``abt_<prefix>_<secret>``. The prefix is stored in clear and
+indexed, so a token is found with one lookup; the secret is stored only as an
+HMAC-SHA256 keyed with a server-side key. A fast keyed hash is enough because
+the secret is 256 random bits, not a user-chosen password, so there is nothing
+for a slow hash like bcrypt to protect against.
+
+Token rows are cached by prefix for a short time. The cache holds the stored
+hash, never a verification result, so every request still checks its secret.
+Prefixes that match no row are remembered briefly too, so a client sending
+made-up tokens does not cost a database lookup per request.
+"""
+
+import hashlib
+import hmac
+import os
+import re
+import secrets
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+from uuid import UUID
+
+from ..ttl_cache import TTLCache
+from .tokens import SECRET_KEY
+
+# Marks a bearer token as an access token rather than a JWT
+TOKEN_PREFIX = "abt_"
+
+# Key for hashing token secrets; defaults to one derived from SECRET_KEY.
+# Changing it invalidates all access tokens.
+ACCESS_TOKEN_HMAC_KEY = os.getenv("ACCESS_TOKEN_HMAC_KEY") or hmac.new(
+    SECRET_KEY.encode(), b"agentbase-access-token", hashlib.sha256
+).hexdigest()
+
+# Seconds a token row is cached, and so how long a revocation can take to
+# reach other worker processes (0 disables the cache)
+ACCESS_TOKEN_CACHE_TTL = int(os.getenv("ACCESS_TOKEN_CACHE_TTL", "60"))
+
+# Maximum token rows cached per process
+ACCESS_TOKEN_CACHE_SIZE = int(os.getenv("ACCESS_TOKEN_CACHE_SIZE", "10000"))
+
+# Seconds a prefix that matches no token is remembered as unknown (0 disables)
+ACCESS_TOKEN_NEGATIVE_CACHE_TTL = int(os.getenv("ACCESS_TOKEN_NEGATIVE_CACHE_TTL", "30"))
+
+# Prefixes are 16 lowercase hex characters (see generate_access_token)
+_PREFIX_PATTERN = re.compile(r"[0-9a-f]{16}")
+
+
+@dataclass(frozen=True)
+class CachedAccessToken:
+    """The parts of an access token row needed to authenticate a request."""
+    id: UUID
+    user_id: UUID
+    secret_hash: str
+    expires_at: Optional[datetime]
+    revoked: bool
+
+
+_cache: TTLCache[str, CachedAccessToken] = TTLCache(ACCESS_TOKEN_CACHE_SIZE, ACCESS_TOKEN_CACHE_TTL)
+_unknown: TTLCache[str, bool] = TTLCache(ACCESS_TOKEN_CACHE_SIZE, ACCESS_TOKEN_NEGATIVE_CACHE_TTL)
+
+
+def is_access_token(token: str) -> bool:
+    """Check whether a bearer token is an access token rather than a JWT."""
+    return token.startswith(TOKEN_PREFIX)
+
+
+def hash_token_secret(secret: str) -> str:
+    """
+    Hash the secret part of an access token for storage.
+
+    Args:
+        secret: Secret part of the token
+
+    Returns:
+        Hex HMAC-SHA256 of the secret
+    """
+    return hmac.new(ACCESS_TOKEN_HMAC_KEY.encode(), secret.encode(), hashlib.sha256).hexdigest()
+
+
+def generate_access_token() -> Tuple[str, str, str]:
+    """
+    Generate a new access token.
+
+    Returns:
+        Tuple of (full token to show the user once, prefix, secret hash)
+    """
+    prefix = secrets.token_hex(8)
+    secret = secrets.token_urlsafe(32)
+    return f"{TOKEN_PREFIX}{prefix}_{secret}", prefix, hash_token_secret(secret)
+
+
+def split_access_token(token: str) -> Optional[Tuple[str, str]]:
+    """
+    Split an access token into its prefix and secret.
+
+    Args:
+        token: Full access token
+
+    Returns:
+        Tuple of (prefix, secret), or None if the token is malformed
+    """
+    prefix, sep, secret = token[len(TOKEN_PREFIX):].partition("_")
+    if not sep or not secret or not _PREFIX_PATTERN.fullmatch(prefix):
+        return None
+    return prefix, secret
+
+
+def secret_matches(secret: str, secret_hash: str) -> bool:
+    """Compare a presented secret with a stored hash in constant time."""
+    return hmac.compare_digest(hash_token_secret(secret), secret_hash)
+
+
+def get_cached_token(prefix: str) -> Optional[CachedAccessToken]:
+    """Get a cached token row by prefix."""
+    if ACCESS_TOKEN_CACHE_TTL <= 0:
+        return None
+    return _cache.get(prefix)
+
+
+def cache_token(prefix: str, token: CachedAccessToken) -> None:
+    """Cache a token row loaded from the database."""
+    if ACCESS_TOKEN_CACHE_TTL > 0:
+        _cache.set(prefix, token)
+
+
+def verify_cached_token(token: str) -> Optional[CachedAccessToken]:
+    """
+    Verify an access token against the cache only, without a database lookup.
+
+    Args:
+        token: Full access token
+
+    Returns:
+        The cached token row if the token is cached, its secret matches and
+        it is neither revoked nor expired; None otherwise (including when it
+        is simply not cached yet)
+    """
+    parts = split_access_token(token)
+    if parts is None:
+        return None
+    cached = get_cached_token(parts[0])
+    if cached is None or cached.revoked or not secret_matches(parts[1], cached.secret_hash):
+        return None
+    if cached.expires_at is not None:
+        expires_at = cached.expires_at if cached.expires_at.tzinfo else cached.expires_at.replace(tzinfo=timezone.utc)
+        if expires_at <= datetime.now(timezone.utc):
+            return None
+    return cached
+
+
+def is_known_unknown(prefix: str) -> bool:
+    """Check whether a prefix was recently found to match no token."""
+    return ACCESS_TOKEN_NEGATIVE_CACHE_TTL > 0 and _unknown.get(prefix) is not None
+
+
+def cache_unknown(prefix: str) -> None:
+    """Remember that a prefix matches no token."""
+    if ACCESS_TOKEN_NEGATIVE_CACHE_TTL > 0:
+        _unknown.set(prefix, True)
+
+
+def invalidate_token(prefix: str) -> None:
+    """Drop cached state for a prefix, e.g. after revoking or issuing its token."""
+    _cache.delete(prefix)
+    _unknown.delete(prefix)
@@ -0,0 +1,74 @@
+"""
+Short-lived cache of decrypted credentials.
+
+The chat path decrypts the agent's LLM credentials on every message. Decrypted
+values are kept for a short time, keyed by a hash of the ciphertext so the
+cache never holds the ciphertext itself. Values are stored as bytearrays and
+overwritten with zeros when they expire, are evicted or are invalidated. The
+str handed to the caller is an ordinary (immutable) Python string and is not
+zeroized.
+
+Entries are only reachable through a ciphertext that is still stored in the
+database, so a deleted key cannot be used from another worker's cache; deleting
+a key still invalidates it locally so the plaintext does not linger.
+"""
+
+import hashlib
+import os
+from typing import Optional
+
+from ..ttl_cache import TTLCache
+from .encryption import decrypt_data
+
+# Seconds a decrypted credential is kept (0 disables the cache)
+CREDENTIAL_CACHE_TTL = int(os.getenv("CREDENTIAL_CACHE_TTL", "300"))
+
+# Maximum decrypted credentials kept per process
+CREDENTIAL_CACHE_SIZE = int(os.getenv("CREDENTIAL_CACHE_SIZE", "1000"))
+
+
+def _zeroize(value: bytearray) -> None:
+    """Overwrite a cached plaintext in place."""
+    value[:] = b"\x00" * len(value)
+
+
+_cache: TTLCache[bytes, bytearray] = TTLCache(CREDENTIAL_CACHE_SIZE, CREDENTIAL_CACHE_TTL, on_evict=_zeroize)
+
+
+def _cache_key(encrypted_data: str) -> bytes:
+    return hashlib.sha256(encrypted_data.encode()).digest()
+
+
+def decrypt_credentials(encrypted_data: str) -> Optional[str]:
+    """
+    Decrypt credentials, reusing a recent decryption of the same ciphertext.
+
+    Args:
+        encrypted_data: Encrypted data as a URL-safe base64 encoded string
+
+    Returns:
+        Decrypted data as a string, or None if decryption fails
+    """
+    if not encrypted_data or CREDENTIAL_CACHE_TTL <= 0:
+        return decrypt_data(encrypted_data)
+
+    key = _cache_key(encrypted_data)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached.decode()
+
+    decrypted = decrypt_data(encrypted_data)
+    if decrypted is not None:
+        _cache.set(key, bytearray(decrypted.encode()))
+    return decrypted
+
+
+def invalidate_credentials(encrypted_data: Optional[str]) -> None:
+    """
+    Drop and zeroize the cached plaintext of a ciphertext, if any.
+
+    Args:
+        encrypted_data: Encrypted data whose plaintext should be forgotten
+    """
+    if encrypted_data:
+        _cache.delete(_cache_key(encrypted_data))
@@ -1,23 +1,37 @@
 import os
 import base64
 import logging
-from typing import Optional
-from cryptography.fernet import Fernet, InvalidToken
+from typing import List, Optional
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 
 logger = logging.getLogger(__name__)
 
 # Environment variable name for the Fernet key
 FERNET_KEY_ENV = "AGENTBASE_FERNET_KEY"
 
+# Environment variable name for a comma-separated list of Fernet keys, newest
+# first. New data is encrypted with the first key; all keys can decrypt. Takes
+# precedence over AGENTBASE_FERNET_KEY and is how keys are rotated: prepend the
+# new key, deploy, run `python -m app.reencrypt`, then drop the old key.
+FERNET_KEYS_ENV = "AGENTBASE_FERNET_KEYS"
+
+# Display form of secrets too short to show any of their characters
+SECRET_MASK = "••••••••"
+
 # Global variable to cache the key within the same process
 _CACHED_KEY = None
 
+# Fernet instance built from all configured keys, cached for the process
+_CACHED_FERNET: Optional[MultiFernet] = None
+
 
 def get_fernet_key() -> bytes:
     """
     Get the Fernet encryption key from environment variable.
     If it doesn't exist, generate a new one.
     
+    When several keys are configured, this is the primary (encrypting) key.
+    
     Returns:
         bytes: The Fernet key
     """
@@ -26,10 +40,11 @@ def get_fernet_key() -> bytes:
     # If we already have a cached key, use it
     if _CACHED_KEY is not None:
         return _CACHED_KEY
-        
-    key = os.getenv(FERNET_KEY_ENV)
     
-    if key is None:
+    keys = os.getenv(FERNET_KEYS_ENV)
+    key = keys.split(",")[0].strip() if keys else os.getenv(FERNET_KEY_ENV)
+    
+    if not key:
         # Generate a new key - this should normally happen only once during initial setup
         # In production, this key should be stored securely and persisted across container restarts
         logger.warning(
@@ -48,6 +63,35 @@ def get_fernet_key() -> bytes:
     return key
 
 
+def get_fernet_keys() -> List[bytes]:
+    """
+    Get all configured Fernet keys, primary key first.
+    
+    Returns:
+        List[bytes]: The Fernet keys
+    """
+    keys = os.getenv(FERNET_KEYS_ENV)
+    if not keys:
+        return [get_fernet_key()]
+    return [get_fernet_key()] + [key.strip().encode() for key in keys.split(",")[1:] if key.strip()]
+
+
+def get_fernet() -> MultiFernet:
+    """
+    Get the process-wide Fernet instance for all configured keys.
+    
+    Encrypts with the primary key and decrypts with any key, so data written
+    under an older key stays readable while it is being re-encrypted.
+    
+    Returns:
+        MultiFernet: The cached Fernet instance
+    """
+    global _CACHED_FERNET
+    if _CACHED_FERNET is None:
+        _CACHED_FERNET = MultiFernet([Fernet(key) for key in get_fernet_keys()])
+    return _CACHED_FERNET
+
+
 def encrypt_data(data: str) -> str:
     """
     Encrypt sensitive data using Fernet symmetric encryption.
@@ -61,9 +105,7 @@ def encrypt_data(data: str) -> str:
     if not data:
         return ""
         
-    key = get_fernet_key()
-    f = Fernet(key)
-    encrypted_data = f.encrypt(data.encode())
+    encrypted_data = get_fernet().encrypt(data.encode())
     
     # Return as a string for easy storage in the database
     return encrypted_data.decode()
@@ -82,8 +124,7 @@ def decrypt_data(encrypted_data: str) -> Optional[str]:
     if not encrypted_data:
         return None
         
-    key = get_fernet_key()
-    f = Fernet(key)
+    f = get_fernet()
     
     try:
         # Convert from string to bytes for decryption
@@ -97,4 +138,22 @@ def decrypt_data(encrypted_data: str) -> Optional[str]:
         return None
     except Exception as e:
         logger.error(f"Unexpected error during decryption: {str(e)}")
-        return None 
\ No newline at end of file
+        return None
+
+
+def mask_secret(secret: str) -> str:
+    """
+    Build the display form of a secret, showing its first and last 4 characters.
+    
+    The result is stored alongside the encrypted secret, so it must never
+    contain the whole secret.
+    
+    Args:
+        secret: Plain text secret
+        
+    Returns:
+        Masked secret; secrets of 8 characters or fewer give SECRET_MASK
+    """
+    if len(secret) > 8:
+        return f"{secret[:4]}{'•' * (len(secret) - 8)}{secret[-4:]}"
+    return SECRET_MASK
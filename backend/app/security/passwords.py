@@ -1,17 +1,50 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
 from passlib.context import CryptContext
 
-# Initialize password context with bcrypt as the hashing algorithm
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt cost factor (log2 of the key-expansion rounds) for new hashes. Stored
+# hashes with a different cost are rehashed at this cost on the next login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Threads available for hashing; bcrypt releases the GIL, so this is also the
+# number of hashes computed in parallel. Further requests queue for a thread.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Initialize password context with bcrypt as the hashing algorithm. Pinning
+# min and max rounds to the configured cost makes any other cost "need update".
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Get the password hashing thread pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+    return _executor
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a plain text password against a hashed password.
-    
+
+    Blocks for the full bcrypt cost; async code should use
+    verify_and_update_password instead.
+
     Args:
         plain_password: The plain text password to verify
         hashed_password: The hashed password to verify against
-        
+
     Returns:
         True if the password matches, False otherwise
     """
@@ -21,11 +54,47 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def hash_password(password: str) -> str:
     """
     Hash a password for storage.
-    
+
+    Blocks for the full bcrypt cost; async code should use
+    hash_password_async instead.
+
+    Args:
+        password: The plain text password to hash
+
+    Returns:
+        The hashed password
+    """
+    return pwd_context.hash(password)
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password for storage on the hashing thread pool.
+
     Args:
         password: The plain text password to hash
-        
+
     Returns:
         The hashed password
     """
-    return pwd_context.hash(password) 
\ No newline at end of file
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), pwd_context.hash, password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password on the hashing thread pool, rehashing it if the stored
+    hash no longer matches the configured policy.
+
+    Args:
+        plain_password: The plain text password to verify
+        hashed_password: The hashed password to verify against
+
+    Returns:
+        Tuple of whether the password matches and, if it matches and the
+        stored hash is outdated, a replacement hash (otherwise None)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_executor(), pwd_context.verify_and_update, plain_password, hashed_password
+    )
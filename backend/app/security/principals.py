@@ -0,0 +1,119 @@
+"""
+Cache of authenticated principals.
+
+get_current_user runs on every authenticated request, but only needs the
+user's ID and status flags. Those are cached by user ID so most requests skip
+the users lookup. The cache lives in Redis when REDIS_URL is set (shared by all
+workers, so an invalidation takes effect everywhere at once) and in a per-process
+LRU otherwise. Code that changes is_active or is_superuser, or deletes a user,
+must call invalidate_principal after committing; without Redis, other worker
+processes pick up the change when their entry expires.
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+
+from redis.exceptions import RedisError
+
+from ..db.redis_client import get_redis
+from ..ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cached principal is trusted (0 disables the cache)
+PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+
+# Maximum principals kept by the in-process cache
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+
+# Redis key prefix for cached principals
+_REDIS_PREFIX = "principal:"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as seen by request dependencies."""
+    id: UUID
+    is_active: bool
+    is_superuser: bool
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        """Build a principal from a User row."""
+        return cls(id=user.id, is_active=user.is_active, is_superuser=user.is_superuser)
+
+
+_local_cache: TTLCache[UUID, Principal] = TTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL)
+
+
+async def get_cached_principal(user_id: UUID) -> Optional[Principal]:
+    """
+    Look up a cached principal.
+
+    Redis errors are logged and treated as a miss, so an unavailable Redis only
+    costs the database lookup the cache would have saved.
+
+    Args:
+        user_id: User's ID
+
+    Returns:
+        The cached principal, or None on a miss
+    """
+    if PRINCIPAL_CACHE_TTL <= 0:
+        return None
+    client = get_redis()
+    if client is None:
+        return _local_cache.get(user_id)
+    try:
+        raw = await client.get(f"{_REDIS_PREFIX}{user_id}")
+    except RedisError as e:
+        logger.warning(f"Principal cache read failed: {e}")
+        return None
+    if raw is None:
+        return None
+    data = json.loads(raw)
+    return Principal(id=user_id, is_active=data["is_active"], is_superuser=data["is_superuser"])
+
+
+async def cache_principal(principal: Principal) -> None:
+    """
+    Store a principal loaded from the database.
+
+    Args:
+        principal: Principal to cache
+    """
+    if PRINCIPAL_CACHE_TTL <= 0:
+        return
+    client = get_redis()
+    if client is None:
+        _local_cache.set(principal.id, principal)
+        return
+    value = json.dumps({"is_active": principal.is_active, "is_superuser": principal.is_superuser})
+    try:
+        await client.set(f"{_REDIS_PREFIX}{principal.id}", value, ex=PRINCIPAL_CACHE_TTL)
+    except RedisError as e:
+        logger.warning(f"Principal cache write failed: {e}")
+
+
+async def invalidate_principal(user_id: UUID) -> None:
+    """
+    Drop a user's cached principal so the next request reloads it.
+
+    Call after committing any change to a user's is_active or is_superuser,
+    or deleting the user.
+
+    Args:
+        user_id: User's ID
+    """
+    _local_cache.delete(user_id)
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        await client.delete(f"{_REDIS_PREFIX}{user_id}")
+    except RedisError as e:
+        logger.error(f"Principal cache invalidation failed for user {user_id}: {e}")
@@ -0,0 +1,186 @@
+"""
+Revocation list for JWTs, by ``jti`` claim.
+
+With Redis configured, revoked IDs live in a sorted set scored by the token's
+expiry, shared by all workers. Each worker keeps a bloom filter of that set,
+rebuilt every REVOCATION_REFRESH_SECONDS by a background task (started in the
+app lifespan), so checking a token that is not revoked (nearly all of them)
+needs no network round-trip and no request ever pays for a rebuild; only
+filter hits are confirmed against Redis. A token revoked by another worker is
+therefore honoured here within REVOCATION_REFRESH_SECONDS. Until the first
+rebuild, or if rebuilds keep failing, every check goes to Redis. Without
+Redis, the list is kept in process memory and only covers the worker that
+revoked the token.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+from redis.exceptions import RedisError
+
+from ..db.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Seconds between rebuilds of each worker's bloom filter from Redis
+REVOCATION_REFRESH_SECONDS = float(os.getenv("REVOCATION_REFRESH_SECONDS", "10"))
+
+# Target false-positive rate of the bloom filter (hits are confirmed in Redis)
+REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", "0.001"))
+
+# Redis sorted set of revoked token IDs, scored by token expiry (epoch seconds)
+_REDIS_KEY = "revoked_jtis"
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings, sized for an expected item count."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # Double hashing: position i is h1 + i * h2
+        digest = hashlib.sha256(item.encode()).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationList:
+    """Revoked token IDs, with a per-worker bloom filter in front of Redis."""
+
+    def __init__(self, refresh_seconds: float = REVOCATION_REFRESH_SECONDS,
+                 error_rate: float = REVOCATION_BLOOM_ERROR_RATE):
+        self.refresh_seconds = refresh_seconds
+        self.error_rate = error_rate
+        self._bloom: Optional[BloomFilter] = None
+        self._refreshed_at = 0.0
+        # IDs this worker revoked while a rebuild was reading Redis
+        self._revoked_during_refresh: List[str] = []
+        self._task: Optional[asyncio.Task] = None
+        # Used instead of Redis when it is not configured: jti -> expiry
+        self._local: Dict[str, float] = {}
+
+    async def revoke(self, jti: str, expires_at: float) -> bool:
+        """
+        Revoke a token until it would have expired anyway.
+
+        Args:
+            jti: The token's ID claim
+            expires_at: The token's expiry, in epoch seconds
+
+        Returns:
+            True if this call revoked the token, False if it already was
+            (checked atomically, so single-use tokens can rely on it)
+
+        Raises:
+            RedisError: If Redis is configured but unavailable
+        """
+        client = get_redis()
+        if client is None:
+            now = time.time()
+            self._local = {k: v for k, v in self._local.items() if v > now}
+            if jti in self._local:
+                return False
+            self._local[jti] = expires_at
+            return True
+        added = await client.zadd(_REDIS_KEY, {jti: expires_at}, nx=True)
+        if self._bloom is not None:
+            self._bloom.add(jti)
+        self._revoked_during_refresh.append(jti)
+        return bool(added)
+
+    async def refresh(self) -> None:
+        """Rebuild the bloom filter from Redis, dropping expired entries."""
+        client = get_redis()
+        if client is None:
+            return
+        recent = self._revoked_during_refresh = []
+        try:
+            await client.zremrangebyscore(_REDIS_KEY, "-inf", time.time())
+            revoked = await client.zrange(_REDIS_KEY, 0, -1)
+        except RedisError as e:
+            logger.warning(f"Could not refresh the token revocation filter: {e}")
+            return
+        # Leave room for tokens this worker revokes before the next rebuild
+        bloom = BloomFilter(max(len(revoked) * 2, 1024), self.error_rate)
+        for jti in revoked:
+            bloom.add(jti)
+        for jti in recent:
+            bloom.add(jti)
+        self._bloom = bloom
+        self._refreshed_at = time.monotonic()
+
+    def _usable_bloom(self) -> Optional[BloomFilter]:
+        """The bloom filter, unless rebuilds have stopped succeeding."""
+        if self._bloom is None or time.monotonic() - self._refreshed_at > 3 * self.refresh_seconds:
+            return None
+        return self._bloom
+
+    async def is_revoked(self, jti: str) -> bool:
+        """
+        Check whether a token has been revoked.
+
+        Args:
+            jti: The token's ID claim
+
+        Returns:
+            True if the token is revoked. If Redis is unavailable, a token the
+            bloom filter flags is treated as revoked and any other token as not
+        """
+        client = get_redis()
+        if client is None:
+            expires_at = self._local.get(jti)
+            return expires_at is not None and expires_at > time.time()
+
+        bloom = self._usable_bloom()
+        if bloom is not None and jti not in bloom:
+            return False
+
+        try:
+            expires_at = await client.zscore(_REDIS_KEY, jti)
+        except RedisError as e:
+            logger.warning(f"Could not check token revocation: {e}")
+            return bloom is not None
+        return expires_at is not None and expires_at > time.time()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.exception(f"Unexpected error refreshing the token revocation filter: {e}")
+            await asyncio.sleep(self.refresh_seconds)
+
+    def start(self) -> None:
+        """Start rebuilding the bloom filter in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="token-revocation-refresh")
+
+    async def stop(self) -> None:
+        """Stop the background rebuilds."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+revocation_list = RevocationList()
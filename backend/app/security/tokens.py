@@ -3,6 +3,7 @@ from fastapi import HTTPException, status
 from datetime import datetime, timedelta
 import os
 import logging
+import uuid
 from typing import Optional, Dict, Any, Union
 
 logger = logging.getLogger(__name__)
@@ -19,6 +20,9 @@ ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 # Token expiration time (in minutes)
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
+# Refresh token expiration time (in days)
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+
 
 class TokenError(Exception):
     """Base exception for token-related errors."""
@@ -32,6 +36,8 @@ def create_access_token(
     """
     Create a new JWT access token.
     
+    Every token gets a unique ``jti`` claim so it can be revoked.
+    
     Args:
         data: Data to encode in the token (typically includes user ID)
         expires_delta: Custom expiration time, or None to use default
@@ -47,13 +53,29 @@ def create_access_token(
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    # Add expiration claim to payload
-    to_encode.update({"exp": expire})
+    # Add expiration and token ID claims to payload
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     
     # Encode and return the JWT
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+def create_refresh_token(user_id: str) -> str:
+    """
+    Create a new JWT refresh token.
+    
+    Args:
+        user_id: ID of the user the token is for
+        
+    Returns:
+        JWT refresh token as a string
+    """
+    return create_access_token(
+        data={"sub": user_id, "type": "refresh"},
+        expires_delta=timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    )
+
+
 def decode_access_token(token: str) -> Dict[str, Any]:
     """
     Decode and validate a JWT access token.
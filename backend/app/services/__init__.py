@@ -6,7 +6,7 @@ This package contains service modules that implement business logic for the appl
 
 # Import services for easy access
 from .connector_catalog import initialize_connector_registry, get_connector_registry
-from .user_service import get_user_by_email, get_user_by_id
+from .user_service import authenticate_user, get_user_by_email, get_user_by_id, update_user_status
 from .agent_service import (
     create_agent, 
     get_agent_by_id, 
@@ -30,12 +30,21 @@ from .user_connector_service import (
     unlink_connector_from_agent,
     get_agent_connectors
 )
+from .bulk_service import import_records, export_records
+from .access_token_service import (
+    issue_access_token,
+    get_access_tokens_by_user,
+    revoke_access_token,
+    authenticate_access_token
+)
 
 __all__ = [
     'initialize_connector_registry',
     'get_connector_registry',
+    'authenticate_user',
     'get_user_by_email',
     'get_user_by_id',
+    'update_user_status',
     'create_agent',
     'get_agent_by_id',
     'get_agents_by_user',
@@ -52,5 +61,11 @@ __all__ = [
     'delete_user_connector',
     'link_connector_to_agent',
     'unlink_connector_from_agent',
-    'get_agent_connectors'
+    'get_agent_connectors',
+    'import_records',
+    'export_records',
+    'issue_access_token',
+    'get_access_tokens_by_user',
+    'revoke_access_token',
+    'authenticate_access_token'
 ] 
\ No newline at end of file
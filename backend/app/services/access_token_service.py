@@ -0,0 +1,193 @@
+"""
+Access Token Service
+
+This module provides functions for issuing, listing, revoking and
+authenticating AgentBase access tokens.
+"""
+
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import AccessToken
+from ..security.access_tokens import (
+    CachedAccessToken,
+    cache_token,
+    cache_unknown,
+    generate_access_token,
+    get_cached_token,
+    invalidate_token,
+    is_known_unknown,
+    secret_matches,
+    split_access_token,
+)
+from .pagination import paginate, DEFAULT_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Fields access tokens can be sorted by in list requests
+ACCESS_TOKEN_SORT_COLUMNS = {"created_at": AccessToken.created_at, "name": AccessToken.name}
+
+
+def _is_expired(expires_at: Optional[datetime]) -> bool:
+    """Check an expiry time, treating naive datetimes as UTC."""
+    if expires_at is None:
+        return False
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at <= datetime.now(timezone.utc)
+
+
+async def issue_access_token(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    name: str,
+    expires_in_days: Optional[int] = None
+) -> Tuple[AccessToken, str]:
+    """
+    Create an access token for a user.
+
+    Args:
+        db: Database session
+        user_id: ID of the user the token acts as
+        name: Label for the token
+        expires_in_days: Days until the token expires, or None for no expiry
+
+    Returns:
+        Tuple of (the stored token row, the full token to return to the user once)
+    """
+    token, prefix, secret_hash = generate_access_token()
+    expires_at = None
+    if expires_in_days is not None:
+        expires_at = datetime.now(timezone.utc) + timedelta(days=expires_in_days)
+
+    access_token = AccessToken(
+        user_id=user_id,
+        name=name,
+        prefix=prefix,
+        secret_hash=secret_hash,
+        expires_at=expires_at
+    )
+    db.add(access_token)
+    await db.commit()
+    await db.refresh(access_token)
+    # In case a client probed this prefix before it existed
+    invalidate_token(prefix)
+
+    return access_token, token
+
+
+async def get_access_tokens_by_user(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    sort: str = "created_at",
+    include_revoked: bool = False
+) -> Tuple[List[AccessToken], Optional[str]]:
+    """
+    Get a page of a user's access tokens.
+
+    Args:
+        db: Database session
+        user_id: User ID to get tokens for
+        limit: Maximum number of tokens to return
+        cursor: Cursor from the previous page, if any
+        sort: Sort field ("created_at" or "name"), prefixed with "-" for descending
+        include_revoked: Whether to include revoked tokens
+
+    Returns:
+        Tuple of (access tokens, cursor for the next page or None)
+    """
+    query = select(AccessToken).where(AccessToken.user_id == user_id)
+    if not include_revoked:
+        query = query.where(AccessToken.revoked_at.is_(None))
+
+    return await paginate(db, query, AccessToken, sort, ACCESS_TOKEN_SORT_COLUMNS, limit, cursor)
+
+
+async def revoke_access_token(db: AsyncSession, user_id: uuid.UUID, token_id: uuid.UUID) -> AccessToken:
+    """
+    Revoke one of a user's access tokens.
+
+    Args:
+        db: Database session
+        user_id: User ID to verify ownership
+        token_id: ID of the token to revoke
+
+    Returns:
+        The revoked token
+
+    Raises:
+        HTTPException: If the token doesn't exist or isn't owned by the user
+    """
+    result = await db.execute(
+        select(AccessToken).where(AccessToken.id == token_id, AccessToken.user_id == user_id)
+    )
+    access_token = result.scalars().first()
+    if not access_token:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Access token not found or you don't have permission to revoke it"
+        )
+
+    if access_token.revoked_at is None:
+        access_token.revoked_at = datetime.now(timezone.utc)
+        await db.commit()
+        invalidate_token(access_token.prefix)
+        logger.info(f"Revoked access token {access_token.id} ({access_token.prefix}) of user {user_id}")
+
+    return access_token
+
+
+async def authenticate_access_token(db: AsyncSession, token: str) -> Optional[uuid.UUID]:
+    """
+    Resolve an access token to the ID of the user it acts as.
+
+    The token row is looked up by its prefix (from the cache when possible)
+    and the secret is compared against the stored HMAC in constant time.
+    Prefixes that match no row are cached as unknown for a short time.
+
+    Args:
+        db: Database session
+        token: Full access token from the Authorization header
+
+    Returns:
+        The user's ID, or None if the token is unknown, wrong, expired or revoked
+    """
+    parts = split_access_token(token)
+    if parts is None:
+        return None
+    prefix, secret = parts
+
+    cached = get_cached_token(prefix)
+    if cached is None:
+        if is_known_unknown(prefix):
+            return None
+        result = await db.execute(
+            lambda_stmt(lambda: select(AccessToken).where(AccessToken.prefix == prefix))
+        )
+        row = result.scalars().first()
+        if row is None:
+            cache_unknown(prefix)
+            return None
+        cached = CachedAccessToken(
+            id=row.id,
+            user_id=row.user_id,
+            secret_hash=row.secret_hash,
+            expires_at=row.expires_at,
+            revoked=row.revoked_at is not None
+        )
+        cache_token(prefix, cached)
+
+    if not secret_matches(secret, cached.secret_hash):
+        return None
+    if cached.revoked or _is_expired(cached.expires_at):
+        return None
+
+    return cached.user_id
@@ -1,14 +1,19 @@
-from typing import List, Optional, Union
+from typing import List, Optional, Tuple, Union
 from uuid import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 
 from ..models import Agent, LLMConfig, User
 from ..schemas.agent_schemas import AgentCreate, AgentUpdate
+from .pagination import paginate, DEFAULT_PAGE_SIZE
 
+# Fields agents can be sorted by in list requests
+AGENT_SORT_COLUMNS = {"created_at": Agent.created_at, "name": Agent.name}
 
-def get_agent_by_id(db: Session, agent_id: UUID, user_id: UUID) -> Optional[Agent]:
+
+async def get_agent_by_id(db: AsyncSession, agent_id: UUID, user_id: UUID) -> Optional[Agent]:
     """
     Get an agent by ID if it belongs to the specified user.
     
@@ -20,27 +25,49 @@ def get_agent_by_id(db: Session, agent_id: UUID, user_id: UUID) -> Optional[Agen
     Returns:
         Agent or None if not found or not owned by user
     """
-    return db.query(Agent).filter(
-        Agent.id == agent_id,
-        Agent.user_id == user_id
-    ).first()
+    result = await db.execute(
+        select(Agent).where(
+            Agent.id == agent_id,
+            Agent.user_id == user_id
+        )
+    )
+    return result.scalars().first()
 
 
-def get_agents_by_user(db: Session, user_id: UUID) -> List[Agent]:
+async def get_agents_by_user(
+    db: AsyncSession,
+    user_id: UUID,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    sort: str = "created_at",
+    name: Optional[str] = None,
+    llm_config_id: Optional[UUID] = None
+) -> Tuple[List[Agent], Optional[str]]:
     """
-    Get all agents belonging to a user.
+    Get a page of agents belonging to a user.
     
     Args:
         db: Database session
         user_id: ID of the user whose agents to retrieve
+        limit: Maximum number of agents to return
+        cursor: Cursor from the previous page, if any
+        sort: Sort field ("created_at" or "name"), prefixed with "-" for descending
+        name: Only include agents whose name contains this text (case-insensitive)
+        llm_config_id: Only include agents using this LLM configuration
         
     Returns:
-        List of agents owned by the user
+        Tuple of (agents owned by the user, cursor for the next page or None)
     """
-    return db.query(Agent).filter(Agent.user_id == user_id).all()
+    query = select(Agent).where(Agent.user_id == user_id)
+    if name:
+        query = query.where(Agent.name.ilike(f"%{name}%"))
+    if llm_config_id:
+        query = query.where(Agent.llm_config_id == llm_config_id)
+    
+    return await paginate(db, query, Agent, sort, AGENT_SORT_COLUMNS, limit, cursor)
 
 
-def create_agent(db: Session, agent_data: AgentCreate, user_id: UUID) -> Agent:
+async def create_agent(db: AsyncSession, agent_data: AgentCreate, user_id: UUID) -> Agent:
     """
     Create a new agent for a user.
     
@@ -57,10 +84,13 @@ def create_agent(db: Session, agent_data: AgentCreate, user_id: UUID) -> Agent:
     """
     # Check if LLM config exists and belongs to user if provided
     if agent_data.llm_config_id:
-        llm_config = db.query(LLMConfig).filter(
-            LLMConfig.id == agent_data.llm_config_id,
-            LLMConfig.user_id == user_id
-        ).first()
+        result = await db.execute(
+            select(LLMConfig).where(
+                LLMConfig.id == agent_data.llm_config_id,
+                LLMConfig.user_id == user_id
+            )
+        )
+        llm_config = result.scalars().first()
         
         if not llm_config:
             raise HTTPException(
@@ -80,18 +110,18 @@ def create_agent(db: Session, agent_data: AgentCreate, user_id: UUID) -> Agent:
     try:
         # Add to database
         db.add(new_agent)
-        db.commit()
-        db.refresh(new_agent)
+        await db.commit()
+        await db.refresh(new_agent)
         return new_agent
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="An agent with this name already exists"
         )
 
 
-def update_agent(db: Session, agent_id: UUID, user_id: UUID, agent_data: AgentUpdate) -> Agent:
+async def update_agent(db: AsyncSession, agent_id: UUID, user_id: UUID, agent_data: AgentUpdate) -> Agent:
     """
     Update an existing agent.
     
@@ -108,7 +138,7 @@ def update_agent(db: Session, agent_id: UUID, user_id: UUID, agent_data: AgentUp
         HTTPException: If agent update fails
     """
     # Get existing agent
-    agent = get_agent_by_id(db, agent_id, user_id)
+    agent = await get_agent_by_id(db, agent_id, user_id)
     if not agent:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -117,10 +147,13 @@ def update_agent(db: Session, agent_id: UUID, user_id: UUID, agent_data: AgentUp
     
     # Check if LLM config exists and belongs to user if provided
     if agent_data.llm_config_id:
-        llm_config = db.query(LLMConfig).filter(
-            LLMConfig.id == agent_data.llm_config_id,
-            LLMConfig.user_id == user_id
-        ).first()
+        result = await db.execute(
+            select(LLMConfig).where(
+                LLMConfig.id == agent_data.llm_config_id,
+                LLMConfig.user_id == user_id
+            )
+        )
+        llm_config = result.scalars().first()
         
         if not llm_config:
             raise HTTPException(
@@ -140,18 +173,18 @@ def update_agent(db: Session, agent_id: UUID, user_id: UUID, agent_data: AgentUp
     
     try:
         # Commit changes
-        db.commit()
-        db.refresh(agent)
+        await db.commit()
+        await db.refresh(agent)
         return agent
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="An agent with this name already exists"
         )
 
 
-def delete_agent(db: Session, agent_id: UUID, user_id: UUID) -> bool:
+async def delete_agent(db: AsyncSession, agent_id: UUID, user_id: UUID) -> bool:
     """
     Delete an agent.
     
@@ -167,7 +200,7 @@ def delete_agent(db: Session, agent_id: UUID, user_id: UUID) -> bool:
         HTTPException: If agent deletion fails
     """
     # Get existing agent
-    agent = get_agent_by_id(db, agent_id, user_id)
+    agent = await get_agent_by_id(db, agent_id, user_id)
     if not agent:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -175,6 +208,6 @@ def delete_agent(db: Session, agent_id: UUID, user_id: UUID) -> bool:
         )
     
     # Delete agent
-    db.delete(agent)
-    db.commit()
+    await db.delete(agent)
+    await db.commit()
     return True 
\ No newline at end of file
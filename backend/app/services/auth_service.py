@@ -0,0 +1,112 @@
+"""
+Auth Service
+
+This module issues, rotates and revokes JWT access/refresh token pairs.
+"""
+
+import logging
+from typing import Any, Dict
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..schemas.auth_schemas import Token
+from ..security.principals import Principal, cache_principal, get_cached_principal
+from ..security.revocation import revocation_list
+from ..security.tokens import create_access_token, create_refresh_token, get_token_data
+from .user_service import get_user_by_id
+
+logger = logging.getLogger(__name__)
+
+# Raised for any refresh token that cannot be exchanged
+invalid_refresh_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Invalid or expired refresh token",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+
+def issue_tokens(user_id: UUID) -> Token:
+    """
+    Create an access token and a refresh token for a user.
+
+    Args:
+        user_id: ID of the user to issue tokens for
+
+    Returns:
+        Token response with both tokens
+    """
+    access_token = create_access_token(data={"sub": str(user_id), "type": "access"})
+    refresh_token = create_refresh_token(str(user_id))
+    return Token(access_token=access_token, token_type="bearer", refresh_token=refresh_token)
+
+
+async def revoke_token(payload: Dict[str, Any]) -> bool:
+    """
+    Revoke a decoded JWT until it expires.
+
+    Args:
+        payload: Decoded token claims
+
+    Returns:
+        True if the token was revoked by this call, False if it was already
+        revoked or has no ID to revoke it by
+
+    Raises:
+        HTTPException: If the revocation list is unavailable
+    """
+    jti = payload.get("jti")
+    if not jti:
+        return False
+    try:
+        return await revocation_list.revoke(jti, float(payload["exp"]))
+    except RedisError as e:
+        logger.error(f"Could not revoke token {jti}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Token revocation is temporarily unavailable"
+        )
+
+
+async def refresh_tokens(db: AsyncSession, refresh_token: str) -> Token:
+    """
+    Exchange a refresh token for a new token pair.
+
+    Refresh tokens are single-use: the presented token is revoked as part of
+    the exchange, atomically, so two requests racing with the same token get
+    one new pair between them.
+
+    Args:
+        db: Database session
+        refresh_token: Refresh token from the client
+
+    Returns:
+        New access and refresh tokens
+
+    Raises:
+        HTTPException: If the token is invalid, expired, already used or the
+            user is missing or inactive
+    """
+    try:
+        payload = get_token_data(refresh_token, token_type="refresh")
+        user_id = UUID(payload["sub"])
+    except (HTTPException, ValueError):
+        raise invalid_refresh_exception
+
+    if not await revoke_token(payload):
+        logger.warning(f"Rejected reuse of refresh token {payload.get('jti')} for user {user_id}")
+        raise invalid_refresh_exception
+
+    principal = await get_cached_principal(user_id)
+    if principal is None:
+        user = await get_user_by_id(db, user_id=user_id)
+        if user is None:
+            raise invalid_refresh_exception
+        principal = Principal.from_user(user)
+        await cache_principal(principal)
+    if not principal.is_active:
+        raise invalid_refresh_exception
+
+    return issue_tokens(user_id)
@@ -0,0 +1,539 @@
+"""
+Bulk import and export of agents, connector instances and agent-connector links.
+
+Records are exchanged as NDJSON (one JSON object per line, with a "type" of
+"agent", "connector" or "link") or as CSV (one kind of record per file).
+Records refer to each other, to LLM configurations and to connector types by
+name rather than ID, so an export from one environment can be imported into
+another. Credentials are never exported.
+
+Imports validate each record, load them into temporary staging tables (COPY
+on PostgreSQL, executemany elsewhere) and then check and insert them with
+set-based statements, all in a single transaction.
+"""
+
+import csv
+import io
+import json
+import logging
+import os
+import uuid
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import (
+    JSON, Column, Integer, MetaData, String, Table, Text,
+    and_, exists, insert, literal, select
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Agent, AgentConnectorLink, LLMConfig, Tool, UserConnector
+from ..schemas.bulk_schemas import (
+    AgentRecord,
+    BulkConflictMode,
+    BulkFormat,
+    BulkImportCounts,
+    BulkImportResponse,
+    BulkKind,
+    ConnectorRecord,
+    LinkRecord,
+)
+from ..schemas.connector_schemas import SetupStatus
+
+logger = logging.getLogger(__name__)
+
+# Largest number of records accepted in one import
+BULK_MAX_RECORDS = int(os.getenv("BULK_MAX_RECORDS", "50000"))
+
+# Largest import document accepted, in bytes; larger uploads are refused while reading
+BULK_MAX_BYTES = int(os.getenv("BULK_MAX_BYTES", str(50 * 1024 * 1024)))
+
+# Rows sent per executemany batch when COPY is not available
+STAGING_BATCH_SIZE = 1000
+
+# Rows fetched per round-trip while exporting
+EXPORT_BATCH_SIZE = 500
+
+# Validation errors reported back to the client at most
+MAX_REPORTED_ERRORS = 100
+
+# NDJSON "type" values and CSV kinds for each record model
+RECORD_TYPES: Dict[str, Type[BaseModel]] = {
+    "agent": AgentRecord,
+    "connector": ConnectorRecord,
+    "link": LinkRecord,
+}
+KIND_RECORD_TYPES = {
+    BulkKind.AGENTS: "agent",
+    BulkKind.CONNECTORS: "connector",
+    BulkKind.LINKS: "link",
+}
+
+# CSV columns for each kind
+CSV_COLUMNS = {
+    BulkKind.AGENTS: ["name", "description", "system_prompt", "llm_provider", "llm_model"],
+    BulkKind.CONNECTORS: ["name", "connector_type", "config_data"],
+    BulkKind.LINKS: ["agent_name", "connector_name"],
+}
+
+# Temporary staging tables; "line" points back at the record for error messages
+_staging_metadata = MetaData()
+
+agent_staging = Table(
+    "bulk_agent_staging", _staging_metadata,
+    Column("line", Integer, nullable=False),
+    Column("id", UUID(as_uuid=True), nullable=False),
+    Column("name", String, nullable=False),
+    Column("description", Text),
+    Column("system_prompt", Text),
+    Column("llm_provider", String),
+    Column("llm_model", String),
+    prefixes=["TEMPORARY"],
+)
+
+connector_staging = Table(
+    "bulk_connector_staging", _staging_metadata,
+    Column("line", Integer, nullable=False),
+    Column("id", UUID(as_uuid=True), nullable=False),
+    Column("name", String, nullable=False),
+    Column("connector_type", String, nullable=False),
+    Column("config_data", JSON),
+    prefixes=["TEMPORARY"],
+)
+
+link_staging = Table(
+    "bulk_link_staging", _staging_metadata,
+    Column("line", Integer, nullable=False),
+    Column("agent_name", String, nullable=False),
+    Column("connector_name", String, nullable=False),
+    prefixes=["TEMPORARY"],
+)
+
+
+def _validation_message(error: ValidationError) -> str:
+    """Condense a pydantic ValidationError into one line."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'record'}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+def _iter_raw_records(data: str, fmt: BulkFormat, kind: Optional[BulkKind]) -> Iterator[Tuple[int, Optional[str], Any]]:
+    """Yield (line number, record type, raw dict or error message) from an NDJSON or CSV document."""
+    if fmt == BulkFormat.NDJSON:
+        for line_no, line in enumerate(data.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                raw = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, None, f"invalid JSON: {e.msg}"
+                continue
+            if not isinstance(raw, dict):
+                yield line_no, None, "expected a JSON object"
+                continue
+            yield line_no, raw.pop("type", None), raw
+        return
+
+    record_type = KIND_RECORD_TYPES[kind]
+    reader = csv.DictReader(io.StringIO(data))
+    for row in reader:
+        raw = {key: value for key, value in row.items() if key and value not in (None, "")}
+        if "config_data" in raw:
+            try:
+                raw["config_data"] = json.loads(raw["config_data"])
+            except json.JSONDecodeError:
+                yield reader.line_num, None, "config_data is not valid JSON"
+                continue
+        yield reader.line_num, record_type, raw
+
+
+def parse_records(
+    data: str,
+    fmt: BulkFormat,
+    kind: Optional[BulkKind] = None
+) -> Tuple[Dict[str, List[Tuple[int, BaseModel]]], List[str]]:
+    """
+    Parse and validate a bulk document.
+
+    Args:
+        data: Document text
+        fmt: Document format
+        kind: Record kind, required for CSV
+
+    Returns:
+        Tuple of (records grouped by type as (line, record) pairs, error messages)
+
+    Raises:
+        HTTPException: If a CSV kind is missing or there are too many records
+    """
+    if fmt == BulkFormat.CSV and kind is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV files hold one kind of record; specify kind (agents, connectors or links)"
+        )
+
+    records: Dict[str, List[Tuple[int, BaseModel]]] = {name: [] for name in RECORD_TYPES}
+    errors: List[str] = []
+    seen = set()
+    total = 0
+
+    for line_no, record_type, raw in _iter_raw_records(data, fmt, kind):
+        if isinstance(raw, str):
+            errors.append(f"line {line_no}: {raw}")
+            continue
+        model = RECORD_TYPES.get(record_type)
+        if model is None:
+            errors.append(f"line {line_no}: type must be one of {', '.join(RECORD_TYPES)}")
+            continue
+        try:
+            record = model(**raw)
+        except ValidationError as e:
+            errors.append(f"line {line_no}: {_validation_message(e)}")
+            continue
+
+        key = (record_type, record.agent_name, record.connector_name) if record_type == "link" \
+            else (record_type, record.name)
+        if key in seen:
+            errors.append(f"line {line_no}: duplicate {record_type} {' / '.join(key[1:])}")
+            continue
+        seen.add(key)
+
+        total += 1
+        if total > BULK_MAX_RECORDS:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Too many records; at most {BULK_MAX_RECORDS} are accepted per import"
+            )
+        records[record_type].append((line_no, record))
+
+    return records, errors
+
+
+async def _load_staging(db: AsyncSession, table: Table, rows: List[Dict[str, Any]]) -> None:
+    """
+    Create a staging table and load rows into it.
+
+    Uses COPY on asyncpg connections and batched executemany otherwise.
+    A table left behind on this connection by an earlier failed import
+    (possible where DDL is not transactional) is replaced.
+    """
+    conn = await db.connection()
+    await conn.run_sync(table.drop, checkfirst=True)
+    await conn.run_sync(table.create)
+    if not rows:
+        return
+
+    if conn.dialect.driver == "asyncpg":
+        columns = [column.name for column in table.columns]
+        json_columns = {column.name for column in table.columns if isinstance(column.type, JSON)}
+        records = [
+            tuple(
+                json.dumps(row[name]) if name in json_columns and row[name] is not None else row[name]
+                for name in columns
+            )
+            for row in rows
+        ]
+        raw_connection = await conn.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            table.name, records=records, columns=columns
+        )
+        return
+
+    for start in range(0, len(rows), STAGING_BATCH_SIZE):
+        await conn.execute(table.insert(), rows[start:start + STAGING_BATCH_SIZE])
+
+
+async def _drop_staging(db: AsyncSession) -> None:
+    """Drop the staging tables before the import transaction ends."""
+    conn = await db.connection()
+    for table in (link_staging, connector_staging, agent_staging):
+        await conn.run_sync(table.drop, checkfirst=True)
+
+
+async def _collect(db: AsyncSession, query, message: str, errors: List[str]) -> None:
+    """Run a validation query returning (line, *values) rows and add an error per row."""
+    result = await db.execute(query.limit(MAX_REPORTED_ERRORS))
+    for line, *values in result.all():
+        errors.append(f"line {line}: " + message.format(*values))
+
+
+async def _import_agents(
+    db: AsyncSession, user_id: uuid.UUID, on_conflict: BulkConflictMode, errors: List[str]
+) -> int:
+    """Validate staged agents and insert the new ones. Returns the number inserted."""
+    s = agent_staging.c
+    existing = select(Agent.id).where(Agent.user_id == user_id, Agent.name == s.name)
+    config_match = and_(
+        LLMConfig.user_id == user_id,
+        LLMConfig.provider == s.llm_provider,
+        LLMConfig.model_name == s.llm_model
+    )
+
+    if on_conflict == BulkConflictMode.ERROR:
+        await _collect(db, select(s.line, s.name).where(existing.exists()),
+                       "agent '{}' already exists", errors)
+    await _collect(
+        db,
+        select(s.line, s.llm_provider, s.llm_model).where(
+            s.llm_provider.is_not(None),
+            ~exists().where(config_match)
+        ),
+        "no LLM configuration for provider '{}' and model '{}'",
+        errors
+    )
+    if errors:
+        return 0
+
+    # Prefer the default configuration when several match
+    config_id = (
+        select(LLMConfig.id)
+        .where(config_match)
+        .order_by(LLMConfig.is_default.desc(), LLMConfig.created_at)
+        .limit(1)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        insert(Agent).from_select(
+            ["id", "user_id", "llm_config_id", "name", "description", "system_prompt"],
+            select(
+                s.id, literal(user_id, Agent.user_id.type), config_id,
+                s.name, s.description, s.system_prompt
+            ).where(~existing.exists())
+        )
+    )
+    return result.rowcount
+
+
+async def _import_connectors(
+    db: AsyncSession, user_id: uuid.UUID, on_conflict: BulkConflictMode, errors: List[str]
+) -> int:
+    """Validate staged connector instances and insert the new ones. Returns the number inserted."""
+    s = connector_staging.c
+    existing = select(UserConnector.id).where(UserConnector.user_id == user_id, UserConnector.name == s.name)
+
+    if on_conflict == BulkConflictMode.ERROR:
+        await _collect(db, select(s.line, s.name).where(existing.exists()),
+                       "connector '{}' already exists", errors)
+    await _collect(
+        db,
+        select(s.line, s.connector_type).where(~exists().where(Tool.name == s.connector_type)),
+        "unknown connector type '{}'",
+        errors
+    )
+    if errors:
+        return 0
+
+    result = await db.execute(
+        insert(UserConnector).from_select(
+            ["id", "user_id", "tool_id", "name", "setup_status", "config_data"],
+            select(
+                s.id, literal(user_id, UserConnector.user_id.type), Tool.id, s.name,
+                literal(SetupStatus.NEEDS_SETUP.value), s.config_data
+            )
+            .select_from(connector_staging)
+            .join(Tool, Tool.name == s.connector_type)
+            .where(~existing.exists())
+        )
+    )
+    return result.rowcount
+
+
+async def _import_links(db: AsyncSession, user_id: uuid.UUID, errors: List[str]) -> int:
+    """Resolve staged links by name and insert the missing ones. Returns the number inserted."""
+    s = link_staging.c
+    agent_match = and_(Agent.user_id == user_id, Agent.name == s.agent_name)
+    connector_match = and_(UserConnector.user_id == user_id, UserConnector.name == s.connector_name)
+
+    await _collect(db, select(s.line, s.agent_name).where(~exists().where(agent_match)),
+                   "agent '{}' not found", errors)
+    await _collect(db, select(s.line, s.connector_name).where(~exists().where(connector_match)),
+                   "connector '{}' not found", errors)
+    if errors:
+        return 0
+
+    already_linked = exists().where(
+        AgentConnectorLink.agent_id == Agent.id,
+        AgentConnectorLink.user_connector_id == UserConnector.id
+    )
+    result = await db.execute(
+        insert(AgentConnectorLink).from_select(
+            ["agent_id", "user_connector_id"],
+            select(Agent.id, UserConnector.id)
+            .select_from(link_staging)
+            .join(Agent, agent_match)
+            .join(UserConnector, connector_match)
+            .where(~already_linked)
+        )
+    )
+    return result.rowcount
+
+
+async def import_records(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    data: str,
+    fmt: BulkFormat = BulkFormat.NDJSON,
+    kind: Optional[BulkKind] = None,
+    on_conflict: BulkConflictMode = BulkConflictMode.SKIP,
+    dry_run: bool = False
+) -> BulkImportResponse:
+    """
+    Import agents, connector instances and links for a user.
+
+    Agents and connectors are inserted before links, so a single NDJSON file
+    can create an agent, a connector and the link between them. The import
+    is all-or-nothing: any invalid record rejects the whole file.
+
+    Args:
+        db: Database session
+        user_id: ID of the user the records are imported for
+        data: NDJSON or CSV document
+        fmt: Document format
+        kind: Record kind, required for CSV
+        on_conflict: Whether existing agent/connector names are skipped or rejected
+        dry_run: Validate and count without writing anything
+
+    Returns:
+        Per-kind counts of received, inserted and skipped records
+
+    Raises:
+        HTTPException: 400 with the list of problems if any record is invalid
+    """
+    records, errors = parse_records(data, fmt, kind)
+    if errors:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={"errors": errors[:MAX_REPORTED_ERRORS]})
+
+    try:
+        await _load_staging(db, agent_staging, [
+            {"line": line, "id": uuid.uuid4(), **record.model_dump()}
+            for line, record in records["agent"]
+        ])
+        await _load_staging(db, connector_staging, [
+            {"line": line, "id": uuid.uuid4(), **record.model_dump()}
+            for line, record in records["connector"]
+        ])
+        await _load_staging(db, link_staging, [
+            {"line": line, **record.model_dump()}
+            for line, record in records["link"]
+        ])
+
+        inserted_agents = await _import_agents(db, user_id, on_conflict, errors)
+        inserted_connectors = await _import_connectors(db, user_id, on_conflict, errors)
+        inserted_links = 0 if errors else await _import_links(db, user_id, errors)
+        if errors:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"errors": errors[:MAX_REPORTED_ERRORS]}
+            )
+
+        await _drop_staging(db)
+        if dry_run:
+            await db.rollback()
+        else:
+            await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+    def counts(received: int, inserted: int) -> BulkImportCounts:
+        return BulkImportCounts(received=received, inserted=inserted, skipped=received - inserted)
+
+    response = BulkImportResponse(
+        agents=counts(len(records["agent"]), inserted_agents),
+        connectors=counts(len(records["connector"]), inserted_connectors),
+        links=counts(len(records["link"]), inserted_links),
+        dry_run=dry_run
+    )
+    logger.info(
+        f"Bulk import for user {user_id}{' (dry run)' if dry_run else ''}: "
+        f"{inserted_agents} agents, {inserted_connectors} connectors, {inserted_links} links"
+    )
+    return response
+
+
+def _export_query(kind: BulkKind, user_id: uuid.UUID):
+    """Select the exported columns for one kind, in the CSV column order."""
+    if kind == BulkKind.AGENTS:
+        return (
+            select(Agent.name, Agent.description, Agent.system_prompt, LLMConfig.provider, LLMConfig.model_name)
+            .outerjoin(LLMConfig, LLMConfig.id == Agent.llm_config_id)
+            .where(Agent.user_id == user_id)
+            .order_by(Agent.created_at, Agent.id)
+        )
+    if kind == BulkKind.CONNECTORS:
+        return (
+            select(UserConnector.name, Tool.name, UserConnector.config_data)
+            .join(Tool, Tool.id == UserConnector.tool_id)
+            .where(UserConnector.user_id == user_id)
+            .order_by(UserConnector.created_at, UserConnector.id)
+        )
+    return (
+        select(Agent.name, UserConnector.name)
+        .select_from(AgentConnectorLink)
+        .join(Agent, Agent.id == AgentConnectorLink.agent_id)
+        .join(UserConnector, UserConnector.id == AgentConnectorLink.user_connector_id)
+        .where(Agent.user_id == user_id)
+        .order_by(Agent.name, UserConnector.name)
+    )
+
+
+def _csv_line(values: List[Any]) -> str:
+    """Format one CSV row."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+
+async def export_records(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    fmt: BulkFormat = BulkFormat.NDJSON,
+    kind: Optional[BulkKind] = None
+) -> AsyncIterator[str]:
+    """
+    Stream a user's agents, connector instances and links.
+
+    Rows are read with a server-side cursor and yielded in chunks of
+    EXPORT_BATCH_SIZE rows, so memory use does not grow with the export.
+
+    Args:
+        db: Database session
+        user_id: ID of the user to export
+        fmt: Output format
+        kind: Only export this kind of record (required for CSV)
+
+    Yields:
+        Chunks of the output document
+
+    Raises:
+        HTTPException: If CSV is requested without a kind
+    """
+    if fmt == BulkFormat.CSV and kind is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV exports hold one kind of record; specify kind (agents, connectors or links)"
+        )
+
+    kinds = [kind] if kind else list(BulkKind)
+    for export_kind in kinds:
+        columns = CSV_COLUMNS[export_kind]
+        record_type = KIND_RECORD_TYPES[export_kind]
+        if fmt == BulkFormat.CSV:
+            yield _csv_line(columns)
+
+        result = await db.stream(_export_query(export_kind, user_id))
+        async for partition in result.partitions(EXPORT_BATCH_SIZE):
+            lines = []
+            for row in partition:
+                if fmt == BulkFormat.CSV:
+                    lines.append(_csv_line([
+                        json.dumps(value) if isinstance(value, (dict, list)) else value
+                        for value in row
+                    ]))
+                else:
+                    record = {"type": record_type, **dict(zip(columns, row))}
+                    lines.append(json.dumps(record, default=str) + "\n")
+            yield "".join(lines)
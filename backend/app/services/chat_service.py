@@ -1,6 +1,7 @@
 import uuid
 from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 import openai
 import anthropic
@@ -10,7 +11,7 @@ import logging
 from datetime import datetime
 from ..models import Agent, ConversationTurn, LLMConfig
 from ..schemas.chat_schemas import MessageRole
-from ..security import decrypt_data
+from ..security import decrypt_credentials
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -18,7 +19,7 @@ logger = logging.getLogger(__name__)
 class ChatService:
     """Service for handling chat with agents."""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         """Initialize the chat service."""
         self.db = db
         self.clients = {}  # Store API clients by provider
@@ -35,24 +36,29 @@ class ChatService:
             self.clients["anthropic"] = anthropic.Anthropic(api_key=api_key)
         return self.clients["anthropic"]
     
-    def get_agent_with_config(self, agent_id: uuid.UUID, user_id: uuid.UUID) -> tuple[Agent, LLMConfig]:
+    async def get_agent_with_config(self, agent_id: uuid.UUID, user_id: uuid.UUID) -> tuple[Agent, LLMConfig]:
         """Get an agent and its LLM configuration."""
-        # Get the agent
-        agent = self.db.query(Agent).filter(
-            Agent.id == agent_id,
-            Agent.user_id == user_id
-        ).first()
+        # Get the agent and its configuration in one round-trip. Lambda statements
+        # are compiled once and reused, with only the IDs bound per call.
+        result = await self.db.execute(
+            lambda_stmt(
+                lambda: select(Agent, LLMConfig)
+                .outerjoin(LLMConfig, LLMConfig.id == Agent.llm_config_id)
+                .where(
+                    Agent.id == agent_id,
+                    Agent.user_id == user_id
+                )
+            )
+        )
+        row = result.first()
         
-        if not agent:
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Agent not found"
             )
         
-        # Get the LLM configuration
-        llm_config = self.db.query(LLMConfig).filter(
-            LLMConfig.id == agent.llm_config_id
-        ).first()
+        agent, llm_config = row
         
         if not llm_config:
             raise HTTPException(
@@ -62,13 +68,19 @@ class ChatService:
         
         return agent, llm_config
     
-    def get_conversation_history(self, agent_id: uuid.UUID, limit: int = 50) -> List[ConversationTurn]:
+    async def get_conversation_history(self, agent_id: uuid.UUID, limit: int = 50) -> List[ConversationTurn]:
         """Get conversation history for an agent."""
-        return self.db.query(ConversationTurn).filter(
-            ConversationTurn.agent_id == agent_id
-        ).order_by(ConversationTurn.timestamp.asc()).limit(limit).all()
+        result = await self.db.execute(
+            lambda_stmt(
+                lambda: select(ConversationTurn)
+                .where(ConversationTurn.agent_id == agent_id)
+                .order_by(ConversationTurn.timestamp.asc())
+                .limit(limit)
+            )
+        )
+        return result.scalars().all()
     
-    def save_message(self, agent_id: uuid.UUID, role: str, content: Optional[str] = None,
+    async def save_message(self, agent_id: uuid.UUID, role: str, content: Optional[str] = None,
                      tool_call_id: Optional[str] = None, tool_name: Optional[str] = None,
                      tool_input: Optional[Dict[str, Any]] = None, 
                      tool_output: Optional[Dict[str, Any]] = None) -> ConversationTurn:
@@ -85,8 +97,8 @@ class ChatService:
         )
         
         self.db.add(message)
-        self.db.commit()
-        self.db.refresh(message)
+        await self.db.commit()
+        await self.db.refresh(message)
         
         return message
     
@@ -153,20 +165,20 @@ class ChatService:
     async def send_message(self, agent_id: uuid.UUID, user_id: uuid.UUID, content: str) -> ConversationTurn:
         """Send a message to an agent and get a response."""
         # Get agent and LLM config
-        agent, llm_config = self.get_agent_with_config(agent_id, user_id)
+        agent, llm_config = await self.get_agent_with_config(agent_id, user_id)
         
         # Save user message
-        user_message = self.save_message(
+        user_message = await self.save_message(
             agent_id=agent_id,
             role=MessageRole.USER.value,
             content=content
         )
         
         # Get conversation history
-        history = self.get_conversation_history(agent_id)
+        history = await self.get_conversation_history(agent_id)
         
-        # Decrypt API key
-        api_key = decrypt_data(llm_config.encrypted_credentials)
+        # Decrypt API key (cached briefly, as this runs for every message)
+        api_key = decrypt_credentials(llm_config.encrypted_credentials)
         if not api_key:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -188,7 +200,7 @@ class ChatService:
                 )
             
             # Save assistant message
-            assistant_message = self.save_message(
+            assistant_message = await self.save_message(
                 agent_id=agent_id,
                 role=MessageRole.ASSISTANT.value,
                 content=response_content
@@ -233,6 +245,6 @@ class ChatService:
         
         return response.content[0].text
         
-def get_chat_service(db: Session) -> ChatService:
+def get_chat_service(db: AsyncSession) -> ChatService:
     """Get a chat service instance."""
     return ChatService(db) 
\ No newline at end of file
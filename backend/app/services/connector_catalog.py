@@ -5,16 +5,29 @@ This module defines the built-in list of all connector types that AgentBase
 can potentially work with, whether they are fully implemented yet or not.
 """
 
+import hashlib
+import json
 import logging
 import uuid
-from typing import Dict, List, Optional
-from sqlalchemy.orm import Session
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 
-from ..models import Tool
+from ..api.etag import strong_etag
+from ..models import RegistryChecksum, Tool
+from ..schemas.connector_schemas import ConnectorList
+from .pagination import paginate, DEFAULT_PAGE_SIZE
 
 logger = logging.getLogger(__name__)
 
+# Fields connector types can be sorted by in list requests
+TOOL_SORT_COLUMNS = {"name": Tool.name, "created_at": Tool.created_at}
+
 # Define connector registry with all supported connector types
 # Each connector definition includes:
 # - name: User-friendly name
@@ -82,93 +95,238 @@ CONNECTOR_REGISTRY = [
     }
 ]
 
-def initialize_connector_registry(db: Session) -> None:
+# Registry fields stored in the tools table (status is only kept in code)
+TOOL_FIELDS = ("name", "description", "tool_type", "config_schema", "execution_ref")
+
+# Row in registry_checksums recording the last synced registry
+REGISTRY_CHECKSUM_NAME = "connectors"
+
+# Postgres advisory lock key serializing registry syncs across workers
+REGISTRY_LOCK_KEY = zlib.crc32(b"agentbase:connector_registry")
+
+# Registry entries indexed by connector name for constant-time lookups
+CONNECTOR_REGISTRY_BY_NAME = {connector["name"]: connector for connector in CONNECTOR_REGISTRY}
+
+def get_connector_status(name: str) -> str:
+    """
+    Get the implementation status of a connector type from the registry.
+    
+    Args:
+        name: Connector type name
+        
+    Returns:
+        Status string, "available" if the connector is not in the registry
+    """
+    registry_entry = CONNECTOR_REGISTRY_BY_NAME.get(name)
+    return registry_entry.get("status", "available") if registry_entry else "available"
+
+def _registry_checksum() -> str:
+    """Checksum of the registry fields stored in the tools table."""
+    stored = [
+        {field: connector[field] for field in TOOL_FIELDS}
+        for connector in sorted(CONNECTOR_REGISTRY, key=lambda c: c["name"])
+    ]
+    return hashlib.sha256(json.dumps(stored, sort_keys=True).encode()).hexdigest()
+
+
+# Checksum of the registry as defined in this build
+CONNECTOR_REGISTRY_CHECKSUM = _registry_checksum()
+
+# Version of everything responses embed from the registry: the synced tool
+# fields plus each connector's status, which is served but not stored
+CONNECTOR_CATALOG_VERSION = hashlib.sha256(
+    json.dumps(sorted(CONNECTOR_REGISTRY, key=lambda c: c["name"]), sort_keys=True).encode()
+).hexdigest()[:16]
+
+
+def _dialect_insert(db: AsyncSession):
+    """Get the dialect-specific insert construct that supports ON CONFLICT."""
+    return sqlite_insert if db.get_bind().dialect.name == "sqlite" else pg_insert
+
+
+async def _stored_checksum(db: AsyncSession) -> Optional[str]:
+    """Get the checksum of the registry last synced to the database."""
+    return await db.scalar(
+        select(RegistryChecksum.checksum).where(RegistryChecksum.name == REGISTRY_CHECKSUM_NAME)
+    )
+
+
+async def initialize_connector_registry(db: AsyncSession) -> None:
     """
     Initialize the connector registry in the database.
     
     This function should be called during application startup to ensure
-    that all connector types are registered in the database.
+    that all connector types are registered in the database. When the
+    registry is unchanged since the last sync (same checksum) this is a
+    single read. Otherwise one worker upserts all connector types under an
+    advisory lock while the others wait and then skip.
     
     Args:
         db: SQLAlchemy database session
     """
-    logger.info("Initializing connector registry...")
-    
     try:
-        # Get existing tools from database
-        existing_tools = {tool.name: tool for tool in db.query(Tool).all()}
+        if await _stored_checksum(db) == CONNECTOR_REGISTRY_CHECKSUM:
+            logger.info("Connector registry unchanged, skipping sync")
+            return
         
-        # Update or insert each connector
-        for connector in CONNECTOR_REGISTRY:
-            if connector["name"] in existing_tools:
-                # Update existing connector if needed
-                tool = existing_tools[connector["name"]]
-                tool.description = connector["description"]
-                tool.tool_type = connector["tool_type"]
-                tool.config_schema = connector["config_schema"]
-                tool.execution_ref = connector["execution_ref"]
-                logger.debug(f"Updated connector: {connector['name']}")
-            else:
-                # Insert new connector
-                tool = Tool(
-                    id=uuid.uuid4(),
-                    name=connector["name"],
-                    description=connector["description"],
-                    tool_type=connector["tool_type"],
-                    config_schema=connector["config_schema"],
-                    execution_ref=connector["execution_ref"]
-                )
-                db.add(tool)
-                logger.info(f"Added new connector: {connector['name']}")
+        logger.info("Syncing connector registry...")
+        if db.get_bind().dialect.name == "postgresql":
+            # Serialize concurrent workers; released when the transaction ends
+            await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": REGISTRY_LOCK_KEY})
+            # Another worker may have synced while we waited for the lock
+            if await _stored_checksum(db) == CONNECTOR_REGISTRY_CHECKSUM:
+                await db.rollback()
+                logger.info("Connector registry synced by another worker")
+                return
+        
+        insert = _dialect_insert(db)
+        
+        # Update or insert each connector in one statement
+        upsert = insert(Tool).values([
+            {"id": uuid.uuid4(), **{field: connector[field] for field in TOOL_FIELDS}}
+            for connector in CONNECTOR_REGISTRY
+        ])
+        await db.execute(upsert.on_conflict_do_update(
+            index_elements=[Tool.name],
+            set_={field: upsert.excluded[field] for field in TOOL_FIELDS if field != "name"}
+        ))
         
         # Remove connectors that are no longer in the registry
-        for tool_name, tool in existing_tools.items():
-            if not any(connector["name"] == tool_name for connector in CONNECTOR_REGISTRY):
-                logger.info(f"Removing connector that is no longer in registry: {tool_name}")
-                db.delete(tool)
+        result = await db.execute(
+            delete(Tool).where(Tool.name.not_in(list(CONNECTOR_REGISTRY_BY_NAME))).returning(Tool.name)
+        )
+        for tool_name in result.scalars().all():
+            logger.info(f"Removed connector that is no longer in registry: {tool_name}")
+        
+        checksum = insert(RegistryChecksum).values(
+            name=REGISTRY_CHECKSUM_NAME, checksum=CONNECTOR_REGISTRY_CHECKSUM
+        )
+        await db.execute(checksum.on_conflict_do_update(
+            index_elements=[RegistryChecksum.name],
+            set_={"checksum": checksum.excluded.checksum, "updated_at": func.now()}
+        ))
         
-        db.commit()
-        logger.info("Connector registry initialization complete")
+        await db.commit()
+        logger.info("Connector registry sync complete")
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error initializing connector registry: {e}")
         raise
 
-def get_connector_registry(db: Session, status: Optional[str] = None) -> List[Dict]:
+async def get_connector_registry(
+    db: AsyncSession,
+    status: Optional[str] = None,
+    tool_type: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    sort: str = "name"
+) -> Tuple[List[Dict], Optional[str]]:
     """
-    Get all registered connectors, optionally filtered by status.
+    Get a page of registered connectors, optionally filtered by status and type.
     
     Args:
         db: SQLAlchemy database session
         status: Optional filter for connector status
+        tool_type: Optional filter for connector type (e.g. "oauth2")
+        limit: Maximum number of connectors to return
+        cursor: Cursor from the previous page, if any
+        sort: Sort field ("name" or "created_at"), prefixed with "-" for descending
         
     Returns:
-        List of connector dictionaries
+        Tuple of (connector dictionaries, cursor for the next page or None)
     """
-    query = db.query(Tool)
-    tools = query.all()
+    # Status lives in the registry rather than the database, so translate the
+    # status filter into the set of matching connector names
+    names = [
+        name for name, entry in CONNECTOR_REGISTRY_BY_NAME.items()
+        if not status or entry.get("status", "available") == status
+    ]
+    query = select(Tool).where(Tool.name.in_(names))
+    if tool_type:
+        query = query.where(Tool.tool_type == tool_type)
     
-    # Convert to dictionary with status information
-    result = []
-    for tool in tools:
-        # Find the matching registry entry to get status
-        registry_entry = next((c for c in CONNECTOR_REGISTRY if c["name"] == tool.name), None)
+    tools, next_cursor = await paginate(db, query, Tool, sort, TOOL_SORT_COLUMNS, limit, cursor)
+    
+    return [_tool_entry(tool) for tool in tools], next_cursor
+
+
+@dataclass(frozen=True)
+class CatalogBody:
+    """A pre-serialized catalog response and its ETag."""
+    body: bytes
+    etag: str
+    count: int
+
+
+# Snapshot of the catalog, sorted by name. The catalog only changes on deploy,
+# so each worker loads it once (at startup, or on first use) and serves from it.
+_catalog: Optional[List[Dict]] = None
+# Serialized catalog responses by (status, tool_type) filter
+_catalog_bodies: Dict[Tuple[Optional[str], Optional[str]], CatalogBody] = {}
+
+
+def _tool_entry(tool: Tool) -> Dict:
+    """Convert a connector type row into its catalog entry."""
+    return {
+        "id": str(tool.id),
+        "name": tool.name,
+        "description": tool.description,
+        "tool_type": tool.tool_type,
+        "config_schema": tool.config_schema,
+        "execution_ref": tool.execution_ref,
+        "status": get_connector_status(tool.name)
+    }
+
+
+async def load_connector_catalog(db: AsyncSession) -> List[Dict]:
+    """
+    Load the connector catalog snapshot from the database.
+    
+    Call after initialize_connector_registry so the snapshot includes the
+    connector types it registered.
+    
+    Args:
+        db: SQLAlchemy database session
         
-        if registry_entry:
-            tool_status = registry_entry.get("status", "available")
-            
-            # Filter by status if specified
-            if status and tool_status != status:
-                continue
-                
-            result.append({
-                "id": str(tool.id),
-                "name": tool.name,
-                "description": tool.description,
-                "tool_type": tool.tool_type,
-                "config_schema": tool.config_schema,
-                "execution_ref": tool.execution_ref,
-                "status": tool_status
-            })
+    Returns:
+        Catalog entries sorted by name
+    """
+    global _catalog
+    result = await db.execute(
+        select(Tool).where(Tool.name.in_(list(CONNECTOR_REGISTRY_BY_NAME))).order_by(Tool.name, Tool.id)
+    )
+    catalog = [_tool_entry(tool) for tool in result.scalars().all()]
+    _catalog_bodies.clear()
+    _catalog = catalog
+    logger.info(f"Loaded connector catalog with {len(catalog)} connector types")
+    return catalog
+
+
+async def get_catalog_body(
+    db: AsyncSession,
+    status: Optional[str] = None,
+    tool_type: Optional[str] = None
+) -> CatalogBody:
+    """
+    Get the full catalog response for a filter, serialized once per worker.
     
-    return result 
\ No newline at end of file
+    Args:
+        db: SQLAlchemy database session, used only if the catalog is not loaded yet
+        status: Optional filter for connector status
+        tool_type: Optional filter for connector type (e.g. "oauth2")
+        
+    Returns:
+        Serialized ConnectorList of every matching connector, sorted by name
+    """
+    catalog = _catalog if _catalog is not None else await load_connector_catalog(db)
+    key = (status, tool_type)
+    cached = _catalog_bodies.get(key)
+    if cached is None:
+        connectors = [
+            entry for entry in catalog
+            if (not status or entry["status"] == status) and (not tool_type or entry["tool_type"] == tool_type)
+        ]
+        body = ConnectorList(connectors=connectors, count=len(connectors), next_cursor=None).model_dump_json().encode()
+        cached = CatalogBody(body=body, etag=strong_etag(body), count=len(connectors))
+        _catalog_bodies[key] = cached
+    return cached
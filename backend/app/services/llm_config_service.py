@@ -1,25 +1,49 @@
-from typing import List
+from typing import List, Optional, Tuple
 from uuid import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models import LLMConfig
+from .pagination import paginate, DEFAULT_PAGE_SIZE
 
+# Fields LLM configurations can be sorted by in list requests
+LLM_CONFIG_SORT_COLUMNS = {"created_at": LLMConfig.created_at, "model_name": LLMConfig.model_name}
 
-def get_llm_configs_by_user(db: Session, user_id: UUID) -> List[LLMConfig]:
+
+async def get_llm_configs_by_user(
+    db: AsyncSession,
+    user_id: UUID,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    sort: str = "created_at",
+    provider: Optional[str] = None,
+    is_default: Optional[bool] = None
+) -> Tuple[List[LLMConfig], Optional[str]]:
     """
-    Get all LLM configurations for a user.
+    Get a page of LLM configurations for a user.
     
     Args:
         db: Database session
         user_id: User ID to get configurations for
+        limit: Maximum number of configurations to return
+        cursor: Cursor from the previous page, if any
+        sort: Sort field ("created_at" or "model_name"), prefixed with "-" for descending
+        provider: Only include configurations for this provider
+        is_default: Only include default (or non-default) configurations
         
     Returns:
-        List of LLM configurations
+        Tuple of (LLM configurations, cursor for the next page or None)
     """
-    return db.query(LLMConfig).filter(LLMConfig.user_id == user_id).all()
+    query = select(LLMConfig).where(LLMConfig.user_id == user_id)
+    if provider:
+        query = query.where(LLMConfig.provider == provider.lower())
+    if is_default is not None:
+        query = query.where(LLMConfig.is_default == is_default)
+    
+    return await paginate(db, query, LLMConfig, sort, LLM_CONFIG_SORT_COLUMNS, limit, cursor)
 
 
-def get_llm_config_by_id(db: Session, config_id: UUID, user_id: UUID) -> LLMConfig:
+async def get_llm_config_by_id(db: AsyncSession, config_id: UUID, user_id: UUID) -> LLMConfig:
     """
     Get a specific LLM configuration.
     
@@ -31,7 +55,10 @@ def get_llm_config_by_id(db: Session, config_id: UUID, user_id: UUID) -> LLMConf
     Returns:
         LLM configuration if found and owned by user, None otherwise
     """
-    return db.query(LLMConfig).filter(
-        LLMConfig.id == config_id,
-        LLMConfig.user_id == user_id
-    ).first() 
\ No newline at end of file
+    result = await db.execute(
+        select(LLMConfig).where(
+            LLMConfig.id == config_id,
+            LLMConfig.user_id == user_id
+        )
+    )
+    return result.scalars().first()
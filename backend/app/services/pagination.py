@@ -0,0 +1,146 @@
+"""
+Keyset (cursor) pagination helpers.
+
+List endpoints page through rows ordered by a sort column plus the primary
+key as a tie-breaker. The position is carried between requests in an opaque
+cursor, so each page is a single index range scan instead of an OFFSET that
+grows with the page number.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Page size used when the client does not specify a limit
+DEFAULT_PAGE_SIZE = 100
+
+# Largest page size a client may request
+MAX_PAGE_SIZE = 500
+
+
+def resolve_sort(sort: str, sort_columns: Dict[str, Any]) -> Tuple[Any, bool]:
+    """
+    Resolve a sort option such as "created_at" or "-name" to a column.
+
+    Args:
+        sort: Sort field name, prefixed with "-" for descending order
+        sort_columns: Allowed sort field names mapped to model columns
+
+    Returns:
+        Tuple of (column, descending)
+
+    Raises:
+        HTTPException: If the sort field is not allowed
+    """
+    descending = sort.startswith("-")
+    field = sort.lstrip("-")
+    if field not in sort_columns:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid sort field '{field}'. Allowed: {', '.join(sort_columns)}"
+        )
+    return sort_columns[field], descending
+
+
+def encode_cursor(sort: str, value: Any, row_id: UUID) -> str:
+    """
+    Encode the position after a row into an opaque cursor.
+
+    Args:
+        sort: Sort option the page was produced with
+        value: Value of the sort column for the last row
+        row_id: Primary key of the last row
+
+    Returns:
+        URL-safe cursor string
+    """
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps({"s": sort, "v": value, "id": str(row_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, sort_column: Any) -> Tuple[Any, UUID]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string from the client
+        sort: Sort option of the current request
+        sort_column: Column the cursor value belongs to
+
+    Returns:
+        Tuple of (sort value, row id)
+
+    Raises:
+        HTTPException: If the cursor is malformed or was issued for another sort order
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] != sort:
+            raise ValueError("cursor sort mismatch")
+        value = payload["v"]
+        if isinstance(sort_column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        return value, UUID(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    model: Any,
+    sort: str,
+    sort_columns: Dict[str, Any],
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Fetch one page of a query using keyset pagination.
+
+    Args:
+        db: Database session
+        query: Select statement with all filters applied
+        model: Mapped class being listed (must have an ``id`` primary key)
+        sort: Sort option, e.g. "created_at" or "-created_at"
+        sort_columns: Allowed sort field names mapped to model columns
+        limit: Maximum number of rows to return
+        cursor: Cursor returned with the previous page, if any
+
+    Returns:
+        Tuple of (rows, next_cursor); next_cursor is None on the last page
+    """
+    sort_column, descending = resolve_sort(sort, sort_columns)
+    key = tuple_(sort_column, model.id)
+
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort, sort_column)
+        query = query.where(key < (value, last_id) if descending else key > (value, last_id))
+
+    if descending:
+        query = query.order_by(sort_column.desc(), model.id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), model.id.asc())
+
+    # Fetch one extra row to find out whether another page exists
+    result = await db.execute(query.limit(limit + 1))
+    rows = result.scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, getattr(last, sort_column.key), last.id)
+
+    return rows, next_cursor
@@ -0,0 +1,102 @@
+"""
+Resource Versions
+
+This module provides cheap version queries for per-user resources. A version
+changes whenever the resource's API representation does, so endpoints can
+derive ETags from it and answer conditional requests without loading the
+resource itself.
+"""
+
+import uuid
+from datetime import datetime
+from typing import Optional, Tuple, Type
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Agent, ConversationTurn
+
+# A collection's version: row count and latest updated_at. The count catches
+# deletions, which leave the latest updated_at unchanged.
+CollectionVersion = Tuple[int, Optional[datetime]]
+
+
+async def get_collection_version(db: AsyncSession, model: Type, user_id: uuid.UUID) -> CollectionVersion:
+    """
+    Get the version of a user's collection of rows.
+
+    Args:
+        db: Database session
+        model: Model with user_id and updated_at columns (e.g. Agent, LLMConfig)
+        user_id: ID of the user the collection belongs to
+
+    Returns:
+        Tuple of (row count, latest updated_at or None if there are no rows)
+    """
+    result = await db.execute(
+        select(func.count(), func.max(model.updated_at)).where(model.user_id == user_id)
+    )
+    count, updated_at = result.one()
+    return count, updated_at
+
+
+async def get_row_version(
+    db: AsyncSession,
+    model: Type,
+    row_id: uuid.UUID,
+    user_id: uuid.UUID
+) -> Optional[datetime]:
+    """
+    Get the version of a single row owned by a user.
+
+    Args:
+        db: Database session
+        model: Model with id, user_id and updated_at columns
+        row_id: ID of the row
+        user_id: ID of the user who must own the row
+
+    Returns:
+        The row's updated_at, or None if the user has no such row
+    """
+    return await db.scalar(
+        select(model.updated_at).where(model.id == row_id, model.user_id == user_id)
+    )
+
+
+async def get_chat_history_version(
+    db: AsyncSession,
+    agent_id: uuid.UUID,
+    user_id: uuid.UUID
+) -> Optional[Tuple]:
+    """
+    Get the version of an agent's chat history.
+
+    Turns are only ever appended or cleared all together, so the number of
+    turns and the ID of the latest one identify the history. The agent's LLM
+    configuration is included because history can only be read while the
+    agent has one.
+
+    Args:
+        db: Database session
+        agent_id: ID of the agent
+        user_id: ID of the user who must own the agent
+
+    Returns:
+        Tuple of (LLM configuration ID, turn count, latest turn ID), or None
+        if the user has no such agent
+    """
+    turns = ConversationTurn.agent_id == Agent.id
+    turn_count = select(func.count(ConversationTurn.id)).where(turns).scalar_subquery()
+    last_turn = (
+        select(ConversationTurn.id)
+        .where(turns)
+        .order_by(ConversationTurn.timestamp.desc(), ConversationTurn.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(Agent.llm_config_id, turn_count, last_turn)
+        .where(Agent.id == agent_id, Agent.user_id == user_id)
+    )
+    row = result.first()
+    return tuple(row) if row is not None else None
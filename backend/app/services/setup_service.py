@@ -1,7 +1,8 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..models import User
 
-def is_setup_complete(db: Session) -> bool:
+async def is_setup_complete(db: AsyncSession) -> bool:
     """
     Check if the initial admin setup has been completed.
     
@@ -15,7 +16,9 @@ def is_setup_complete(db: Session) -> bool:
         True if at least one superuser exists, False otherwise
     """
     # Count the number of users with superuser privileges
-    superuser_count = db.query(User).filter(User.is_superuser == True).count()
+    superuser_count = await db.scalar(
+        select(func.count()).select_from(User).where(User.is_superuser == True)
+    )
     
     # Setup is complete if at least one superuser exists
-    return superuser_count > 0 
\ No newline at end of file
+    return superuser_count > 0
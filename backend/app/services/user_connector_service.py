@@ -6,17 +6,71 @@ This module provides functions for managing user-specific connector instances.
 
 import logging
 import uuid
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
+from typing import List, Optional, Dict, Any, Tuple
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException
 
-from ..models import UserConnector, Tool, User, Agent, AgentConnectorLink
+from ..models import UserConnector, Tool, User, Agent, AgentConnectorLink, ConnectorSyncState, GmailMessage, GmailMessageLabel, CalendarEvent
 from ..schemas.connector_schemas import UserConnectorCreate, UserConnectorUpdate, SetupStatus
+from .connector_catalog import get_connector_status
+from .pagination import paginate, DEFAULT_PAGE_SIZE
 
 logger = logging.getLogger(__name__)
 
-def create_user_connector(db: Session, user_id: uuid.UUID, connector: UserConnectorCreate) -> UserConnector:
+# Fields user connectors can be sorted by in list requests
+USER_CONNECTOR_SORT_COLUMNS = {"created_at": UserConnector.created_at, "name": UserConnector.name}
+
+def _forget_connector_caches(connector_id: uuid.UUID) -> None:
+    """Drop what connectors cache about a connector (OAuth token, search setup) after its row changed or was deleted."""
+    # Imported here: the connectors package imports the services at load time
+    from ..connectors.oauth import token_manager
+    from ..connectors.web_search import web_search
+    token_manager.invalidate(connector_id)
+    web_search.invalidate(connector_id)
+
+def _serialize_user_connector(uc: UserConnector, include_details: bool = True) -> Dict[str, Any]:
+    """
+    Convert a user connector into its API representation.
+    
+    The connector's ``tool`` relationship must already be loaded when
+    include_details is set, so no queries are issued here.
+    
+    Args:
+        uc: User connector instance
+        include_details: Whether to include connector type details
+        
+    Returns:
+        User connector data
+    """
+    connector_data = {
+        "id": str(uc.id),
+        "user_id": str(uc.user_id),
+        "tool_id": str(uc.tool_id),
+        "name": uc.name,
+        "setup_status": uc.setup_status,
+        "config_data": uc.config_data,
+        "created_at": uc.created_at.isoformat() if uc.created_at else None,
+        "updated_at": uc.updated_at.isoformat() if uc.updated_at else None
+    }
+    
+    if include_details and uc.tool is not None:
+        tool = uc.tool
+        connector_data["connector_type"] = {
+            "id": str(tool.id),
+            "name": tool.name,
+            "description": tool.description,
+            "tool_type": tool.tool_type,
+            "config_schema": tool.config_schema,
+            "execution_ref": tool.execution_ref,
+            "status": get_connector_status(tool.name)
+        }
+    
+    return connector_data
+
+async def create_user_connector(db: AsyncSession, user_id: uuid.UUID, connector: UserConnectorCreate) -> UserConnector:
     """
     Create a new user connector instance.
     
@@ -30,7 +84,7 @@ def create_user_connector(db: Session, user_id: uuid.UUID, connector: UserConnec
     """
     try:
         # Check if connector type exists
-        tool = db.query(Tool).filter(Tool.id == connector.tool_id).first()
+        tool = await db.get(Tool, connector.tool_id)
         if not tool:
             raise HTTPException(status_code=404, detail=f"Connector type with ID {connector.tool_id} not found")
             
@@ -45,74 +99,66 @@ def create_user_connector(db: Session, user_id: uuid.UUID, connector: UserConnec
         )
         
         db.add(user_connector)
-        db.commit()
-        db.refresh(user_connector)
+        await db.commit()
+        await db.refresh(user_connector)
         
         logger.info(f"Created user connector: {connector.name} for user {user_id}")
         return user_connector
         
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error creating user connector: {e}")
         raise HTTPException(status_code=500, detail="Database error creating connector")
 
-def get_user_connectors(db: Session, user_id: uuid.UUID, include_details: bool = False) -> List[Dict[str, Any]]:
+async def get_user_connectors(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    include_details: bool = False,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    sort: str = "created_at",
+    setup_status: Optional[SetupStatus] = None,
+    tool_id: Optional[uuid.UUID] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
     """
-    Get all connectors for a specific user.
+    Get a page of connectors for a specific user.
+    
+    Connector types are joined into the same query, so the number of
+    statements does not grow with the number of connectors.
     
     Args:
         db: Database session
         user_id: ID of the user
         include_details: Whether to include connector type details
+        limit: Maximum number of connectors to return
+        cursor: Cursor from the previous page, if any
+        sort: Sort field ("created_at" or "name"), prefixed with "-" for descending
+        setup_status: Only include connectors with this setup status
+        tool_id: Only include connectors of this connector type
         
     Returns:
-        List of user connector objects
+        Tuple of (user connector objects, cursor for the next page or None)
     """
     try:
-        query = db.query(UserConnector).filter(UserConnector.user_id == user_id)
-        user_connectors = query.all()
-        
-        result = []
-        for uc in user_connectors:
-            connector_data = {
-                "id": str(uc.id),
-                "user_id": str(uc.user_id),
-                "tool_id": str(uc.tool_id),
-                "name": uc.name,
-                "setup_status": uc.setup_status,
-                "config_data": uc.config_data,
-                "created_at": uc.created_at.isoformat() if uc.created_at else None,
-                "updated_at": uc.updated_at.isoformat() if uc.updated_at else None
-            }
-            
-            # Include connector type details if requested
-            if include_details:
-                tool = db.query(Tool).filter(Tool.id == uc.tool_id).first()
-                if tool:
-                    # Get status from connector registry
-                    from ..services.connector_catalog import CONNECTOR_REGISTRY
-                    registry_entry = next((c for c in CONNECTOR_REGISTRY if c["name"] == tool.name), None)
-                    status = registry_entry.get("status", "available") if registry_entry else "available"
-                    
-                    connector_data["connector_type"] = {
-                        "id": str(tool.id),
-                        "name": tool.name,
-                        "description": tool.description,
-                        "tool_type": tool.tool_type,
-                        "config_schema": tool.config_schema,
-                        "execution_ref": tool.execution_ref,
-                        "status": status
-                    }
-            
-            result.append(connector_data)
+        query = select(UserConnector).where(UserConnector.user_id == user_id)
+        if setup_status:
+            query = query.where(UserConnector.setup_status == setup_status.value)
+        if tool_id:
+            query = query.where(UserConnector.tool_id == tool_id)
+        if include_details:
+            query = query.options(joinedload(UserConnector.tool))
+        
+        user_connectors, next_cursor = await paginate(
+            db, query, UserConnector, sort, USER_CONNECTOR_SORT_COLUMNS, limit, cursor
+        )
         
-        return result
+        return [_serialize_user_connector(uc, include_details) for uc in user_connectors], next_cursor
         
     except SQLAlchemyError as e:
         logger.error(f"Error getting user connectors: {e}")
         raise HTTPException(status_code=500, detail="Database error retrieving connectors")
 
-def get_user_connector(db: Session, user_id: uuid.UUID, connector_id: uuid.UUID) -> Dict[str, Any]:
+async def get_user_connector(db: AsyncSession, user_id: uuid.UUID, connector_id: uuid.UUID) -> Dict[str, Any]:
     """
     Get a specific user connector by ID.
     
@@ -125,47 +171,26 @@ def get_user_connector(db: Session, user_id: uuid.UUID, connector_id: uuid.UUID)
         User connector data
     """
     try:
-        uc = db.query(UserConnector).filter(
-            UserConnector.id == connector_id,
-            UserConnector.user_id == user_id
-        ).first()
+        result = await db.execute(
+            select(UserConnector)
+            .options(joinedload(UserConnector.tool))
+            .where(
+                UserConnector.id == connector_id,
+                UserConnector.user_id == user_id
+            )
+        )
+        uc = result.scalars().first()
         
         if not uc:
             raise HTTPException(status_code=404, detail=f"Connector with ID {connector_id} not found")
-            
-        # Get tool details
-        tool = db.query(Tool).filter(Tool.id == uc.tool_id).first()
         
-        # Get status from connector registry
-        from ..services.connector_catalog import CONNECTOR_REGISTRY
-        registry_entry = next((c for c in CONNECTOR_REGISTRY if c["name"] == tool.name), None)
-        status = registry_entry.get("status", "available") if registry_entry else "available"
-        
-        return {
-            "id": str(uc.id),
-            "user_id": str(uc.user_id),
-            "tool_id": str(uc.tool_id),
-            "name": uc.name,
-            "setup_status": uc.setup_status,
-            "config_data": uc.config_data,
-            "created_at": uc.created_at.isoformat() if uc.created_at else None,
-            "updated_at": uc.updated_at.isoformat() if uc.updated_at else None,
-            "connector_type": {
-                "id": str(tool.id),
-                "name": tool.name,
-                "description": tool.description,
-                "tool_type": tool.tool_type,
-                "config_schema": tool.config_schema,
-                "execution_ref": tool.execution_ref,
-                "status": status
-            }
-        }
+        return _serialize_user_connector(uc)
         
     except SQLAlchemyError as e:
         logger.error(f"Error getting user connector: {e}")
         raise HTTPException(status_code=500, detail="Database error retrieving connector")
 
-def update_user_connector(db: Session, user_id: uuid.UUID, connector_id: uuid.UUID, updates: UserConnectorUpdate) -> Dict[str, Any]:
+async def update_user_connector(db: AsyncSession, user_id: uuid.UUID, connector_id: uuid.UUID, updates: UserConnectorUpdate) -> Dict[str, Any]:
     """
     Update a user connector.
     
@@ -179,10 +204,13 @@ def update_user_connector(db: Session, user_id: uuid.UUID, connector_id: uuid.UU
         Updated user connector data
     """
     try:
-        uc = db.query(UserConnector).filter(
-            UserConnector.id == connector_id,
-            UserConnector.user_id == user_id
-        ).first()
+        result = await db.execute(
+            select(UserConnector).where(
+                UserConnector.id == connector_id,
+                UserConnector.user_id == user_id
+            )
+        )
+        uc = result.scalars().first()
         
         if not uc:
             raise HTTPException(status_code=404, detail=f"Connector with ID {connector_id} not found")
@@ -195,20 +223,21 @@ def update_user_connector(db: Session, user_id: uuid.UUID, connector_id: uuid.UU
         if updates.setup_status is not None:
             uc.setup_status = updates.setup_status.value
             
-        db.commit()
-        db.refresh(uc)
+        await db.commit()
+        await db.refresh(uc)
+        _forget_connector_caches(connector_id)
         
         logger.info(f"Updated user connector: {uc.name} for user {user_id}")
         
         # Return updated connector data
-        return get_user_connector(db, user_id, connector_id)
+        return await get_user_connector(db, user_id, connector_id)
         
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error updating user connector: {e}")
         raise HTTPException(status_code=500, detail="Database error updating connector")
 
-def delete_user_connector(db: Session, user_id: uuid.UUID, connector_id: uuid.UUID) -> bool:
+async def delete_user_connector(db: AsyncSession, user_id: uuid.UUID, connector_id: uuid.UUID) -> bool:
     """
     Delete a user connector.
     
@@ -221,32 +250,44 @@ def delete_user_connector(db: Session, user_id: uuid.UUID, connector_id: uuid.UU
         True if deleted successfully
     """
     try:
-        uc = db.query(UserConnector).filter(
-            UserConnector.id == connector_id,
-            UserConnector.user_id == user_id
-        ).first()
+        result = await db.execute(
+            select(UserConnector).where(
+                UserConnector.id == connector_id,
+                UserConnector.user_id == user_id
+            )
+        )
+        uc = result.scalars().first()
         
         if not uc:
             raise HTTPException(status_code=404, detail=f"Connector with ID {connector_id} not found")
             
         # Delete agent connector links first
-        db.query(AgentConnectorLink).filter(
-            AgentConnectorLink.user_connector_id == connector_id
-        ).delete()
+        await db.execute(
+            delete(AgentConnectorLink).where(
+                AgentConnectorLink.user_connector_id == connector_id
+            )
+        )
+
+        # Delete the connector's synced index and sync state
+        await db.execute(delete(GmailMessageLabel).where(GmailMessageLabel.user_connector_id == connector_id))
+        await db.execute(delete(GmailMessage).where(GmailMessage.user_connector_id == connector_id))
+        await db.execute(delete(CalendarEvent).where(CalendarEvent.user_connector_id == connector_id))
+        await db.execute(delete(ConnectorSyncState).where(ConnectorSyncState.user_connector_id == connector_id))
         
         # Delete the connector
-        db.delete(uc)
-        db.commit()
+        await db.delete(uc)
+        await db.commit()
+        _forget_connector_caches(connector_id)
         
         logger.info(f"Deleted user connector: {connector_id} for user {user_id}")
         return True
         
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error deleting user connector: {e}")
         raise HTTPException(status_code=500, detail="Database error deleting connector")
 
-def link_connector_to_agent(db: Session, user_id: uuid.UUID, agent_id: uuid.UUID, connector_id: uuid.UUID) -> Dict[str, Any]:
+async def link_connector_to_agent(db: AsyncSession, user_id: uuid.UUID, agent_id: uuid.UUID, connector_id: uuid.UUID) -> Dict[str, Any]:
     """
     Link a user connector to an agent.
     
@@ -261,28 +302,31 @@ def link_connector_to_agent(db: Session, user_id: uuid.UUID, agent_id: uuid.UUID
     """
     try:
         # Verify agent exists and belongs to user
-        agent = db.query(Agent).filter(
-            Agent.id == agent_id,
-            Agent.user_id == user_id
-        ).first()
+        result = await db.execute(
+            select(Agent).where(
+                Agent.id == agent_id,
+                Agent.user_id == user_id
+            )
+        )
+        agent = result.scalars().first()
         
         if not agent:
             raise HTTPException(status_code=404, detail=f"Agent with ID {agent_id} not found")
             
         # Verify connector exists and belongs to user
-        connector = db.query(UserConnector).filter(
-            UserConnector.id == connector_id,
-            UserConnector.user_id == user_id
-        ).first()
+        result = await db.execute(
+            select(UserConnector).where(
+                UserConnector.id == connector_id,
+                UserConnector.user_id == user_id
+            )
+        )
+        connector = result.scalars().first()
         
         if not connector:
             raise HTTPException(status_code=404, detail=f"Connector with ID {connector_id} not found")
             
         # Check if link already exists
-        existing_link = db.query(AgentConnectorLink).filter(
-            AgentConnectorLink.agent_id == agent_id,
-            AgentConnectorLink.user_connector_id == connector_id
-        ).first()
+        existing_link = await db.get(AgentConnectorLink, (agent_id, connector_id))
         
         if existing_link:
             return {
@@ -298,7 +342,7 @@ def link_connector_to_agent(db: Session, user_id: uuid.UUID, agent_id: uuid.UUID
         )
         
         db.add(link)
-        db.commit()
+        await db.commit()
         
         logger.info(f"Linked connector {connector_id} to agent {agent_id}")
         
@@ -309,11 +353,11 @@ def link_connector_to_agent(db: Session, user_id: uuid.UUID, agent_id: uuid.UUID
         }
         
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error linking connector to agent: {e}")
         raise HTTPException(status_code=500, detail="Database error creating link")
 
-def unlink_connector_from_agent(db: Session, user_id: uuid.UUID, agent_id: uuid.UUID, connector_id: uuid.UUID) -> Dict[str, Any]:
+async def unlink_connector_from_agent(db: AsyncSession, user_id: uuid.UUID, agent_id: uuid.UUID, connector_id: uuid.UUID) -> Dict[str, Any]:
     """
     Unlink a user connector from an agent.
     
@@ -328,23 +372,28 @@ def unlink_connector_from_agent(db: Session, user_id: uuid.UUID, agent_id: uuid.
     """
     try:
         # Verify agent exists and belongs to user
-        agent = db.query(Agent).filter(
-            Agent.id == agent_id,
-            Agent.user_id == user_id
-        ).first()
+        result = await db.execute(
+            select(Agent).where(
+                Agent.id == agent_id,
+                Agent.user_id == user_id
+            )
+        )
+        agent = result.scalars().first()
         
         if not agent:
             raise HTTPException(status_code=404, detail=f"Agent with ID {agent_id} not found")
             
         # Delete the link
-        result = db.query(AgentConnectorLink).filter(
-            AgentConnectorLink.agent_id == agent_id,
-            AgentConnectorLink.user_connector_id == connector_id
-        ).delete()
+        result = await db.execute(
+            delete(AgentConnectorLink).where(
+                AgentConnectorLink.agent_id == agent_id,
+                AgentConnectorLink.user_connector_id == connector_id
+            )
+        )
         
-        db.commit()
+        await db.commit()
         
-        if result == 0:
+        if result.rowcount == 0:
             return {
                 "agent_id": str(agent_id),
                 "connector_id": str(connector_id),
@@ -360,11 +409,11 @@ def unlink_connector_from_agent(db: Session, user_id: uuid.UUID, agent_id: uuid.
         }
         
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error unlinking connector from agent: {e}")
         raise HTTPException(status_code=500, detail="Database error removing link")
 
-def get_agent_connectors(db: Session, user_id: uuid.UUID, agent_id: uuid.UUID) -> List[Dict[str, Any]]:
+async def get_agent_connectors(db: AsyncSession, user_id: uuid.UUID, agent_id: uuid.UUID) -> List[Dict[str, Any]]:
     """
     Get all connectors linked to a specific agent.
     
@@ -378,28 +427,30 @@ def get_agent_connectors(db: Session, user_id: uuid.UUID, agent_id: uuid.UUID) -
     """
     try:
         # Verify agent exists and belongs to user
-        agent = db.query(Agent).filter(
-            Agent.id == agent_id,
-            Agent.user_id == user_id
-        ).first()
+        result = await db.execute(
+            select(Agent).where(
+                Agent.id == agent_id,
+                Agent.user_id == user_id
+            )
+        )
+        agent = result.scalars().first()
         
         if not agent:
             raise HTTPException(status_code=404, detail=f"Agent with ID {agent_id} not found")
         
-        # Get all linked connectors
-        links = db.query(AgentConnectorLink).filter(
-            AgentConnectorLink.agent_id == agent_id
-        ).all()
-        
-        connector_ids = [link.user_connector_id for link in links]
+        # Get all linked connectors with their connector types in one query
+        result = await db.execute(
+            select(UserConnector)
+            .join(AgentConnectorLink, AgentConnectorLink.user_connector_id == UserConnector.id)
+            .options(joinedload(UserConnector.tool))
+            .where(
+                AgentConnectorLink.agent_id == agent_id,
+                UserConnector.user_id == user_id
+            )
+            .order_by(AgentConnectorLink.created_at)
+        )
         
-        # Get connector details
-        result = []
-        for connector_id in connector_ids:
-            connector_data = get_user_connector(db, user_id, connector_id)
-            result.append(connector_data)
-            
-        return result
+        return [_serialize_user_connector(uc) for uc in result.scalars().all()]
         
     except SQLAlchemyError as e:
         logger.error(f"Error getting agent connectors: {e}")
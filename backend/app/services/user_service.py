@@ -1,9 +1,14 @@
-from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..models import User
+from ..security.passwords import verify_and_update_password
+from ..security.principals import invalidate_principal
 from typing import Optional
+from uuid import UUID
 
 
-def get_user_by_email(db: Session, email: str) -> Optional[User]:
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     """
     Get a user by email address.
     
@@ -14,13 +19,48 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
     Returns:
         User object if found, None otherwise
     """
-    return db.query(User).filter(User.email == email).first()
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
 
 
-def get_user_by_id(db: Session, user_id: str) -> Optional[User]:
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
+    """
+    Check a user's email and password.
+    
+    The password is verified off the event loop. If it matches but the stored
+    hash was made under an older hashing policy (e.g. a lower bcrypt cost), the
+    hash is replaced and committed.
+    
+    Args:
+        db: Database session
+        email: User's email address
+        password: Plain text password to check
+        
+    Returns:
+        User object if the credentials are valid, None otherwise
+    """
+    user = await get_user_by_email(db, email)
+    if user is None:
+        return None
+    
+    valid, new_hash = await verify_and_update_password(password, user.hashed_password)
+    if not valid:
+        return None
+    
+    if new_hash is not None:
+        user.hashed_password = new_hash
+        await db.commit()
+    
+    return user
+
+
+async def get_user_by_id(db: AsyncSession, user_id: str) -> Optional[User]:
     """
     Get a user by ID.
     
+    Runs on every authenticated request, so the statement is a lambda: it is
+    built and compiled once and only the ID is bound on later calls.
+    
     Args:
         db: Database session
         user_id: User's ID (UUID)
@@ -28,4 +68,43 @@ def get_user_by_id(db: Session, user_id: str) -> Optional[User]:
     Returns:
         User object if found, None otherwise
     """
-    return db.query(User).filter(User.id == user_id).first() 
\ No newline at end of file
+    result = await db.execute(lambda_stmt(lambda: select(User).where(User.id == user_id)))
+    return result.scalars().first()
+
+
+async def update_user_status(
+    db: AsyncSession,
+    user_id: UUID,
+    is_active: Optional[bool] = None,
+    is_superuser: Optional[bool] = None
+) -> User:
+    """
+    Change a user's active or superuser flag.
+    
+    The user's cached principal is invalidated after the commit, so the
+    change applies from the user's next request.
+    
+    Args:
+        db: Database session
+        user_id: User's ID
+        is_active: New active flag, or None to leave it unchanged
+        is_superuser: New superuser flag, or None to leave it unchanged
+        
+    Returns:
+        The updated user
+        
+    Raises:
+        HTTPException: If the user doesn't exist
+    """
+    user = await get_user_by_id(db, user_id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    
+    if is_active is not None:
+        user.is_active = is_active
+    if is_superuser is not None:
+        user.is_superuser = is_superuser
+    await db.commit()
+    await invalidate_principal(user.id)
+    
+    return user
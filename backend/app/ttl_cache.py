@@ -0,0 +1,78 @@
+"""
+Bounded in-process LRU cache with per-entry expiry.
+
+Not thread-safe; meant for use from the event loop.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    LRU cache whose entries also expire ``ttl`` seconds after being set.
+
+    Args:
+        maxsize: Maximum number of entries; the least recently used entry is
+            dropped when a new one would exceed it
+        ttl: Seconds an entry stays valid
+        on_evict: Called with each value that is evicted, expired, replaced
+            or deleted
+    """
+
+    def __init__(self, maxsize: int, ttl: float, on_evict: Optional[Callable[[V], None]] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, value: V) -> None:
+        if self.on_evict is not None:
+            self.on_evict(value)
+
+    def get(self, key: K) -> Optional[V]:
+        """Get a live entry, or None if it is missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self._drop(value)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def items(self) -> List[Tuple[K, V]]:
+        """Snapshot of the live entries, without changing their recency."""
+        now = time.monotonic()
+        return [(key, value) for key, (expires_at, value) in self._entries.items() if expires_at > now]
+
+    def set(self, key: K, value: V) -> None:
+        """Add or replace an entry, evicting the least recently used if full."""
+        previous = self._entries.pop(key, None)
+        if previous is not None and previous[1] is not value:
+            self._drop(previous[1])
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        while len(self._entries) > self.maxsize:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._drop(evicted)
+
+    def delete(self, key: K) -> None:
+        """Remove an entry if present."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._drop(entry[1])
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        while self._entries:
+            _, (_, value) = self._entries.popitem()
+            self._drop(value)
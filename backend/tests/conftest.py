@@ -0,0 +1,93 @@
+"""
+Shared test fixtures.
+
+Tests run against a throwaway SQLite database, never the DATABASE_URL of the
+environment: set TEST_DATABASE_URL to run them against another database.
+Rate limiting is off unless RATE_LIMIT_ENABLED is set.
+"""
+
+import os
+import tempfile
+
+_DATABASE_FILE = os.path.join(tempfile.mkdtemp(prefix="agentbase-tests-"), "test.db")
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL", f"sqlite:///{_DATABASE_FILE}")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db.instrumentation import assert_query_budget
+from app.db.session import AsyncSessionLocal, async_engine, engine
+from app.main import app
+from app.models import Base
+
+# Credentials of the superuser created by the auth_headers fixture
+ADMIN_EMAIL = "admin@example.com"
+ADMIN_PASSWORD = "Passw0rd-for-tests"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def schema():
+    """Create all tables for one test and drop them afterwards."""
+    Base.metadata.create_all(engine)
+    yield
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+async def db(schema):
+    """Async session on a fresh schema."""
+    async with AsyncSessionLocal() as session:
+        yield session
+    # Pooled aiosqlite connections belong to this test's event loop
+    await async_engine.dispose()
+
+
+@pytest.fixture
+def client(schema):
+    """Test client for the app on a fresh schema, with the lifespan running."""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Authorization header of a superuser created through first-time setup."""
+    response = client.post("/api/v1/setup", json={
+        "email": ADMIN_EMAIL,
+        "password": ADMIN_PASSWORD,
+        "api_key_provider": "OpenAI",
+        "api_key_value": "sk-test-0123456789abcdef",
+    })
+    assert response.status_code == 201, response.text
+    response = client.post("/api/v1/auth/token", data={"username": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def query_budget_for(client):
+    """
+    Request an endpoint and fail if it issues more SQL statements than allowed.
+
+    Usage:
+
+        def test_list_agents(query_budget_for, auth_headers):
+            query_budget_for("GET", "/api/v1/agents", 2, headers=auth_headers)
+
+    The statement count comes from the X-DB-Query-Count header set by
+    QueryMetricsMiddleware and covers the whole request, authentication
+    included.
+    """
+    def request(method, url, max_statements, expected_status=200, **kwargs):
+        response = client.request(method, url, **kwargs)
+        assert response.status_code == expected_status, response.text
+        assert_query_budget(response, max_statements)
+        return response
+
+    return request
@@ -0,0 +1,29 @@
+"""Access tokens: authentication cost of unknown tokens and who may mint tokens."""
+
+
+def _bogus_token(i):
+    return {"Authorization": f"Bearer abt_{i:016x}_not-a-real-secret"}
+
+
+def test_unknown_prefix_is_looked_up_once(client):
+    first = client.get("/api/v1/users/me", headers=_bogus_token(1))
+    again = client.get("/api/v1/users/me", headers=_bogus_token(1))
+    assert first.status_code == again.status_code == 401
+    assert int(first.headers["X-DB-Query-Count"]) == 1
+    assert int(again.headers["X-DB-Query-Count"]) == 0
+
+
+def test_malformed_prefix_is_rejected_without_a_lookup(client):
+    response = client.get("/api/v1/users/me", headers={"Authorization": "Bearer abt_nothex_secret"})
+    assert response.status_code == 401
+    assert int(response.headers["X-DB-Query-Count"]) == 0
+
+
+def test_access_token_cannot_mint_access_tokens(client, auth_headers):
+    response = client.post("/api/v1/users/me/access-tokens", json={"name": "ci"}, headers=auth_headers)
+    assert response.status_code == 201, response.text
+    token_headers = {"Authorization": f"Bearer {response.json()['token']}"}
+
+    assert client.get("/api/v1/users/me", headers=token_headers).status_code == 200
+    response = client.post("/api/v1/users/me/access-tokens", json={"name": "more"}, headers=token_headers)
+    assert response.status_code == 403
@@ -0,0 +1,22 @@
+"""API keys: the stored display form never contains the key itself."""
+from app.security import SECRET_MASK
+
+
+def test_short_key_is_stored_masked(client, auth_headers):
+    response = client.post(
+        "/api/v1/users/me/api-keys",
+        json={"provider_name": "custom", "api_key": "short"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 201, response.text
+    assert response.json()["masked_key"] == SECRET_MASK
+
+
+def test_long_key_keeps_its_ends(client, auth_headers):
+    response = client.post(
+        "/api/v1/users/me/api-keys",
+        json={"provider_name": "custom", "api_key": "sk-0123456789"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 201, response.text
+    assert response.json()["masked_key"] == "sk-0•••••6789"
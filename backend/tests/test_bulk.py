@@ -0,0 +1,91 @@
+"""
+Bulk import and export on SQLite, which stages records with executemany.
+"""
+
+import json
+
+import pytest
+
+from app.api.v1.endpoints import bulk as bulk_endpoints
+
+DOCUMENT = [
+    {"type": "agent", "name": "Researcher", "description": "Finds things",
+     "llm_provider": "OpenAI", "llm_model": "gpt-4o"},
+    {"type": "agent", "name": "Writer", "system_prompt": "Write clearly"},
+    {"type": "connector", "name": "My search", "connector_type": "Web Search",
+     "config_data": {"search_engine": "bing"}},
+    {"type": "link", "agent_name": "Researcher", "connector_name": "My search"},
+]
+
+
+def _ndjson(records) -> str:
+    return "".join(json.dumps(record) + "\n" for record in records)
+
+
+def _import(client, auth_headers, records, **params):
+    return client.post("/api/v1/bulk/import", content=_ndjson(records), params=params, headers=auth_headers)
+
+
+def test_dry_run_counts_without_writing(client, auth_headers):
+    response = _import(client, auth_headers, DOCUMENT, dry_run="true")
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["dry_run"] is True
+    assert body["agents"] == {"received": 2, "inserted": 2, "skipped": 0}
+    assert body["connectors"] == {"received": 1, "inserted": 1, "skipped": 0}
+    assert body["links"] == {"received": 1, "inserted": 1, "skipped": 0}
+    assert client.get("/api/v1/agents", headers=auth_headers).json()["agents"] == []
+
+
+def test_existing_names_are_skipped_or_rejected(client, auth_headers):
+    assert _import(client, auth_headers, DOCUMENT).status_code == 200
+
+    response = _import(client, auth_headers, DOCUMENT[:2], on_conflict="skip")
+    assert response.status_code == 200, response.text
+    assert response.json()["agents"] == {"received": 2, "inserted": 0, "skipped": 2}
+
+    response = _import(client, auth_headers, DOCUMENT[:2], on_conflict="error")
+    assert response.status_code == 400
+    assert response.json()["detail"]["errors"] == [
+        "line 1: agent 'Researcher' already exists",
+        "line 2: agent 'Writer' already exists",
+    ]
+
+
+def test_unresolved_references_reject_the_import(client, auth_headers):
+    response = _import(client, auth_headers, [
+        {"type": "agent", "name": "Agent", "llm_provider": "openai", "llm_model": "no-such-model"},
+        {"type": "connector", "name": "Connector", "connector_type": "No Such Type"},
+    ])
+    assert response.status_code == 400
+    assert response.json()["detail"]["errors"] == [
+        "line 1: no LLM configuration for provider 'openai' and model 'no-such-model'",
+        "line 2: unknown connector type 'No Such Type'",
+    ]
+    assert client.get("/api/v1/agents", headers=auth_headers).json()["agents"] == []
+
+
+def test_ndjson_export_round_trips(client, auth_headers):
+    assert _import(client, auth_headers, DOCUMENT).status_code == 200
+    exported = client.get("/api/v1/bulk/export", headers=auth_headers)
+    assert exported.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in exported.text.splitlines()]
+    assert {(r["type"], r.get("name") or r["agent_name"]) for r in records} == {
+        ("agent", "Researcher"), ("agent", "Writer"), ("connector", "My search"), ("link", "Researcher")
+    }
+
+    # Re-importing the export finds everything already there
+    response = client.post("/api/v1/bulk/import", content=exported.text, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert all(counts["inserted"] == 0 for counts in (response.json()[k] for k in ("agents", "connectors", "links")))
+
+
+def test_oversized_uploads_are_refused(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(bulk_endpoints, "BULK_MAX_BYTES", 100)
+    response = _import(client, auth_headers, DOCUMENT)
+    assert response.status_code == 413
+
+    # Without a Content-Length the body is counted while it is read
+    chunks = iter([_ndjson(DOCUMENT).encode()])
+    response = client.post("/api/v1/bulk/import", content=chunks, headers=auth_headers)
+    assert response.status_code == 413
@@ -0,0 +1,77 @@
+"""
+Calendar store sync: large calendars and the sliding event window.
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from app.connectors import CalendarConnector, LocalCalendarApi, LocalTokenEndpoint, OAuthCredentials, TokenManager
+from app.connectors import calendar as calendar_module
+from app.connectors.sync import MAX_BIND_PARAMETERS, batched
+from app.db.session import AsyncSessionLocal
+from app.models import CalendarEvent, Tool, User, UserConnector
+from app.security import encrypt_data
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def connector_id(db):
+    user = User(id=uuid.uuid4(), email="calendar@example.com", hashed_password="x")
+    tool = Tool(id=uuid.uuid4(), name="Google Calendar", description="d", tool_type="oauth2",
+                execution_ref="connectors.calendar")
+    connector = UserConnector(
+        id=uuid.uuid4(), user=user, tool=tool, name="calendar", setup_status="active",
+        encrypted_credentials=encrypt_data(OAuthCredentials("client", "secret", "refresh").to_json())
+    )
+    db.add_all([user, tool, connector])
+    await db.commit()
+    return connector.id
+
+
+def _connector(api: LocalCalendarApi, **kwargs) -> CalendarConnector:
+    tokens = TokenManager(endpoint=LocalTokenEndpoint())
+    return CalendarConnector(api=api, session_factory=AsyncSessionLocal, tokens=tokens, max_age=0, **kwargs)
+
+
+async def _stored(db, connector_id) -> int:
+    return await db.scalar(select(func.count()).where(CalendarEvent.user_connector_id == connector_id))
+
+
+def test_batches_stay_within_the_bind_parameter_limit():
+    columns = len(CalendarEvent.__table__.columns)
+    batches = list(batched(list(range(10000)), columns))
+    assert [item for batch in batches for item in batch] == list(range(10000))
+    assert all(len(batch) * columns <= MAX_BIND_PARAMETERS for batch in batches)
+
+
+# asyncpg allows 32767 bind parameters per statement, i.e. 4095 rows of 8 columns;
+# run with TEST_DATABASE_URL set to a Postgres database to exercise that limit
+async def test_full_sync_stores_more_events_than_fit_one_statement(db, connector_id):
+    api = LocalCalendarApi(page_size=2500)
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    for i in range(5000):
+        api.add_event(f"event {i}", start + timedelta(minutes=10 * i), start + timedelta(minutes=10 * i + 5))
+    await _connector(api).sync(connector_id)
+    assert await _stored(db, connector_id) == 5000
+
+
+async def test_events_entering_the_window_appear_after_a_full_resync(db, connector_id, monkeypatch):
+    api = LocalCalendarApi()
+    start = datetime.now(timezone.utc) + timedelta(days=3)
+    api.add_event("later", start, start + timedelta(hours=1))
+
+    monkeypatch.setattr(calendar_module, "CALENDAR_FUTURE_DAYS", 1)
+    await _connector(api).sync(connector_id)
+    assert await _stored(db, connector_id) == 0
+
+    # The window now reaches the event, but it has not changed since the last sync
+    monkeypatch.setattr(calendar_module, "CALENDAR_FUTURE_DAYS", 5)
+    await _connector(api, full_sync_interval=3600).sync(connector_id, force=True)
+    assert await _stored(db, connector_id) == 0
+
+    await _connector(api, full_sync_interval=0).sync(connector_id, force=True)
+    assert await _stored(db, connector_id) == 1
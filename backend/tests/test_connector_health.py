@@ -0,0 +1,115 @@
+"""
+Connector health checks, run with StubProbe instead of provider calls.
+"""
+
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import select, update
+
+from app.connectors import HealthCheckScheduler, ProbeOutcome, StubProbe
+from app.db.instrumentation import query_budget
+from app.db.session import AsyncSessionLocal
+from app.models import Tool, User, UserConnector
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def seed(db):
+    """Create connectors of a connector type; returns a function taking their statuses."""
+    user = User(id=uuid.uuid4(), email="health@example.com", hashed_password="x")
+    db.add(user)
+    tools = {}
+
+    async def create(*statuses, tool_name="Tool"):
+        if tool_name not in tools:
+            tools[tool_name] = Tool(id=uuid.uuid4(), name=tool_name, description="d", tool_type="api_key",
+                                    execution_ref=f"connectors.{tool_name.lower()}")
+        connectors = [
+            UserConnector(id=uuid.uuid4(), user=user, tool=tools[tool_name], name=f"{tool_name} {i}", setup_status=status)
+            for i, status in enumerate(statuses)
+        ]
+        db.add_all(connectors)
+        await db.commit()
+        return [connector.id for connector in connectors]
+
+    return create
+
+
+async def _statuses(db, ids):
+    db.expire_all()
+    rows = await db.execute(select(UserConnector.id, UserConnector.setup_status).where(UserConnector.id.in_(ids)))
+    return dict(rows.all())
+
+
+def _scheduler(probe, **kwargs) -> HealthCheckScheduler:
+    return HealthCheckScheduler(AsyncSessionLocal, jitter=0, probe=probe, **kwargs)
+
+
+async def test_status_changes_are_written_in_one_statement_per_batch(db, seed):
+    recovered, revoked, healthy = await seed("error", "active", "active")
+    probe = StubProbe(outcomes={revoked: ProbeOutcome.UNHEALTHY})
+
+    # One read and one write for the batch
+    with query_budget(2):
+        summary = await _scheduler(probe).run_once()
+
+    assert summary == {"healthy": 2, "unhealthy": 1, "changed": 2}
+    assert await _statuses(db, [recovered, revoked, healthy]) == {
+        recovered: "active", revoked: "error", healthy: "active"
+    }
+
+
+async def test_unknown_outcomes_leave_the_status_alone(db, seed):
+    ids = await seed("error", "active")
+    summary = await _scheduler(StubProbe(ProbeOutcome.UNKNOWN)).run_once()
+    assert summary == {"unknown": 2, "changed": 0}
+    assert await _statuses(db, ids) == dict(zip(ids, ["error", "active"]))
+
+
+class PatchingProbe(StubProbe):
+    """Stub probe whose connector is PATCHed by its owner while being checked."""
+
+    async def check(self, target):
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(UserConnector).where(UserConnector.id == target.connector_id).values(setup_status="needs_setup")
+            )
+            await db.commit()
+        return await super().check(target)
+
+
+async def test_a_concurrent_patch_wins_over_the_check(db, seed):
+    [connector_id] = await seed("active")
+    summary = await _scheduler(PatchingProbe(ProbeOutcome.UNHEALTHY)).run_once()
+    assert summary["changed"] == 0
+    assert await _statuses(db, [connector_id]) == {connector_id: "needs_setup"}
+
+
+class CountingProbe(StubProbe):
+    """Stub probe recording the most checks it ran at once per connector type."""
+
+    def __init__(self):
+        super().__init__(delay=0.01)
+        self.running = {}
+        self.peak = {}
+
+    async def check(self, target):
+        kind = target.connector_type
+        self.running[kind] = self.running.get(kind, 0) + 1
+        self.peak[kind] = max(self.peak.get(kind, 0), self.running[kind])
+        try:
+            return await super().check(target)
+        finally:
+            self.running[kind] -= 1
+
+
+async def test_concurrency_is_bounded_per_connector_type(seed):
+    await seed(*["active"] * 8, tool_name="Slow")
+    await seed(*["active"] * 8, tool_name="Fast")
+    probe = CountingProbe()
+    summary = await _scheduler(probe, concurrency=3).run_once()
+    assert summary["healthy"] == 16
+    assert probe.peak == {"Slow": 3, "Fast": 3}
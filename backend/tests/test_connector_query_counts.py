@@ -0,0 +1,61 @@
+"""
+The user connector endpoints must issue a fixed number of SQL statements,
+however many connectors a user has.
+"""
+
+import uuid
+
+import pytest
+
+from app.db.instrumentation import query_budget
+from app.models import Agent, AgentConnectorLink, Tool, User, UserConnector
+from app.services.user_connector_service import get_agent_connectors, get_user_connectors
+
+pytestmark = pytest.mark.anyio
+
+
+async def _seed_user(db, tools, connectors):
+    """Create a user with an agent linked to `connectors` connectors spread over `tools`."""
+    user = User(id=uuid.uuid4(), email=f"{uuid.uuid4().hex}@example.com", hashed_password="x")
+    agent = Agent(id=uuid.uuid4(), user=user, name="agent")
+    db.add_all([user, agent])
+    for i in range(connectors):
+        connector = UserConnector(
+            id=uuid.uuid4(), user=user, tool=tools[i % len(tools)], name=f"connector {i}", setup_status="active"
+        )
+        db.add_all([connector, AgentConnectorLink(agent=agent, user_connector=connector)])
+    await db.commit()
+    return user.id, agent.id
+
+
+@pytest.fixture
+async def users(db):
+    tools = [
+        Tool(id=uuid.uuid4(), name=f"tool {i}", description="d", tool_type="api_key", execution_ref=f"connectors.t{i}")
+        for i in range(3)
+    ]
+    db.add_all(tools)
+    few = await _seed_user(db, tools, 4)
+    many = await _seed_user(db, tools, 12)
+    db.expunge_all()
+    return few, many
+
+
+async def test_user_connector_list_query_count_is_constant(db, users):
+    counts = []
+    for user_id, _ in users:
+        with query_budget(2) as stats:
+            connectors, _ = await get_user_connectors(db, user_id, include_details=True)
+        assert all(c["connector_type"] for c in connectors)
+        counts.append(stats.count)
+    assert counts[0] == counts[1]
+
+
+async def test_agent_connectors_query_count_is_constant(db, users):
+    counts = []
+    for (user_id, agent_id), expected in zip(users, (4, 12)):
+        with query_budget(2) as stats:
+            connectors = await get_agent_connectors(db, user_id, agent_id)
+        assert len(connectors) == expected
+        counts.append(stats.count)
+    assert counts[0] == counts[1]
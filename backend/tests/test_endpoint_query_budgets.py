@@ -0,0 +1,49 @@
+"""
+Per-endpoint SQL statement budgets.
+
+Budgets are the current statement counts; an endpoint going over its budget
+(typically an N+1 query) fails the test.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def seeded(client, auth_headers):
+    """An agent with an LLM config and several linked connectors."""
+    config_id = client.get("/api/v1/users/me/llm-configs", headers=auth_headers).json()[0]["id"]
+    for i in range(3):
+        response = client.post("/api/v1/agents", json={"name": f"agent {i}", "llm_config_id": config_id},
+                               headers=auth_headers)
+        assert response.is_success, response.text
+    agent_id = response.json()["id"]
+    tool_ids = [c["id"] for c in client.get("/api/v1/connectors/catalog", headers=auth_headers).json()["connectors"]]
+    for i in range(6):
+        response = client.post("/api/v1/connectors/user", json={"name": f"connector {i}", "tool_id": tool_ids[i % len(tool_ids)]},
+                               headers=auth_headers)
+        assert response.is_success, response.text
+        client.post(f"/api/v1/connectors/user/{response.json()['id']}/link/{agent_id}", headers=auth_headers)
+    return agent_id
+
+
+def test_agent_endpoint_budgets(query_budget_for, auth_headers, seeded):
+    query_budget_for("GET", "/api/v1/agents", 2, headers=auth_headers)
+    query_budget_for("GET", f"/api/v1/agents/{seeded}", 2, headers=auth_headers)
+    query_budget_for("GET", f"/api/v1/agents/{seeded}/chat", 3, headers=auth_headers)
+
+
+def test_connector_endpoint_budgets(query_budget_for, auth_headers, seeded):
+    query_budget_for("GET", "/api/v1/connectors/catalog", 0, headers=auth_headers)
+    query_budget_for("GET", "/api/v1/connectors/user", 2, params={"include_details": "true"}, headers=auth_headers)
+    query_budget_for("GET", f"/api/v1/connectors/agent/{seeded}", 2, headers=auth_headers)
+
+
+def test_revalidation_is_cheaper_than_a_full_response(query_budget_for, auth_headers, seeded):
+    etag = query_budget_for("GET", "/api/v1/agents", 2, headers=auth_headers).headers["ETag"]
+    query_budget_for("GET", "/api/v1/agents", 1, expected_status=304, headers={**auth_headers, "If-None-Match": etag})
+
+
+def test_metrics_endpoints_require_a_superuser(client, auth_headers):
+    for path in ("/health/db", "/health/queries"):
+        assert client.get(path).status_code == 401
+        assert client.get(path, headers=auth_headers).status_code == 200
@@ -0,0 +1,33 @@
+"""
+Conditional GET behaviour of per-user connector resources.
+"""
+
+import pytest
+
+from app.api import etag as etag_module
+from app.api.v1.endpoints import connectors as connectors_endpoints
+
+
+@pytest.fixture
+def connector_id(client, auth_headers):
+    """A user connector of the first catalog connector type."""
+    tool_id = client.get("/api/v1/connectors/catalog", headers=auth_headers).json()["connectors"][0]["id"]
+    response = client.post("/api/v1/connectors/user", json={"name": "connector", "tool_id": tool_id},
+                           headers=auth_headers)
+    assert response.is_success, response.text
+    return response.json()["id"]
+
+
+@pytest.mark.parametrize("path", ["/api/v1/connectors/user", "/api/v1/connectors/user/{connector_id}"])
+def test_connector_etags_follow_the_registry_and_build(client, auth_headers, connector_id, monkeypatch, path):
+    url = path.format(connector_id=connector_id)
+    etag = client.get(url, headers=auth_headers).headers["ETag"]
+    conditional = {**auth_headers, "If-None-Match": etag}
+    assert client.get(url, headers=conditional).status_code == 304
+
+    monkeypatch.setattr(connectors_endpoints, "CONNECTOR_CATALOG_VERSION", "changed-registry")
+    assert client.get(url, headers=conditional).status_code == 200
+
+    monkeypatch.undo()
+    monkeypatch.setattr(etag_module, "BUILD_ID", "next-build")
+    assert client.get(url, headers=conditional).status_code == 200
@@ -0,0 +1,115 @@
+"""
+Gmail index sync against the in-memory LocalGmailApi.
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.connectors import GmailConnector, LocalGmailApi, LocalTokenEndpoint, OAuthCredentials, TokenManager
+from app.db.session import AsyncSessionLocal
+from app.models import GmailMessage, Tool, User, UserConnector
+from app.security import encrypt_data
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def connector_id(db):
+    user = User(id=uuid.uuid4(), email="gmail@example.com", hashed_password="x")
+    tool = Tool(id=uuid.uuid4(), name="Gmail", description="d", tool_type="oauth2", execution_ref="connectors.gmail")
+    connector = UserConnector(
+        id=uuid.uuid4(), user=user, tool=tool, name="gmail", setup_status="active",
+        encrypted_credentials=encrypt_data(OAuthCredentials("client", "secret", "refresh").to_json())
+    )
+    db.add_all([user, tool, connector])
+    await db.commit()
+    return connector.id
+
+
+@pytest.fixture
+def api():
+    api = LocalGmailApi()
+    now = datetime.now(timezone.utc)
+    for i in range(5):
+        api.add_message(f"sender{i}@example.com", f"Subject {i}", f"Body {i}", received_at=now - timedelta(hours=i))
+    # Outside the 30 day index window
+    api.add_message("old@example.com", "Old", "Old body", received_at=now - timedelta(days=60))
+    return api
+
+
+def _connector(api: LocalGmailApi) -> GmailConnector:
+    return GmailConnector(
+        api=api, session_factory=AsyncSessionLocal, tokens=TokenManager(endpoint=LocalTokenEndpoint()), max_age=0
+    )
+
+
+async def _indexed(db, connector_id) -> dict:
+    db.expire_all()
+    rows = (await db.execute(
+        select(GmailMessage).where(GmailMessage.user_connector_id == connector_id)
+    )).scalars()
+    return {row.message_id: row for row in rows}
+
+
+async def test_backfill_fills_the_index(db, connector_id, api):
+    await _connector(api).sync(connector_id)
+    indexed = await _indexed(db, connector_id)
+    assert len(indexed) == 5
+    assert {row.subject for row in indexed.values()} == {f"Subject {i}" for i in range(5)}
+    assert all(row.label_ids == ["INBOX", "UNREAD"] for row in indexed.values())
+
+
+async def test_history_sync_applies_adds_label_changes_and_deletes(db, connector_id, api):
+    gmail = _connector(api)
+    await gmail.sync(connector_id)
+    first, second = sorted(await _indexed(db, connector_id))[:2]
+
+    added = api.add_message("new@example.com", "New", "New body")
+    api.set_labels(first, ["INBOX"])
+    api.delete_message(second)
+    await gmail.sync(connector_id, force=True)
+
+    indexed = await _indexed(db, connector_id)
+    assert api.calls["list_history"] == 1
+    assert indexed[added].subject == "New"
+    assert indexed[first].label_ids == ["INBOX"]
+    assert second not in indexed
+    assert len(indexed) == 5
+
+
+async def test_label_search_follows_label_changes(connector_id, api):
+    gmail = _connector(api)
+    await gmail.sync(connector_id)
+    newest = max(api.messages.values(), key=lambda m: int(m["internalDate"]))["id"]
+    api.set_labels(newest, ["INBOX"])
+
+    unread = await gmail.search_messages(connector_id, label="UNREAD", limit=3)
+    assert [m["subject"] for m in unread] == ["Subject 1", "Subject 2", "Subject 3"]
+    assert [m["id"] for m in await gmail.search_messages(connector_id, label="INBOX", limit=1)] == [newest]
+    assert await gmail.search_messages(connector_id, label="STARRED") == []
+
+
+async def test_expired_history_id_resyncs_in_full(db, connector_id, api):
+    gmail = _connector(api)
+    await gmail.sync(connector_id)
+    gone = next(iter(await _indexed(db, connector_id)))
+    # Deleted without a history record, so only a full resync can notice
+    del api.messages[gone]
+    api.oldest_history_id = api.history_id + 1
+
+    await gmail.sync(connector_id, force=True)
+    assert api.calls["list_messages"] == 2
+    assert gone not in await _indexed(db, connector_id)
+
+
+async def test_get_message_fetches_the_body_once(connector_id, api):
+    gmail = _connector(api)
+    message_id = next(iter(api.messages))
+    first = await gmail.get_message(connector_id, message_id)
+    second = await gmail.get_message(connector_id, message_id)
+    assert first["body"].startswith("Body")
+    assert second == first
+    assert api.calls["get_message_full"] == 1
@@ -0,0 +1,68 @@
+"""
+OAuth token caching: what counts as a use of a connector, and when cached
+tokens are dropped.
+"""
+
+import uuid
+
+import pytest
+
+from app.connectors import LocalTokenEndpoint, OAuthCredentials, TokenManager, token_manager
+from app.connectors.health import ProbeOutcome, ProbeTarget
+from app.connectors.oauth import OAuthProbe
+from app.models import Tool, User, UserConnector
+from app.schemas.connector_schemas import UserConnectorUpdate
+from app.security import encrypt_data
+from app.services.user_connector_service import delete_user_connector, update_user_connector
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def connector(db):
+    """An OAuth connector with a refresh token but no access token yet."""
+    user = User(id=uuid.uuid4(), email="oauth@example.com", hashed_password="x")
+    tool = Tool(id=uuid.uuid4(), name="Gmail", description="d", tool_type="oauth2", execution_ref="connectors.gmail")
+    connector = UserConnector(
+        id=uuid.uuid4(), user=user, tool=tool, name="gmail", setup_status="active",
+        encrypted_credentials=encrypt_data(OAuthCredentials("client", "secret", "refresh").to_json())
+    )
+    db.add_all([user, tool, connector])
+    await db.commit()
+    return connector
+
+
+def _manager(**kwargs) -> TokenManager:
+    return TokenManager(endpoint=LocalTokenEndpoint(), refresh_ahead=1, **kwargs)
+
+
+async def test_health_probe_does_not_keep_tokens_warm(connector):
+    manager = _manager(keep_warm=3600)
+    target = ProbeTarget(
+        connector.id, connector.user_id, "Gmail", None, connector.encrypted_credentials, None
+    )
+    result = await OAuthProbe(manager).check(target)
+    assert result.outcome == ProbeOutcome.HEALTHY
+
+    # Tokens only the probe fetched are dropped, not refreshed, on the next scan
+    assert await manager.refresh_due() == 0
+    assert manager._tokens.get(connector.id) is None
+
+
+async def test_tool_calls_keep_tokens_warm(connector):
+    manager = _manager(keep_warm=3600)
+    await manager.get_access_token(connector.id)
+    await manager.refresh_due()
+    assert manager._tokens.get(connector.id) is not None
+
+
+async def test_connector_changes_drop_cached_tokens(db, connector, monkeypatch):
+    monkeypatch.setattr(token_manager, "endpoint", LocalTokenEndpoint())
+    await token_manager.check(connector.id)
+    assert token_manager._tokens.get(connector.id) is not None
+    await update_user_connector(db, connector.user_id, connector.id, UserConnectorUpdate(name="renamed"))
+    assert token_manager._tokens.get(connector.id) is None
+
+    await token_manager.check(connector.id)
+    await delete_user_connector(db, connector.user_id, connector.id)
+    assert token_manager._tokens.get(connector.id) is None
@@ -0,0 +1,48 @@
+"""Rate limiting: clients cannot escape their buckets with made-up credentials."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.middleware import rate_limit
+from app.middleware.rate_limit import RateLimitMiddleware, parse_limits
+
+
+@pytest.fixture
+def limited_client(schema, monkeypatch):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", True)
+    # Fresh buckets for each test
+    for middleware in app.user_middleware:
+        if middleware.cls is RateLimitMiddleware:
+            monkeypatch.setitem(middleware.kwargs, "limits", parse_limits(rate_limit.DEFAULT_RATE_LIMITS))
+    app.middleware_stack = None
+    with TestClient(app) as client:
+        yield client
+    app.middleware_stack = None
+
+
+def _login(client, headers=None):
+    return client.post("/api/v1/auth/token", data={"username": "nobody@example.com", "password": "wrong"},
+                       headers=headers or {})
+
+
+def test_login_is_limited_per_ip(limited_client):
+    statuses = [_login(limited_client).status_code for _ in range(11)]
+    assert statuses[-1] == 429
+
+
+def test_random_access_tokens_do_not_open_fresh_login_buckets(limited_client):
+    statuses = [
+        _login(limited_client, {"Authorization": f"Bearer abt_{i:016x}_secret"}).status_code
+        for i in range(11)
+    ]
+    assert statuses[-1] == 429
+
+
+def test_random_access_tokens_share_the_ip_bucket(limited_client):
+    remaining = [
+        int(limited_client.get("/api/v1/users/me", headers={"Authorization": f"Bearer abt_{i:016x}_s"})
+            .headers["RateLimit-Remaining"])
+        for i in range(3)
+    ]
+    assert remaining == sorted(remaining, reverse=True) and remaining[0] > remaining[-1]
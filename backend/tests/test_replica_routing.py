@@ -0,0 +1,63 @@
+"""Read-your-writes stickiness of replica routing, across workers through Redis."""
+
+import time
+import uuid
+
+import anyio
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.db import routing
+from app.db.routing import ReplicaRouter
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeRedis:
+    """The string commands ReplicaRouter uses, with PX expiry."""
+
+    def __init__(self):
+        self.expires = {}
+        self.down = False
+
+    async def set(self, key, value, px):
+        if self.down:
+            raise RedisConnectionError("down")
+        self.expires[key] = time.monotonic() + px / 1000
+
+    async def exists(self, key):
+        if self.down:
+            raise RedisConnectionError("down")
+        return int(self.expires.get(key, 0) > time.monotonic())
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(routing, "get_redis", lambda: client)
+    return client
+
+
+async def test_writes_keep_reads_on_the_primary_on_every_worker(redis):
+    worker_a, worker_b = ReplicaRouter(sticky_seconds=0.2), ReplicaRouter(sticky_seconds=0.2)
+    user_id = uuid.uuid4()
+    assert not await worker_b.is_sticky(user_id)
+
+    worker_a.record_write(user_id)
+    await anyio.sleep(0)  # let the marker write run
+    assert await worker_a.is_sticky(user_id)
+    assert await worker_b.is_sticky(user_id)
+    assert not await worker_b.is_sticky(uuid.uuid4())
+
+    await anyio.sleep(0.25)
+    assert not await worker_b.is_sticky(user_id)
+
+
+async def test_without_redis_stickiness_is_per_worker(redis):
+    redis.down = True
+    worker_a, worker_b = ReplicaRouter(), ReplicaRouter()
+    user_id = uuid.uuid4()
+    worker_a.record_write(user_id)
+    await anyio.sleep(0)
+    assert await worker_a.is_sticky(user_id)
+    assert not await worker_b.is_sticky(user_id)
@@ -0,0 +1,77 @@
+"""JWT revocation list: checks stay off Redis except for bloom filter hits."""
+
+import time
+
+import pytest
+
+from app.security import revocation
+from app.security.revocation import RevocationList
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeRedis:
+    """The sorted-set commands RevocationList uses, counting calls."""
+
+    def __init__(self):
+        self.scores = {}
+        self.calls = []
+
+    async def zadd(self, key, mapping, nx=False):
+        self.calls.append("zadd")
+        added = 0
+        for member, score in mapping.items():
+            if not (nx and member in self.scores):
+                added += member not in self.scores
+                self.scores[member] = score
+        return added
+
+    async def zremrangebyscore(self, key, low, high):
+        self.calls.append("zremrangebyscore")
+        for member in [m for m, score in self.scores.items() if score <= high]:
+            del self.scores[member]
+
+    async def zrange(self, key, start, stop):
+        self.calls.append("zrange")
+        return list(self.scores)
+
+    async def zscore(self, key, member):
+        self.calls.append("zscore")
+        return self.scores.get(member)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(revocation, "get_redis", lambda: client)
+    return client
+
+
+async def test_checks_use_the_bloom_filter_and_never_rebuild_it(redis):
+    revoked = RevocationList(refresh_seconds=60)
+    other_worker = RevocationList(refresh_seconds=60)
+    await other_worker.revoke("stolen", time.time() + 600)
+    await revoked.refresh()
+    redis.calls.clear()
+
+    for i in range(100):
+        assert not await revoked.is_revoked(f"token-{i}")
+    assert await revoked.is_revoked("stolen")
+    assert "zrange" not in redis.calls
+    assert redis.calls.count("zscore") <= 2
+
+
+async def test_without_a_filter_checks_go_to_redis(redis):
+    revoked = RevocationList(refresh_seconds=60)
+    await RevocationList().revoke("stolen", time.time() + 600)
+    assert await revoked.is_revoked("stolen")
+    assert not await revoked.is_revoked("fine")
+    assert redis.calls.count("zrange") == 0
+
+
+async def test_own_revocations_survive_a_rebuild(redis):
+    revoked = RevocationList(refresh_seconds=60)
+    await revoked.refresh()
+    await revoked.revoke("mine", time.time() + 600)
+    await revoked.refresh()
+    assert await revoked.is_revoked("mine")
@@ -0,0 +1,58 @@
+"""
+Web search result caching.
+"""
+
+import uuid
+
+import anyio
+import pytest
+
+from app.connectors import LocalSearchProvider, WebSearchConnector
+from app.connectors import web_search as web_search_module
+from app.connectors.web_search import web_search
+from app.models import Tool, User, UserConnector
+from app.schemas.connector_schemas import UserConnectorUpdate
+from app.services.user_connector_service import update_user_connector
+
+pytestmark = pytest.mark.anyio
+
+RESULTS = {"fastapi": [("FastAPI", "https://fastapi.tiangolo.com/")]}
+
+
+async def test_complete_results_are_cached():
+    provider = LocalSearchProvider(results=RESULTS)
+    connector = WebSearchConnector(providers=[provider])
+    connector_id = uuid.uuid4()
+    assert not (await connector.search(connector_id, "FastAPI"))["cached"]
+    assert (await connector.search(connector_id, " fastapi "))["cached"]
+    assert provider.calls == ["fastapi"]
+
+
+async def test_degraded_results_expire_quickly(monkeypatch):
+    monkeypatch.setattr(web_search_module, "WEB_SEARCH_DEGRADED_CACHE_TTL", 0.05)
+    failing = LocalSearchProvider("failing", fail=True)
+    connector = WebSearchConnector(providers=[LocalSearchProvider(results=RESULTS), failing])
+    connector_id = uuid.uuid4()
+
+    result = await connector.search(connector_id, "fastapi")
+    assert result["providers"] == {"local": "ok", "failing": "error"}
+    assert (await connector.search(connector_id, "fastapi"))["cached"]
+
+    await anyio.sleep(0.1)
+    assert not (await connector.search(connector_id, "fastapi"))["cached"]
+    assert len(failing.calls) == 2
+
+
+async def test_connector_updates_drop_cached_results(db, monkeypatch):
+    monkeypatch.setattr(web_search, "providers", [LocalSearchProvider(results=RESULTS)])
+    user = User(id=uuid.uuid4(), email="search@example.com", hashed_password="x")
+    tool = Tool(id=uuid.uuid4(), name="Web Search", description="d", tool_type="api_key",
+                execution_ref="connectors.web_search")
+    connector = UserConnector(id=uuid.uuid4(), user=user, tool=tool, name="search", setup_status="active")
+    db.add_all([user, tool, connector])
+    await db.commit()
+
+    await web_search.search(connector.id, "fastapi")
+    assert (await web_search.search(connector.id, "fastapi"))["cached"]
+    await update_user_connector(db, user.id, connector.id, UserConnectorUpdate(config_data={"search_engine": "bing"}))
+    assert not (await web_search.search(connector.id, "fastapi"))["cached"]